@@ -1,21 +1,2786 @@
 import requests
+from requests.adapters import HTTPAdapter
+import asyncio
+import codecs
+import collections
+import concurrent.futures
+import contextlib
+import contextvars
+import datetime
+import email.utils
+import functools
+import gzip
+import hashlib
+import importlib.util
+import inspect
+import io
 import json
 import urllib as urllib
 import logging
+import mimetypes
+import mmap
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
 
 HTTP_OK = 200
 HTTP_NO_RESPONSE = 204
+HTTP_UNAUTHORIZED = 401
+HTTP_TOO_MANY_REQUESTS = 429
+
+# Retry defaults - transient statuses and the verbs that are safe to repeat
+DEFAULT_MAX_ATTEMPTS = 3
+RETRYABLE_STATUSES = frozenset({HTTP_TOO_MANY_REQUESTS, 500, 502, 503, 504})
+IDEMPOTENT_VERBS = frozenset({"GET", "PUT", "DELETE"})
+
+# Connect and read timeouts (in seconds) by endpoint family. The read timeout bounds each wait for data, not the whole
+# response - pass a deadline (or use within_deadline) to bound a call, its retries and its pages end to end.
+DEFAULT_TIMEOUTS = {"default": (5, 30), "report": (5, 300), "stream": (5, 120), "upload": (5, 600)}
+# URL fragments identifying each endpoint family - other endpoints use the "default" timeouts
+ENDPOINT_FAMILIES = (("/sam/upload", "upload"), ("/reports/query", "report"), ("/stream", "stream"))
+
+# Connection pooling defaults - pool_size is the number of keep-alive connections kept per host,
+# pool_connections is the number of distinct hosts pools are cached for.
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_CONNECTIONS = 4
+
+# Response encodings offered to the API. urllib3 decides what requests can decode (gzip and deflate, plus br and
+# zstd when brotli / zstandard are installed - requests before 2.26 has no DEFAULT_ACCEPT_ENCODING and only
+# decodes gzip and deflate); aiohttp decodes br when brotli is installed.
+ACCEPT_ENCODING = getattr(requests.utils, "DEFAULT_ACCEPT_ENCODING", "gzip, deflate")
+ASYNC_ACCEPT_ENCODING = "gzip, deflate" + (", br" if importlib.util.find_spec("brotli") else "")
+
+# RequestCompressor defaults - bodies smaller than the threshold (in bytes) are sent uncompressed
+DEFAULT_COMPRESSION_THRESHOLD = 2048
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# Maximum number of requests an AsyncSprinklrClient keeps in flight at once
+DEFAULT_MAX_CONCURRENCY = 100
+
+# Calls kept in flight by fetch_many
+DEFAULT_BULK_CONCURRENCY = 10
+
+# ConcurrencyLimiter defaults - most calls kept in flight, how far recent latency may rise above the long-run latency
+# before the limit is lowered, the factor the limit is cut by after an overload (429, 5xx or no response) or a latency
+# rise, and the weights of the recent and long-run latency averages
+DEFAULT_MAX_BULK_CONCURRENCY = 64
+DEFAULT_LATENCY_TOLERANCE = 2.0
+OVERLOAD_BACKOFF = 0.5
+LATENCY_BACKOFF = 0.9
+RECENT_LATENCY_WEIGHT = 0.2
+LONG_RUN_LATENCY_WEIGHT = 0.02
+
+# Default Sprinklr API quotas per key, used until the API reports the actual plan limits
+DEFAULT_CALLS_PER_SECOND = 10
+DEFAULT_CALLS_PER_HOUR = 1000
+
+# Priority classes of calls sharing a rate limiter, and the share of the budget each class gets when both are waiting
+# (weighted fair queuing). Batch calls also leave the last 10% of the hourly quota to interactive calls.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+DEFAULT_PRIORITY_WEIGHTS = {PRIORITY_INTERACTIVE: 8, PRIORITY_BATCH: 1}
+DEFAULT_PRIORITY_RESERVES = {PRIORITY_BATCH: 0.1}
+
+# ResponseCache defaults - entries kept and seconds each entry stays valid
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_CACHE_TTL = 300
+DEFAULT_DISK_CACHE_ENTRIES = 10000
+
+# Cached resources dropped when a custom field is created or changed
+CUSTOM_FIELD_RESOURCES = ('CUSTOM_FIELD', 'PROFILE_CUSTOM_FIELDS', 'ACCOUNT_CUSTOM_FIELDS', 'MEDIA_ASSET_CUSTOM_FIELDS',
+                          'OUTBOUND_CUSTOM_FIELDS', 'INBOUND_CUSTOM_FIELDS')
+
+# CaseCache defaults, and the case fields (besides "id") it indexes cases by
+DEFAULT_CASE_CACHE_SIZE = 1000
+DEFAULT_CASE_CACHE_TTL = 300
+CASE_INDEX_FIELDS = ('caseNumber', 'channelCaseId')
+
+# Key of the record list within the "data" object of a search response
+SEARCH_RESULTS_KEY = "searchResults"
+
+# Id lookups batched into one search request by search_by_ids / SearchBatcher, and how long SearchBatcher
+# waits (in seconds) for more lookups before sending a batch
+DEFAULT_ID_BATCH_SIZE = 100
+DEFAULT_BATCH_WINDOW = 0.05
+
+# Bytes read per chunk from streamed responses, and the array of items yielded by each streaming helper
+# (a path of keys from the top of the response document)
+STREAM_CHUNK_SIZE = 65536
+LISTENING_STREAM_ITEMS = ("data", "messages")
+DASHBOARD_STREAM_ITEMS = ("data", "messages")
+REPORT_ROWS = ("data", "rows")
+
+# AssetPipeline defaults - calls kept in flight by the upload and create stages
+DEFAULT_UPLOAD_WORKERS = 4
+DEFAULT_CREATE_WORKERS = 4
+# Custom property of a SAM asset holding the content hash of its media, written by AssetPipeline and read by
+# AssetCatalog.sync so a catalog can be rebuilt from SAM
+ASSET_HASH_FIELD = "contentHash"
+
+# TokenManager defaults - seconds before expiry that a token is refreshed, and seconds between attempts after a
+# failed background refresh
+DEFAULT_REFRESH_MARGIN = 300
+DEFAULT_REFRESH_RETRY = 30
+
+# Methods whose calls for one entity SprinklrClientPool keeps on one credential
+STICKY_METHOD_PREFIXES = ("update_", "delete_", "add_", "remove_")
+# Methods that continue the last search made on a client (as do search_<entity>_next), which SprinklrClientPool
+# sends to the client that ran the search
+SEARCH_CURSOR_METHODS = ("search_next_page", "search_more_results")
+
+# RateLimiters shared by every client in the process, by API key (see RateLimiter.for_key)
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+# RateLimiters still in use, whose priority classes prioritized() accepts along with the default ones
+_live_rate_limiters = weakref.WeakSet()
+_live_rate_limiters_lock = threading.Lock()
+
+
+# Marks lazily computed values that have not been computed yet
+_UNSET = object()
+
+# Priority class set by prioritized() for the calls made in the current thread or task
+_call_priority = contextvars.ContextVar("call_priority", default=None)
+
+
+@contextlib.contextmanager
+def prioritized(priority):
+    """
+    Runs the calls made inside the with block in the given priority class, whichever client they are made on.
+    Worker threads started inside the block (e.g. by fetch_many) inherit the class.
+
+    Args:
+        priority (string): PRIORITY_INTERACTIVE, PRIORITY_BATCH or another class of the clients' rate limiters.
+            Raises ValueError for a class no rate limiter has.
+
+    Example:
+        with prioritized(PRIORITY_BATCH):
+            for case in client.iter_search("CASE", filter):
+                export(case)
+    """
+    token = _call_priority.set(_check_priority(priority, _known_priority_classes()))
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+def _known_priority_classes():
+    """Returns the default priority classes and those of every RateLimiter still in use"""
+    with _live_rate_limiters_lock:
+        limiters = list(_live_rate_limiters)
+    return set(DEFAULT_PRIORITY_WEIGHTS).union(*(limiter.weights for limiter in limiters))
+
+
+def _check_priority(priority, classes):
+    """Returns priority if it is one of classes, otherwise raises ValueError"""
+    if priority not in classes:
+        raise ValueError(f"Unknown priority class: {priority!r} - expected one of {', '.join(sorted(classes))}")
+    return priority
+
+
+# Monotonic time by which the calls made in the current thread or task must complete, set by within_deadline()
+_call_deadline = contextvars.ContextVar("call_deadline", default=None)
+
+
+@contextlib.contextmanager
+def within_deadline(seconds):
+    """
+    Gives the calls made inside the with block, including their retries and the pages of multi-call helpers, a
+    shared time budget. Once it is spent, calls fail fast with status_code -1 and status_message "Deadline Exceeded"
+    instead of being sent or retried. Nested blocks can only shorten the budget, and worker threads started inside
+    the block (e.g. by fetch_many) share it.
+
+    Args:
+        seconds (float): Time budget from now. None keeps the enclosing budget, if any.
+
+    Example:
+        with within_deadline(2.0):
+            client.fetch_case_by_number(case_number)
+    """
+    token = _call_deadline.set(_deadline_at(seconds))
+    try:
+        yield
+    finally:
+        _call_deadline.reset(token)
+
+
+def _deadline_at(seconds=None):
+    """Returns the monotonic time to finish by - the earlier of `seconds` from now and the enclosing deadline - or None"""
+    enclosing = _call_deadline.get()
+    if seconds is None:
+        return enclosing
+    deadline = time.monotonic() + seconds
+    return deadline if enclosing is None else min(deadline, enclosing)
+
+
+def _endpoint_family(request_url):
+    for fragment, family in ENDPOINT_FAMILIES:
+        if fragment in request_url:
+            return family
+    return "default"
+
+
+def _deadline_exceeded(verb, request_url):
+    """Logs a call abandoned because its deadline passed and returns the status message"""
+    logging.error(verb + " - Deadline Exceeded:" + request_url)
+    return "Deadline Exceeded"
+
+
+def _time_left(deadline=None):
+    """Returns the seconds left before a deadline (by default the within_deadline() budget's), or None if there is none"""
+    deadline = deadline if deadline is not None else _call_deadline.get()
+    return max(0.0, deadline - time.monotonic()) if deadline is not None else None
+
+
+def _check_deadline(deadline, verb, request_url):
+    """Raises SprinklrError once the deadline has passed, e.g. while a streamed response is still arriving"""
+    if deadline is not None and time.monotonic() >= deadline:
+        raise SprinklrError(SprinklrResponse(-1, _deadline_exceeded(verb, request_url)))
+
+
+def _carry_context(function):
+    """Wraps a function so that it runs in a copy of the caller's context (e.g. its priority class) on another thread"""
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(function, *args)
+
+
+def _log_request_error(verb, request_url, message):
+    """Logs a failed request (must be called from an except block) and returns the message"""
+    logging.error(verb + " - " + message + ":" + request_url)
+    logging.exception(message)
+    return message
+
+
+class SprinklrResponse:
+    """Immutable outcome of a single API call"""
+
+    __slots__ = ('status_code', 'status_message', 'headers', 'elapsed', '_result', '_raw', '_cursor', '_content',
+                 '_encoding', '_codec', '_keep_raw')
+
+    def __init__(self, status_code=None, status_message=None, result=None, raw=None, headers=None, elapsed=None,
+                 cursor=_UNSET):
+        """SprinklrResponse
+
+        Args:
+            status_code (int): HTTP status code of the response, or -1 if no response was received
+            status_message (string, optional): Error text on failure, None on success
+            result (optional): Response body - a Python dictionary (or list) if the response was JSON, otherwise the text
+            raw (string, optional): Text version of the response
+            headers (dict, optional): Response headers
+            elapsed (float, optional): Seconds taken by the call, including any retries
+            cursor (string, optional): Search cursor for the next page of results. Defaults to the one found in result.
+
+            A SprinklrResponse is truthy when the call was successful, so it can be tested like the boolean
+            returned by SprinklrClient methods. Attributes cannot be reassigned, so a response can be handed
+            between threads safely.
+        """
+        object.__setattr__(self, 'status_code', status_code)
+        object.__setattr__(self, 'status_message', status_message)
+        object.__setattr__(self, 'headers', headers if headers is not None else {})
+        object.__setattr__(self, 'elapsed', elapsed)
+        object.__setattr__(self, '_result', result)
+        object.__setattr__(self, '_raw', raw)
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_content', None)
+        object.__setattr__(self, '_encoding', None)
+        object.__setattr__(self, '_codec', None)
+        object.__setattr__(self, '_keep_raw', True)
+
+    @classmethod
+    def from_body(cls, status_code, status_message, content, encoding=None, codec=None, headers=None, elapsed=None,
+                  lazy=False, keep_raw=True):
+        """
+        Creates a response from the body bytes.
+
+        Args:
+            content (bytes): Response body
+            encoding (string, optional): Charset declared by the response. Defaults to None (UTF-8).
+            codec (object, optional): JSON codec used to parse the body. Defaults to None (JsonCodec).
+            lazy (bool, optional): Parse the body the first time result is read, instead of now. Defaults to False.
+            keep_raw (bool, optional): Keep the text of the body as raw. If False, raw is None and only the parsed
+                result is held once it has been read. Defaults to True.
+        """
+        response = cls(status_code, status_message, _UNSET, _UNSET, headers, elapsed)
+        object.__setattr__(response, '_content', content)
+        object.__setattr__(response, '_encoding', encoding)
+        object.__setattr__(response, '_codec', codec)
+        object.__setattr__(response, '_keep_raw', keep_raw)
+        if not lazy:
+            response.result
+        return response
+
+    @property
+    def result(self):
+        """Response body - a Python dictionary (or list) if the response was JSON, otherwise the text"""
+        if self._result is _UNSET:
+            # Decoding the same bytes twice from two threads is harmless, both produce the same result
+            result, raw = _decode_body(self._content, self._encoding, self._codec, self._keep_raw)
+            object.__setattr__(self, '_result', result)
+            if self._keep_raw:
+                object.__setattr__(self, '_raw', raw)
+            object.__setattr__(self, '_content', None)
+        return self._result
+
+    @property
+    def raw(self):
+        """Text version of the response, or None if the client was created with keep_raw=False"""
+        if self._raw is _UNSET:
+            if not self._keep_raw:
+                return None
+            self.result
+        return self._raw
+
+    @property
+    def cursor(self):
+        """Search cursor for the next page of results, if the response contained one"""
+        if self._cursor is _UNSET:
+            result = self.result
+            cursor = None
+            if isinstance(result, dict) and isinstance(result.get("data"), dict):
+                cursor = result["data"].get("cursor")
+            object.__setattr__(self, '_cursor', cursor)
+        return self._cursor
+
+    def __setattr__(self, name, value):
+        raise AttributeError("SprinklrResponse is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("SprinklrResponse is immutable")
+
+    @property
+    def ok(self):
+        return self.status_code in {HTTP_OK, HTTP_NO_RESPONSE}
+
+    def __bool__(self):
+        return self.ok
+
+    def __repr__(self):
+        return f'SprinklrResponse(status_code={self.status_code!r}, status_message={self.status_message!r})'
+
+
+class JsonCodec:
+    """Standard library JSON codec"""
+
+    # Codecs that parse bytes directly set this to True; text codecs are handed the already decoded body
+    binary = False
+
+    def loads(self, data):
+        """Parses JSON from a str or UTF-8 encoded bytes"""
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """Serializes an object to JSON, as str or bytes"""
+        return json.dumps(obj)
+
+
+class OrjsonCodec:
+    """JSON codec backed by orjson (pip install orjson). It parses large responses faster than the standard library and is
+    where the speedup of the single-pass decoding comes from (see benchmarks/bench_json_codec.py)"""
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("OrjsonCodec requires the orjson package")
+
+    binary = True
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+def _decode_body(content, encoding=None, codec=None, keep_raw=True):
+    """
+    Decodes a response body in a single pass over the bytes.
+
+    Returns:
+    tuple: (result, raw) - result is the parsed JSON object or array, or the text if the body is not JSON.
+    raw is the text, or None if keep_raw is False.
+    """
+    codec = codec or _default_codec
+    is_json = content[:64].lstrip()[:1] in (b"{", b"[")
+    raw = None
+    if keep_raw or not is_json or not getattr(codec, "binary", False):
+        raw = content.decode(encoding or 'utf-8', errors='replace')
+    if is_json:
+        try:
+            return codec.loads(content if getattr(codec, "binary", False) else raw), raw if keep_raw else None
+        except ValueError:
+            logging.debug("Response body is not valid JSON")
+            if raw is None:
+                raw = content.decode(encoding or 'utf-8', errors='replace')
+    return raw, raw if keep_raw else None
+
+
+def _decode_result(raw, codec=None):
+    """Converts stored response text back to the result _decode_body would produce"""
+    return _decode_body(raw.encode('utf-8'), 'utf-8', codec)[0]
+
+
+_default_codec = JsonCodec()
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters that may continue a JSON number, up to the end of the buffer
+_NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+class JsonStreamParser:
+    """Incremental JSON parser returning the elements of one array of a document as its bytes arrive"""
+
+    def __init__(self, item_path=()):
+        """JsonStreamParser
+
+        Args:
+            item_path (tuple, optional): Keys leading from the top of the document to the array,
+                e.g. ("data", "rows"). Defaults to () - the document is the array.
+
+            Only the element being parsed (plus one chunk) is held in memory. Values next to the array are skipped;
+            each of them is parsed whole to find where it ends. If the array is missing, no items are returned.
+        """
+        self.item_path = tuple(item_path)
+        self._text = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._depth = 0
+        self._state = "value"
+
+    def feed(self, chunk):
+        """
+        Adds the next chunk of the document.
+
+        Args:
+            chunk (bytes): Next bytes of the response body
+
+        Returns:
+            list: array elements completed by this chunk. Raises ValueError if the document is not valid JSON.
+        """
+        if self._state == "done":
+            return []
+        self._buffer += self._text.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        Signals the end of the document.
+
+        Returns:
+            list: remaining array elements. Raises ValueError if the document is incomplete.
+        """
+        if self._state == "done":
+            return []
+        self._buffer += self._text.decode(b"", final=True)
+        items = self._parse(final=True)
+        if self._state != "done" and (self._buffer.strip() or self._state != "value" or self._depth):
+            raise ValueError("Incomplete JSON document")
+        return items
+
+    def _parse(self, final):
+        items = []
+        position = 0
+        buffer = self._buffer
+        while self._state != "done":
+            start = _WHITESPACE.match(buffer, position).end()
+            if start == len(buffer):
+                break
+            char = buffer[start]
+            if self._state == "value":
+                # Opening bracket of the object on the path, or of the array itself at the end of the path
+                if char != ("[" if self._depth == len(self.item_path) else "{"):
+                    self._state = "done"
+                    break
+                position = start + 1
+                self._state = "items" if self._depth == len(self.item_path) else "key"
+            elif char == ",":
+                position = start + 1
+            elif char in "}]":
+                self._state = "done"
+            elif self._state == "items":
+                decoded = self._decode(buffer, start, final)
+                if decoded is None:
+                    break
+                item, position = decoded
+                items.append(item)
+            else:
+                # "key": value - descend into the value if it is on the path, otherwise skip over it
+                decoded = self._decode(buffer, start, final)
+                if decoded is None:
+                    break
+                key, end = decoded
+                colon = _WHITESPACE.match(buffer, end).end()
+                if colon == len(buffer):
+                    break
+                if buffer[colon] != ":":
+                    raise ValueError("Expecting ':' delimiter at position " + str(colon))
+                value = _WHITESPACE.match(buffer, colon + 1).end()
+                if value == len(buffer):
+                    break
+                if key == self.item_path[self._depth]:
+                    position = value
+                    self._depth += 1
+                    self._state = "value"
+                    continue
+                decoded = self._decode(buffer, value, final)
+                if decoded is None:
+                    break
+                position = decoded[1]
+        self._buffer = "" if self._state == "done" else buffer[position:]
+        return items
+
+    def _decode(self, buffer, start, final):
+        """Returns (value, end) for the JSON value at start, or None if more of the document is needed"""
+        try:
+            value, end = self._decoder.raw_decode(buffer, start)
+        except ValueError:
+            if final:
+                raise
+            return None
+        # A number followed only by number characters up to the end of the buffer may continue in the next chunk,
+        # e.g. "1." or "2e" decode as 1 and 2 until the digits after them arrive
+        if not final and type(value) in (int, float) and _NUMBER_TAIL.match(buffer, end):
+            return None
+        return value, end
+
+
+def _iter_content(response):
+    """Returns an iterator over the body of a streamed response (a single chunk for fully read responses)"""
+    iter_content = getattr(response, "iter_content", None)
+    if iter_content is None:
+        return iter([response.content])
+    return iter_content(chunk_size=STREAM_CHUNK_SIZE)
+
+
+async def _aiter_content(response):
+    """Async iterator over the body of a streamed response, reading synchronous responses on a worker thread"""
+    if isinstance(response, _AsyncStreamedResponse):
+        async for chunk in response.iter_chunks():
+            yield chunk
+        return
+    chunks = _iter_content(response)
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _rewind_body(body):
+    """
+    Rewinds a streamed request body so it can be sent again.
+
+    Returns:
+        boolean: False if the body is a stream that cannot be rewound (so it cannot be sent again), otherwise True
+    """
+    if not isinstance(body, io.IOBase):
+        return True
+    if not body.seekable():
+        return False
+    body.seek(0)
+    return True
+
+
+def _close_response(response):
+    """Releases the connection held by a streamed response"""
+    close = getattr(response, "close", None)
+    if close is not None:
+        close()
+
+
+def _remaining_size(file):
+    """Returns the number of bytes left in a file object, or None if it cannot seek"""
+    try:
+        position = file.tell()
+        end = file.seek(0, io.SEEK_END)
+        file.seek(position)
+    except (AttributeError, OSError, ValueError):
+        return None
+    return end - position
+
+
+class MultipartUpload(io.IOBase):
+    """multipart/form-data request body streamed from a file, file object or in-memory buffer"""
+
+    def __init__(self, source, field_name="file", filename=None, content_type=None, progress=None, use_mmap=False):
+        """MultipartUpload
+
+        Args:
+            source: Path of the file to upload, a binary file object, or bytes
+            field_name (string, optional): Name of the form field. Defaults to "file".
+            filename (string, optional): File name sent with the part. Defaults to the name of the file, or "upload".
+            content_type (string, optional): MIME type of the part. Defaults to a guess from the file name.
+            progress (callable, optional): Called as progress(bytes_sent, total_bytes) after each chunk of the file is
+                read for sending. total_bytes is None if the size of a file object cannot be determined. Defaults to None.
+            use_mmap (bool, optional): Memory-map a file given by path instead of reading it. Defaults to False.
+
+            The body is read in chunks as it is sent, so memory use does not depend on the size of the media.
+            Files opened from a path are closed by close() (or when used as a context manager); file objects passed
+            in are left open. When the size is known the body is sent with a Content-Length, otherwise chunked.
+        """
+        super().__init__()
+        self.boundary = uuid.uuid4().hex
+        self.progress = progress
+        self._mmap = None
+        self._owns_source = False
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            self._source = io.BytesIO(source)
+            self.size = len(self._source.getbuffer())
+        elif hasattr(source, "read"):
+            self._source = source
+            self.size = _remaining_size(source)
+            filename = filename or os.path.basename(str(getattr(source, "name", "")))
+        else:
+            path = os.fspath(source)
+            self._source = open(path, "rb")
+            self._owns_source = True
+            self.size = os.fstat(self._source.fileno()).st_size
+            if use_mmap and self.size:
+                self._mmap = mmap.mmap(self._source.fileno(), 0, access=mmap.ACCESS_READ)
+            filename = filename or os.path.basename(path)
+        filename = filename or "upload"
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        self.filename = filename
+        self.content_type = "multipart/form-data; boundary=" + self.boundary
+        self._head = (f'--{self.boundary}\r\n'
+                      f'Content-Disposition: form-data; name="{field_name}"; filename="{filename.replace(chr(34), "%22")}"\r\n'
+                      f'Content-Type: {content_type}\r\n\r\n').encode('utf-8')
+        self._tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        # Total body length, read by requests to send a Content-Length header
+        self.len = None if self.size is None else len(self._head) + self.size + len(self._tail)
+        self._source_start = self._source.tell() if self._source.seekable() else None
+        self._section = 0
+        self._offset = 0
+        self._position = 0
+        self.bytes_sent = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._source_start is not None
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        """Only rewinding to the start (seek(0)) is supported, which lets the body be sent again"""
+        if whence == io.SEEK_CUR and offset == 0:
+            return self._position
+        if whence != io.SEEK_SET or offset != 0 or not self.seekable():
+            raise io.UnsupportedOperation("MultipartUpload can only be rewound to the start")
+        if self._mmap is not None:
+            self._mmap.seek(0)
+        else:
+            self._source.seek(self._source_start)
+        self._section = 0
+        self._offset = 0
+        self._position = 0
+        self.bytes_sent = 0
+        return 0
+
+    def read(self, size=-1):
+        """Returns up to size bytes of the body (the whole remaining body if size is negative), b"" at the end"""
+        if size is None or size < 0:
+            return b"".join(iter(functools.partial(self.read, STREAM_CHUNK_SIZE), b""))
+        while self._section < 3:
+            if self._section == 1:
+                chunk = self._mmap.read(size) if self._mmap is not None else self._source.read(size)
+                if chunk:
+                    self._position += len(chunk)
+                    self.bytes_sent += len(chunk)
+                    if self.progress is not None:
+                        self.progress(self.bytes_sent, self.size)
+                    return chunk
+            else:
+                part = self._head if self._section == 0 else self._tail
+                if self._offset < len(part):
+                    chunk = part[self._offset:self._offset + size]
+                    self._offset += len(chunk)
+                    self._position += len(chunk)
+                    return chunk
+            self._section += 1
+            self._offset = 0
+        return b""
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._owns_source:
+            self._source.close()
+        super().close()
+
+
+class SprinklrError(Exception):
+    """Raised by iterator style helpers, which cannot return False, when an API call fails"""
+
+    def __init__(self, response):
+        super().__init__(f'{response.status_code}: {response.status_message}')
+        self.response = response
+
+
+def _search_page(response):
+    """Returns the (records, cursor) of a search response, raising SprinklrError if the call failed"""
+    if not response:
+        raise SprinklrError(response)
+    data = {}
+    if isinstance(response.result, dict):
+        data = response.result.get("data") or {}
+    return data.get(SEARCH_RESULTS_KEY) or [], data.get("cursor")
+
+
+def _id_search_body(id_field, ids, page_size):
+    """Search request matching any of the given ids"""
+    return {"filter": {"filterType": "IN", "field": id_field, "values": list(ids)}, "paginationInfo": {"rows": page_size}}
+
+
+def _index_records(records, id_field, ids):
+    """Maps each requested id to its record, matching ids as strings so 123 and "123" are the same id"""
+    by_id = {str(record.get(id_field)): record for record in records if isinstance(record, dict)}
+    return {entity_id: by_id[str(entity_id)] for entity_id in ids if str(entity_id) in by_id}
+
+
+def _case_identifier(case_data):
+    """Returns the id (or case number) of the case a request changes, or None (drop every cached case) if it has neither"""
+    if isinstance(case_data, dict):
+        for field in ("id", "caseId", "caseNumber"):
+            if case_data.get(field) is not None:
+                return case_data[field]
+    return None
+
+
+def _search_body(filter, page_size):
+    """Copies a search request, adding the page size unless the caller already set one"""
+    if page_size is None:
+        return filter
+    body = dict(filter)
+    pagination = dict(body.get("paginationInfo") or {})
+    pagination.setdefault("rows", page_size)
+    body["paginationInfo"] = pagination
+    return body
+
+
+class HttpTransport:
+    """Pooled, keep-alive HTTP transport used by SprinklrClient"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, pool_connections=DEFAULT_POOL_CONNECTIONS, headers=None,
+                 accept_encoding=ACCEPT_ENCODING):
+        """HttpTransport
+
+        Args:
+            pool_size (int, optional): Maximum number of connections kept alive per host. Defaults to DEFAULT_POOL_SIZE.
+            pool_connections (int, optional): Number of per-host connection pools to cache. Defaults to DEFAULT_POOL_CONNECTIONS.
+            headers (dict, optional): Headers sent with every request made through this transport. Defaults to None.
+            accept_encoding (string, optional): Response compression to negotiate; compressed responses are decoded
+                transparently. Pass "identity" to ask for uncompressed responses. Defaults to ACCEPT_ENCODING.
+
+            Connections are reused between calls, so only the first request to a host pays for the TCP + TLS handshake.
+            Any object exposing request(verb, url, headers=None, data=None, **kwargs) and returning a requests-style
+            response can be passed to SprinklrClient in place of this class (e.g. for testing).
+        """
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({'Connection': 'keep-alive', 'Accept-Encoding': accept_encoding})
+        if headers is not None:
+            self.session.headers.update(headers)
+
+    def request(self, verb, url, headers=None, data=None, **kwargs):
+        """
+        Sends a request over the pooled session.
+
+        Args:
+            verb (string): HTTP verb - one of GET, DELETE, POST or PUT
+            url (string): Fully qualified request URL
+            headers (dict, optional): Request specific headers, merged over the transport headers
+            data (optional): Request body
+
+        Returns:
+            requests.Response: the response object
+        """
+        return self.session.request(verb, url, headers=headers, data=data, **kwargs)
+
+    def close(self):
+        """Closes all pooled connections"""
+        self.session.close()
+
+
+class _BufferedResponse:
+    """Fully read response with the subset of the requests.Response interface used by SprinklrClient"""
+
+    def __init__(self, status_code, content, encoding, headers):
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.headers = headers
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class _AsyncStreamedResponse:
+    """aiohttp response whose body is read as it arrives"""
+
+    def __init__(self, response):
+        self.status_code = response.status
+        self.encoding = response.charset
+        self.headers = response.headers
+        self._response = response
+
+    def iter_chunks(self):
+        return self._response.content.iter_chunked(STREAM_CHUNK_SIZE)
+
+    async def read(self):
+        """Reads the rest of the body, returning a fully read response"""
+        content = await self._response.read()
+        return _BufferedResponse(self.status_code, content, self.encoding, self.headers)
+
+    def close(self):
+        self._response.release()
+
+
+class AsyncHttpTransport:
+    """Pooled HTTP transport for AsyncSprinklrClient"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, transport=None, accept_encoding=ASYNC_ACCEPT_ENCODING,
+                 max_concurrency=None):
+        """AsyncHttpTransport
+
+        Args:
+            pool_size (int, optional): Minimum number of connections per host. Defaults to DEFAULT_POOL_SIZE.
+            transport (object, optional): Synchronous transport to run in a thread pool instead of using aiohttp. Defaults to None.
+            accept_encoding (string, optional): Response compression to negotiate. Defaults to ASYNC_ACCEPT_ENCODING.
+            max_concurrency (int, optional): Requests that can be in flight at once. Connections per host and worker
+                threads are sized to the larger of this and pool_size. Defaults to None - pool_size.
+
+            When aiohttp is installed, requests are sent over a single aiohttp.ClientSession shared by every call.
+            Otherwise (or when a synchronous transport is given) each request is run on a worker thread
+            against a pooled HttpTransport.
+        """
+        self.pool_size = max(pool_size, max_concurrency or 0)
+        self._session = None
+        self._executor = None
+        self._transport = transport
+        self.accept_encoding = accept_encoding
+        if aiohttp is None and transport is None:
+            self._transport = HttpTransport(pool_size=self.pool_size, accept_encoding=accept_encoding)
+
+    async def request(self, verb, url, headers=None, data=None, **kwargs):
+        """
+        Sends a request over the pooled session.
+
+        Args:
+            verb (string): HTTP verb - one of GET, DELETE, POST or PUT
+            url (string): Fully qualified request URL
+            headers (dict, optional): Request specific headers
+            data (optional): Request body
+            stream (bool, optional): Return as soon as the headers arrive and read the body as it is iterated.
+            timeout (tuple, optional): (connect, read) timeouts in seconds, as for requests. Defaults to None.
+
+        Returns:
+            response object with status_code, text, content, encoding and headers
+        """
+        if self._transport is not None:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size)
+            call = functools.partial(self._transport.request, verb, url, headers=headers, data=data, **kwargs)
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, limit_per_host=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  headers={'Accept-Encoding': self.accept_encoding})
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(sock_connect=timeout[0], sock_read=timeout[1])
+        if kwargs.pop("stream", False):
+            # The caller reads the body and releases the connection (see _AsyncStreamedResponse)
+            return _AsyncStreamedResponse(await self._session.request(verb, url, headers=headers, data=data, **kwargs))
+        async with self._session.request(verb, url, headers=headers, data=data, **kwargs) as response:
+            content = await response.read()
+            return _BufferedResponse(response.status, content, response.charset, response.headers)
+
+    async def close(self):
+        """Closes all pooled connections"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._transport is not None and hasattr(self._transport, "close"):
+            self._transport.close()
+
+class TokenBucket:
+    """Token bucket allowing `capacity` calls per `period` seconds"""
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    def wait_time(self, now):
+        """Returns the number of seconds until a token is available"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def consume(self):
+        self.tokens -= 1
+
+    @property
+    def remaining(self):
+        self._refill(time.monotonic())
+        return int(self.tokens)
+
+    def resync(self, limit=None, remaining=None, reset_in=None):
+        """
+        Adjusts the bucket to the limit and remaining budget reported by the server.
+
+        Args:
+            limit (int, optional): Calls allowed per period
+            remaining (int, optional): Calls left in the current period
+            reset_in (float, optional): Seconds until the period resets. Only used when no calls remain.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if limit is not None and limit > 0:
+            self.capacity = limit
+        if remaining is not None:
+            self.tokens = float(max(0, min(self.capacity, remaining)))
+            if remaining <= 0 and reset_in is not None:
+                self.blocked_until = now + max(0.0, reset_in)
+
+    def block(self, seconds):
+        """Empties the bucket and holds it for the given number of seconds"""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, now + seconds)
+
+
+class RateLimiter:
+    """Paces calls made with one API key to stay under Sprinklr's per second and per hour quotas"""
+
+    def __init__(self, calls_per_second=DEFAULT_CALLS_PER_SECOND, calls_per_hour=DEFAULT_CALLS_PER_HOUR, weights=None,
+                 reserves=None):
+        """RateLimiter
+
+        Args:
+            calls_per_second (int, optional): Calls allowed per second. Defaults to DEFAULT_CALLS_PER_SECOND.
+            calls_per_hour (int, optional): Calls allowed per hour. Defaults to DEFAULT_CALLS_PER_HOUR.
+            weights (dict, optional): Priority classes and their relative share of the budget while several classes
+                are waiting. Defaults to DEFAULT_PRIORITY_WEIGHTS (interactive calls get 8 of every 9 calls).
+            reserves (dict, optional): Fraction of the hourly quota that calls of a class must leave to the others.
+                Defaults to DEFAULT_PRIORITY_RESERVES (batch calls stop when 10% of the hourly quota is left).
+
+            Both limits are kept in sync with the X-Plan-QPS-* and X-Plan-Quota-* headers returned by the API,
+            and a 429 response holds all calls for the Retry-After period (or one second).
+
+            Waiting calls are queued by priority class and served by weighted fair queuing, so a backlog of batch
+            calls delays an interactive call by at most one call, while batch calls still get their share.
+        """
+        self.second = TokenBucket(calls_per_second, 1)
+        self.hour = TokenBucket(calls_per_hour, 3600)
+        self.quota_reset = None
+        self.weights = dict(weights if weights is not None else DEFAULT_PRIORITY_WEIGHTS)
+        self.reserves = dict(reserves if reserves is not None else DEFAULT_PRIORITY_RESERVES)
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._queues = {priority: collections.deque() for priority in self.weights}
+        self._unknown_classes = set()
+        with _live_rate_limiters_lock:
+            _live_rate_limiters.add(self)
+        self._finish = dict.fromkeys(self.weights, 0.0)
+        self._virtual_time = 0.0
+
+    @classmethod
+    def for_key(cls, key, calls_per_second=DEFAULT_CALLS_PER_SECOND, calls_per_hour=DEFAULT_CALLS_PER_HOUR,
+                weights=None, reserves=None):
+        """
+        Returns the limiter shared by every client in this process using the given API key, creating it if necessary.
+        """
+        with _rate_limiters_lock:
+            if key not in _rate_limiters:
+                _rate_limiters[key] = cls(calls_per_second, calls_per_hour, weights, reserves)
+            return _rate_limiters[key]
+
+    def _wait_time(self, priority, now):
+        # Called with the lock held
+        wait = max(self.second.wait_time(now), self.hour.wait_time(now))
+        reserve = self.reserves.get(priority, 0) * self.hour.capacity
+        if reserve > 0 and self.hour.tokens - 1 < reserve:
+            wait = max(wait, (reserve + 1 - self.hour.tokens) * self.hour.period / self.hour.capacity)
+        return wait
+
+    def _finish_tag(self, priority):
+        # Virtual time at which the next call of a class completes its share (start-time fair queuing)
+        return max(self._finish[priority], self._virtual_time) + 1 / self.weights[priority]
+
+    def _grant(self, ticket, priority):
+        """
+        Takes a call from both windows for a queued ticket if it is next in line (called with the lock held).
+
+        Returns:
+            float: 0 if the call was granted, the seconds until it can be if the ticket is next, otherwise None
+        """
+        now = time.monotonic()
+        waiting = [(self._wait_time(queued, now), self._finish_tag(queued), queued)
+                   for queued, queue in self._queues.items() if queue]
+        wait, finish, next_priority = min(waiting)
+        if next_priority != priority or self._queues[priority][0] is not ticket:
+            return None
+        if wait > 0:
+            return wait
+        self._queues[priority].popleft()
+        self._virtual_time = finish - 1 / self.weights[priority]
+        self._finish[priority] = finish
+        self.second.consume()
+        self.hour.consume()
+        self._condition.notify_all()
+        return 0
+
+    def _priority_class(self, priority):
+        """
+        Returns the class a call of the given priority is queued in. A class this limiter has no weight for (e.g. one
+        of another limiter's, set by prioritized()) is served as interactive, or as the most heavily weighted class,
+        with a warning logged the first time the class is seen.
+        """
+        if priority in self._queues:
+            return priority
+        fallback = PRIORITY_INTERACTIVE if PRIORITY_INTERACTIVE in self._queues else max(self.weights, key=self.weights.get)
+        if priority not in self._unknown_classes:
+            self._unknown_classes.add(priority)
+            logging.warning("RateLimiter - unknown priority class " + repr(priority) + ", using " + fallback)
+        return fallback
+
+    def _enqueue(self, priority):
+        ticket = object()
+        self._queues[priority].append(ticket)
+        return ticket
+
+    def _dequeue(self, ticket, priority):
+        # Called with the lock held, when a call stops waiting without being granted
+        queue = self._queues[priority]
+        if ticket in queue:
+            queue.remove(ticket)
+            self._condition.notify_all()
+
+    def acquire(self, blocking=True, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Waits until a call can be made within both quota windows and reserves it.
+
+        Args:
+            blocking (bool, optional): If False, returns immediately instead of waiting. Defaults to True.
+            priority (string, optional): Priority class of the call. Defaults to PRIORITY_INTERACTIVE.
+            timeout (float, optional): Most seconds to wait. Defaults to None - wait as long as necessary.
+
+        Returns:
+            boolean: True if the call was reserved, False if no budget became available (without blocking, or
+            within the timeout)
+        """
+        give_up = time.monotonic() + timeout if timeout is not None else None
+        priority = self._priority_class(priority)
+        with self._condition:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._grant(ticket, priority)
+                    if wait == 0:
+                        return True
+                    if not blocking:
+                        return False
+                    wait = _within(wait, give_up)
+                    if wait == 0:
+                        return False
+                    # Calls that are not next in line sleep until another call is granted or leaves the queue
+                    self._condition.wait(wait)
+            finally:
+                self._dequeue(ticket, priority)
+
+    async def acquire_async(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """Awaits until a call can be made within both quota windows and reserves it. Returns False after timeout seconds."""
+        give_up = time.monotonic() + timeout if timeout is not None else None
+        priority = self._priority_class(priority)
+        with self._lock:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._lock:
+                    wait = self._grant(ticket, priority)
+                if wait == 0:
+                    return True
+                # Calls that are not next in line check again after the time one call takes
+                wait = _within(wait if wait is not None else 1 / self.second.capacity, give_up)
+                if wait == 0:
+                    return False
+                await asyncio.sleep(wait)
+        finally:
+            with self._lock:
+                self._dequeue(ticket, priority)
+
+    def update(self, status_code, headers):
+        """
+        Resynchronizes the budget from a response.
+
+        Args:
+            status_code (int): HTTP status code of the response
+            headers (dict): Response headers
+        """
+        with self._lock:
+            qps_limit = _int_header(headers, 'X-Plan-QPS-Allotted')
+            qps_used = _int_header(headers, 'X-Plan-QPS-Current')
+            if qps_limit is not None and qps_used is not None:
+                self.second.resync(qps_limit, qps_limit - qps_used)
+
+            quota_limit = _int_header(headers, 'X-Plan-Quota-Allotted')
+            quota_used = _int_header(headers, 'X-Plan-Quota-Current')
+            reset_in = _quota_reset_in(_header(headers, 'X-Plan-Quota-Reset'))
+            if reset_in is not None:
+                self.quota_reset = time.time() + reset_in
+            if quota_limit is not None and quota_used is not None:
+                self.hour.resync(quota_limit, quota_limit - quota_used, reset_in)
+
+            if status_code == HTTP_TOO_MANY_REQUESTS:
+                retry_after = _retry_after(headers)
+                self.second.block(retry_after if retry_after is not None else 1.0)
+            # The resynced budget may change which waiting call goes next
+            self._condition.notify_all()
+
+    @property
+    def budget(self):
+        """
+        Current limits and remaining calls for each window.
+
+        Returns:
+            dict: {"per_second": {"limit", "remaining"}, "per_hour": {"limit", "remaining", "reset"}} - reset is a Unix timestamp or None
+        """
+        with self._lock:
+            return {
+                "per_second": {"limit": self.second.capacity, "remaining": self.second.remaining},
+                "per_hour": {"limit": self.hour.capacity, "remaining": self.hour.remaining, "reset": self.quota_reset}
+            }
+
+    @property
+    def remaining(self):
+        """Number of calls that can be made right now without waiting"""
+        with self._lock:
+            return min(self.second.remaining, self.hour.remaining)
+
+    @property
+    def queued(self):
+        """Number of calls waiting for budget, by priority class"""
+        with self._lock:
+            return {priority: len(queue) for priority, queue in self._queues.items()}
+
+
+def _within(wait, give_up):
+    """Caps a wait (None meaning indefinitely) at the time left until give_up. Returns 0 once give_up has passed."""
+    if give_up is None:
+        return wait
+    left = give_up - time.monotonic()
+    if left <= 0:
+        return 0
+    return left if wait is None else min(wait, left)
+
+
+def _header(headers, name):
+    """Case insensitive header lookup that also works for plain dictionaries"""
+    if headers is None:
+        return None
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    return value
+
+
+def _int_header(headers, name):
+    value = _header(headers, name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _retry_after(headers):
+    """Returns the Retry-After header in seconds, or None if missing or unparseable"""
+    value = _header(headers, 'Retry-After')
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _quota_reset_in(value):
+    """Parses X-Plan-Quota-Reset (e.g. "Thursday, March 5, 2020 7:00:00 PM GMT") into seconds from now"""
+    if value is None:
+        return None
+    try:
+        reset = datetime.datetime.strptime(value, "%A, %B %d, %Y %I:%M:%S %p GMT")
+    except ValueError:
+        return None
+    return reset.replace(tzinfo=datetime.timezone.utc).timestamp() - time.time()
+
+
+class ConcurrencyLimiter:
+    """Adapts the number of calls kept in flight to the latency and errors of their responses (AIMD)"""
+
+    def __init__(self, initial=DEFAULT_BULK_CONCURRENCY, min_limit=1, max_limit=DEFAULT_MAX_BULK_CONCURRENCY,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+        """ConcurrencyLimiter
+
+        Args:
+            initial (int, optional): Starting limit. Defaults to DEFAULT_BULK_CONCURRENCY.
+            min_limit (int, optional): Lowest limit. Defaults to 1.
+            max_limit (int, optional): Highest limit. Defaults to DEFAULT_MAX_BULK_CONCURRENCY.
+            latency_tolerance (float, optional): How many times the long-run average latency the recent average may
+                reach before the limit is lowered. Defaults to DEFAULT_LATENCY_TOLERANCE.
+
+            While the limit is in use and latency stays flat, it grows by one call per round trip. A 429, 5xx or
+            failed call halves it and a latency rise cuts it by 10%, at most once per round trip.
+            Pass the same limiter to several fetch_many calls to share one limit between them.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self.latency = None
+        self.long_run_latency = None
+        self.increases = 0
+        self.decreases = 0
+        self._limit = float(min(max(initial, min_limit), self.max_limit))
+        self._hold_until = 0.0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """Number of calls currently allowed in flight"""
+        return int(self._limit)
+
+    def acquire(self, blocking=True):
+        """
+        Takes a slot for one call, waiting while the limit is reached.
+
+        Args:
+            blocking (bool, optional): If False, returns immediately instead of waiting. Defaults to True.
+
+        Returns:
+            boolean: True if a slot was taken, False if blocking is False and the limit is reached
+        """
+        with self._condition:
+            while self.in_flight >= self.limit:
+                if not blocking:
+                    return False
+                self._condition.wait()
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self):
+        """Awaits a slot for one call."""
+        while not self.acquire(blocking=False):
+            # About the time between two completions
+            await asyncio.sleep((self.latency or 0.01) / self.limit)
+        return True
+
+    def release(self, latency=None, status_code=None):
+        """
+        Returns a slot and adjusts the limit from the outcome of the call.
+
+        Args:
+            latency (float, optional): Seconds the call took. Defaults to None - the call is not counted (e.g. cancelled).
+            status_code (int, optional): HTTP status code of the response, or -1 if no response was received
+        """
+        with self._condition:
+            in_use = self.in_flight >= self.limit
+            self.in_flight -= 1
+            if latency is not None:
+                self._adjust(latency, status_code, in_use)
+            self._condition.notify_all()
+
+    def _adjust(self, latency, status_code, in_use):
+        # Called with the lock held
+        now = time.monotonic()
+        if status_code == -1 or status_code == HTTP_TOO_MANY_REQUESTS or status_code >= 500:
+            backoff = OVERLOAD_BACKOFF
+        else:
+            if self.latency is None:
+                self.latency = self.long_run_latency = latency
+            self.latency += RECENT_LATENCY_WEIGHT * (latency - self.latency)
+            self.long_run_latency += LONG_RUN_LATENCY_WEIGHT * (latency - self.long_run_latency)
+            backoff = LATENCY_BACKOFF if self.latency > self.long_run_latency * self.latency_tolerance else None
+
+        if backoff is not None:
+            # Calls already in flight when the limit was cut report the same overload, so only one cut per round trip
+            if now >= self._hold_until:
+                self._limit = max(self.min_limit, self._limit * backoff)
+                self._hold_until = now + (self.latency or 0.0)
+                self.decreases += 1
+                logging.debug("ConcurrencyLimiter - limit lowered to " + str(self.limit))
+        elif in_use and self._limit < self.max_limit:
+            # Only a limit that is actually reached is raised, by about one call per round trip
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+            self.increases += 1
+
+    @property
+    def stats(self):
+        """Current limit, calls in flight, recent and long-run average latency, and how often the limit was changed"""
+        with self._condition:
+            return {"limit": self.limit, "in_flight": self.in_flight, "latency": self.latency,
+                    "long_run_latency": self.long_run_latency, "increases": self.increases,
+                    "decreases": self.decreases}
+
+
+class RetryPolicy:
+    """Retry schedule for transient API failures"""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, backoff_factor=0.5, max_backoff=30.0, jitter=True,
+                 retry_statuses=RETRYABLE_STATUSES, retry_verbs=IDEMPOTENT_VERBS, retry_safe_posts=False,
+                 respect_retry_after=True):
+        """RetryPolicy
+
+        Args:
+            max_attempts (int, optional): Total attempts per call, including the first. Defaults to DEFAULT_MAX_ATTEMPTS.
+            backoff_factor (float, optional): Delay before the first retry, doubled on each further retry. Defaults to 0.5.
+            max_backoff (float, optional): Upper bound in seconds on the exponential delay. Defaults to 30.
+            jitter (bool, optional): Pick a random delay between 0 and the exponential delay ("full jitter"). Defaults to True.
+            retry_statuses (set, optional): HTTP status codes considered transient. Defaults to RETRYABLE_STATUSES.
+            retry_verbs (set, optional): Verbs that are always retried. Defaults to IDEMPOTENT_VERBS (GET, PUT, DELETE).
+            retry_safe_posts (bool, optional): Also retry POST endpoints that only read data, such as search_entity,
+                fetch_report and fetch_listening_stream. Defaults to False.
+            respect_retry_after (bool, optional): Wait at least as long as a Retry-After header asks. Defaults to True.
+
+            Connection errors and timeouts (status_code -1) are retried like the statuses in retry_statuses.
+        """
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = set(retry_statuses)
+        self.retry_verbs = {verb.upper() for verb in retry_verbs}
+        self.retry_safe_posts = retry_safe_posts
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, verb, status_code, attempt, idempotent=False):
+        """
+        Indicates if a call should be attempted again.
+
+        Args:
+            verb (string): HTTP verb of the call
+            status_code (int): Status code of the last attempt, -1 if no response was received
+            attempt (int): Number of attempts made so far
+            idempotent (bool, optional): True if the endpoint only reads data, even though the verb is POST. Defaults to False.
+
+        Returns:
+            boolean: True if the call should be retried
+        """
+        if attempt >= self.max_attempts:
+            return False
+        if status_code != -1 and status_code not in self.retry_statuses:
+            return False
+        return verb.upper() in self.retry_verbs or (idempotent and self.retry_safe_posts)
+
+    def delay(self, attempt, headers=None):
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        Args:
+            attempt (int): Number of attempts made so far
+            headers (dict, optional): Headers of the last response, checked for Retry-After
+        """
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        if self.respect_retry_after:
+            retry_after = _retry_after(headers)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+
+class RequestCompressor:
+    """Compresses large JSON request bodies and counts the bytes saved"""
+
+    def __init__(self, threshold=DEFAULT_COMPRESSION_THRESHOLD, encoding="gzip", level=DEFAULT_COMPRESSION_LEVEL):
+        """RequestCompressor
+
+        Args:
+            threshold (int, optional): Bodies smaller than this many bytes are sent as is. Defaults to DEFAULT_COMPRESSION_THRESHOLD.
+            encoding (string, optional): "gzip" or "deflate", sent as the Content-Encoding header. Defaults to "gzip".
+            level (int, optional): zlib compression level, 1 (fastest) to 9 (smallest). Defaults to DEFAULT_COMPRESSION_LEVEL.
+
+            Pass to SprinklrClient as compress_requests to compress POST and PUT bodies, e.g. large report queries,
+            publish_post payloads and search filters. Bodies that do not shrink are also sent as is.
+        """
+        if encoding not in ("gzip", "deflate"):
+            raise ValueError("encoding must be gzip or deflate")
+        self.threshold = threshold
+        self.encoding = encoding
+        self.level = level
+        self.compressed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._lock = threading.Lock()
+
+    def compress(self, body):
+        """
+        Compresses a request body if it is large enough.
+
+        Args:
+            body (string or bytes): Serialized request body
+
+        Returns:
+            tuple: (body, content encoding) - the content encoding is None if the body was left uncompressed
+        """
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        compressed = None
+        if len(data) >= self.threshold:
+            if self.encoding == "gzip":
+                compressed = gzip.compress(data, compresslevel=self.level, mtime=0)
+            else:
+                compressed = zlib.compress(data, self.level)
+        with self._lock:
+            if compressed is None or len(compressed) >= len(data):
+                self.skipped += 1
+                return body, None
+            self.compressed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(compressed)
+        return compressed, self.encoding
+
+    @property
+    def stats(self):
+        """Bodies compressed and skipped, and their size before and after compression"""
+        with self._lock:
+            return {"compressed": self.compressed, "skipped": self.skipped, "bytes_in": self.bytes_in,
+                    "bytes_out": self.bytes_out, "bytes_saved": self.bytes_in - self.bytes_out}
+
+
+class ResponseCache:
+    """In-process LRU cache of successful responses with a time to live per resource"""
+
+    def __init__(self, max_entries=DEFAULT_CACHE_ENTRIES, default_ttl=DEFAULT_CACHE_TTL, ttls=None):
+        """ResponseCache
+
+        Args:
+            max_entries (int, optional): Entries kept before the least recently used is evicted. Defaults to DEFAULT_CACHE_ENTRIES.
+            default_ttl (float, optional): Seconds an entry stays valid. Defaults to DEFAULT_CACHE_TTL.
+            ttls (dict, optional): Seconds per resource, overriding default_ttl, e.g. {"MACROS": 3600, "WEBHOOK_TYPES": 86400}.
+
+            Resources are the bootstrap resource types passed to fetch_resources (MACROS, CLIENT_QUEUES, UM_STATUSES, ...)
+            and WEBHOOK_TYPES. Cached responses are shared between callers, so their result should be treated as read-only.
+        """
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls) if ttls is not None else {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl(self, resource):
+        """Returns the time to live in seconds for a resource"""
+        return self.ttls.get(resource, self.default_ttl)
+
+    def get(self, cache_key):
+        """Returns the cached response for a key, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[cache_key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[2]
+
+    def set(self, cache_key, response, resource=None):
+        """Stores a response under a key, evicting the least recently used entries beyond max_entries"""
+        ttl = self.ttl(resource)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[cache_key] = (time.monotonic() + ttl, resource, response)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, resource=None):
+        """
+        Drops cached entries.
+
+        Args:
+            resource (string, optional): Only drop entries for this resource (e.g. "MACROS"). Defaults to None - drop everything.
+        """
+        with self._lock:
+            if resource is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k, entry in self._entries.items() if entry[1] == resource]:
+                    del self._entries[cache_key]
+
+    @property
+    def stats(self):
+        """Hit, miss and eviction counters and the current number of entries"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+
+class SqliteResponseCache:
+    """Persistent response cache in a SQLite file, shared by every process that opens the same file"""
+
+    def __init__(self, filename, max_entries=DEFAULT_DISK_CACHE_ENTRIES, max_bytes=None, default_ttl=DEFAULT_CACHE_TTL,
+                 ttls=None, namespace="", codec=None):
+        """SqliteResponseCache
+
+        Args:
+            filename (string): Path of the SQLite database file. It is created if it does not exist.
+            max_entries (int, optional): Entries kept before the least recently used are evicted. Defaults to DEFAULT_DISK_CACHE_ENTRIES.
+            max_bytes (int, optional): Upper bound on the total size of cached bodies. Defaults to None - no bound.
+            default_ttl (float, optional): Seconds an entry stays valid. Defaults to DEFAULT_CACHE_TTL.
+            ttls (dict, optional): Seconds per resource, overriding default_ttl, e.g. {"DASHBOARDS": 3600}.
+            namespace (string, optional): Prefix kept separate from other namespaces in the same file. Defaults to "".
+            codec (object, optional): JSON codec used to decode cached bodies. Defaults to None - JsonCodec.
+
+            Takes the same place as a ResponseCache (SprinklrClient(..., cache=SqliteResponseCache("sprinklr.db"))).
+            Entries are already scoped by API key and URL, and the URL includes the path, so prod0, prod2 and sandbox
+            never mix. The database runs in WAL mode, so many processes can read while one writes.
+        """
+        self.filename = filename
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = dict(ttls) if ttls is not None else {}
+        self.namespace = namespace
+        self.codec = codec if codec is not None else _default_codec
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS responses (cache_key TEXT PRIMARY KEY, resource TEXT, "
+                               "expires REAL, accessed REAL, status_code INTEGER, raw TEXT, headers TEXT)")
+            connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, so each thread opens its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def ttl(self, resource):
+        """Returns the time to live in seconds for a resource"""
+        return self.ttls.get(resource, self.default_ttl)
+
+    def get(self, cache_key):
+        """Returns the cached response for a key, or None if it is missing or expired"""
+        cache_key = self.namespace + cache_key
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute("SELECT status_code, raw, headers FROM responses WHERE cache_key = ? AND expires > ?",
+                                     (cache_key, now)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE responses SET accessed = ? WHERE cache_key = ?", (now, cache_key))
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        status_code, raw, headers = row
+        return SprinklrResponse(status_code, None, _decode_result(raw, self.codec), raw, json.loads(headers))
+
+    def set(self, cache_key, response, resource=None):
+        """Stores a response under a key, evicting expired and least recently used entries beyond the size caps"""
+        ttl = self.ttl(resource)
+        if ttl <= 0:
+            return
+        raw = response.raw
+        if raw is None:
+            raw = self.codec.dumps(response.result)
+            raw = raw.decode('utf-8') if isinstance(raw, bytes) else raw
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (self.namespace + cache_key, resource, now + ttl, now, response.status_code, raw,
+                                json.dumps(dict(response.headers))))
+            connection.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+            evicted = connection.execute("DELETE FROM responses WHERE cache_key IN (SELECT cache_key FROM responses "
+                                         "ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,)).rowcount
+            if self.max_bytes is not None:
+                evicted += connection.execute(
+                    "DELETE FROM responses WHERE cache_key IN (SELECT cache_key FROM (SELECT cache_key, SUM(LENGTH(raw)) "
+                    "OVER (ORDER BY accessed DESC) AS total FROM responses) WHERE total > ?)", (self.max_bytes,)).rowcount
+        with self._lock:
+            self.evictions += evicted
+
+    def invalidate(self, resource=None):
+        """
+        Drops cached entries in this namespace, for every process using the file.
+
+        Args:
+            resource (string, optional): Only drop entries for this resource. Defaults to None - drop everything.
+        """
+        pattern = self.namespace.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._connection() as connection:
+            if resource is None:
+                connection.execute("DELETE FROM responses WHERE cache_key LIKE ? ESCAPE '\\'", (pattern,))
+            else:
+                connection.execute("DELETE FROM responses WHERE cache_key LIKE ? ESCAPE '\\' AND resource = ?",
+                                   (pattern, resource))
+
+    @property
+    def stats(self):
+        """Hit, miss and eviction counters for this process and the current number of entries in the file"""
+        entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries}
+
+    def close(self):
+        """Closes this thread's database connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class CaseCache:
+    """LRU cache of case reads, reachable by case id, case number or channel case id"""
+
+    def __init__(self, max_cases=DEFAULT_CASE_CACHE_SIZE, ttl=DEFAULT_CASE_CACHE_TTL):
+        """CaseCache
+
+        Args:
+            max_cases (int, optional): Cases kept before the least recently used is evicted. Defaults to DEFAULT_CASE_CACHE_SIZE.
+            ttl (float, optional): Seconds a cached case stays valid. Defaults to DEFAULT_CASE_CACHE_TTL.
+
+            A case loaded through fetch_case_by_case_id, fetch_case_by_number or fetch_case_by_channel_case_id is
+            indexed by its id, case number and channel case id, so a later lookup by any of them is answered from the cache.
+            fetch_case_associated_messages is cached with its case. update_case, update_case_v1, delete_case and
+            add_comment on a CASE drop the case when made through the same client.
+        """
+        self.max_cases = max_cases
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cases = collections.OrderedDict()
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def _case_id(self, lookup, value):
+        # Called with the lock held
+        if lookup in {"id", "associatedMessages"}:
+            return str(value)
+        return self._index.get((lookup, str(value)))
+
+    def get(self, lookup, value):
+        """
+        Returns a cached response for a case lookup, or None.
+
+        Args:
+            lookup (string): One of "id", "caseNumber", "channelCaseId" or "associatedMessages" (by case id)
+            value: The id, number or channel case id looked up
+        """
+        with self._lock:
+            case_id = self._case_id(lookup, value)
+            entry = self._cases.get(case_id) if case_id is not None else None
+            if entry is not None and entry["expires"] <= time.monotonic():
+                self._drop(case_id)
+                entry = None
+            if lookup == "associatedMessages":
+                response = entry["messages"] if entry is not None else None
+            elif entry is not None and entry["case"] is not None:
+                result = {"data": entry["case"] if lookup == "id" else [entry["case"]]}
+                response = SprinklrResponse(HTTP_OK, None, result, json.dumps(result))
+            else:
+                response = None
+            if response is None:
+                self.misses += 1
+                return None
+            self._cases.move_to_end(case_id)
+            self.hits += 1
+            return response
+
+    def put(self, lookup, value, response):
+        """Stores the case (or associated messages) returned by a successful lookup"""
+        with self._lock:
+            if lookup == "associatedMessages":
+                self._entry(str(value))["messages"] = response
+            else:
+                data = response.result.get("data") if isinstance(response.result, dict) else None
+                for case in data if isinstance(data, list) else [data]:
+                    if isinstance(case, dict) and case.get("id") is not None:
+                        entry = self._entry(str(case["id"]))
+                        entry["case"] = case
+                        for field in CASE_INDEX_FIELDS:
+                            if case.get(field) is not None:
+                                self._index[(field, str(case[field]))] = str(case["id"])
+            while len(self._cases) > self.max_cases:
+                self._drop(next(iter(self._cases)))
+                self.evictions += 1
+
+    def _entry(self, case_id):
+        # Called with the lock held
+        entry = self._cases.get(case_id)
+        if entry is None:
+            entry = self._cases[case_id] = {"case": None, "messages": None}
+        entry["expires"] = time.monotonic() + self.ttl
+        self._cases.move_to_end(case_id)
+        return entry
+
+    def _drop(self, case_id):
+        # Called with the lock held
+        entry = self._cases.pop(case_id, None)
+        if entry is not None and entry["case"] is not None:
+            for field in CASE_INDEX_FIELDS:
+                self._index.pop((field, str(entry["case"].get(field))), None)
+
+    def invalidate(self, identifier=None):
+        """
+        Drops a case from the cache.
+
+        Args:
+            identifier (optional): Case id, case number or channel case id of the case. Defaults to None - drop every case.
+        """
+        with self._lock:
+            if identifier is None:
+                self._cases.clear()
+                self._index.clear()
+                return
+            self._drop(str(identifier))
+            for field in CASE_INDEX_FIELDS:
+                case_id = self._index.get((field, str(identifier)))
+                if case_id is not None:
+                    self._drop(case_id)
+
+    @property
+    def stats(self):
+        """Hit, miss and eviction counters and the current number of cases"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._cases)}
+
+
+class SingleFlight:
+    """Lets identical calls that are in flight at the same time share a single execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, function, deadline=None):
+        """
+        Runs function, unless a call with the same key is already running, in which case its result is returned instead.
+
+        Args:
+            key: Identifies identical calls
+            function (callable): The call to make
+            deadline (float, optional): time.monotonic() value after which waiting for a call already in flight
+                raises concurrent.futures.TimeoutError. Defaults to None - the caller's within_deadline() budget, if any.
+
+        Returns:
+            The result of function (from this call or the one already in flight). Exceptions are raised to every waiter.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = concurrent.futures.Future()
+        if not leader:
+            return future.result(_time_left(deadline))
+        try:
+            result = function()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key, coroutine_function, deadline=None):
+        """
+        Awaitable version of do, for coroutine functions. Cancelling one waiter does not cancel the shared call.
+        Waiting for a call already in flight past the deadline raises asyncio.TimeoutError.
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = self._tasks[key] = asyncio.ensure_future(coroutine_function())
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            return await asyncio.shield(task)
+        return await asyncio.wait_for(asyncio.shield(task), _time_left(deadline))
+
+
+# Token refreshes in flight, by credential, so concurrent callers share one refresh
+_token_refreshes = SingleFlight()
+
+# asyncio.Locks serializing the token store refreshes of AsyncSprinklrClients, by event loop and credential
+_async_refresh_locks = weakref.WeakKeyDictionary()
+
+
+def _async_refresh_lock(credential):
+    locks = _async_refresh_locks.setdefault(asyncio.get_running_loop(), {})
+    if credential not in locks:
+        locks[credential] = asyncio.Lock()
+    return locks[credential]
+
+
+class TokenManager:
+    """Keeps a client's access token fresh - refreshing it ahead of expiry, and once after a 401"""
+
+    def __init__(self, secret, redirect_uri, refresh_margin=DEFAULT_REFRESH_MARGIN, background=True):
+        """TokenManager
+
+        Args:
+            secret (string): Secret of the application, used to refresh the token
+            redirect_uri (string): Redirect URI of the application
+            refresh_margin (float, optional): Seconds before expiry at which the token is refreshed. Defaults to DEFAULT_REFRESH_MARGIN.
+            background (bool, optional): Refresh on a timer thread, so calls never wait for a refresh. Defaults to True.
+
+            Pass to SprinklrClient as token_manager. The client needs a refresh token - from fetch_access_token,
+            refresh_access_token or set_token. Expiry is recorded from expires_in; a token of unknown age is only
+            refreshed after a call fails with 401, in which case the call is sent once more with the new token.
+            Only one refresh is in flight per credential, however many threads (or clients) need it. With a token
+            store on the client, tokens refreshed by another process are picked up instead of refreshing again.
+            AsyncSprinklrClient refreshes ahead of expiry on the next call instead of on a timer.
+        """
+        self.secret = secret
+        self.redirect_uri = redirect_uri
+        self.refresh_margin = refresh_margin
+        self.background = background
+        self.client = None
+        self.refreshes = 0
+        self.failures = 0
+        self._retry_at = 0.0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def attach(self, client):
+        """Manages the tokens of a client (called by SprinklrClient)"""
+        self.client = client
+        self.schedule()
+
+    def needs_refresh(self):
+        """Indicates that the token expires within the refresh margin and can be refreshed"""
+        client = self.client
+        expires_at = client.token_expires_at
+        return (expires_at is not None and client.refresh_token is not None
+                and time.time() >= expires_at - self.refresh_margin and time.monotonic() >= self._retry_at)
+
+    def refresh(self, stale_authorization=None):
+        """
+        Refreshes the access token.
+
+        Args:
+            stale_authorization (string, optional): Authorization header of a failed call. If the token has been
+                refreshed since then, it is not refreshed again. Defaults to None - always refresh.
+
+        Returns:
+            boolean: True if the client holds a fresh token
+        """
+        client = self.client
+        if self._refreshed_since(stale_authorization):
+            return True
+        if client.refresh_token is None:
+            return False
+        response = _token_refreshes.do(self._credential(), functools.partial(
+            client._refresh_tokens, "POST (Refresh)", self.secret, self.redirect_uri, client.refresh_token))
+        return self._apply(response)
+
+    async def refresh_async(self, stale_authorization=None):
+        """refresh() for an AsyncSprinklrClient"""
+        client = self.client
+        if self._refreshed_since(stale_authorization):
+            return True
+        if client.refresh_token is None:
+            return False
+        response = await _token_refreshes.do_async(self._credential(), functools.partial(
+            client._refresh_tokens, "POST (Refresh)", self.secret, self.redirect_uri, client.refresh_token))
+        return self._apply(response)
+
+    def _refreshed_since(self, stale_authorization):
+        return stale_authorization is not None and self.client._default_headers.get('Authorization') != stale_authorization
+
+    def _credential(self):
+        return self.client.path, self.client.key, self.client.refresh_token
+
+    def _apply(self, response):
+        # Every caller sharing a refresh applies the same token, so applying it more than once is harmless
+        if not response:
+            with self._lock:
+                self.failures += 1
+                self._retry_at = time.monotonic() + DEFAULT_REFRESH_RETRY
+            logging.error("Token refresh failed: " + str(response.status_message))
+            return False
+        with self._lock:
+            stored = self.client._default_headers.get('Authorization') == "Bearer " + response.result["access_token"]
+            if not stored:
+                self.refreshes += 1
+                self._retry_at = 0.0
+        if not stored:
+            self.client._store_token(response.result)
+        return True
+
+    def schedule(self):
+        """(Re)arms the background refresh for the client's current token"""
+        client = self.client
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.background or client is None or client.token_expires_at is None \
+                    or isinstance(client, AsyncSprinklrClient):
+                return
+            delay = max(0.0, client.token_expires_at - self.refresh_margin - time.time(),
+                        self._retry_at - time.monotonic())
+            self._timer = threading.Timer(delay, self._refresh_in_background)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _refresh_in_background(self):
+        try:
+            refreshed = self.refresh()
+        except Exception:
+            logging.exception("Token refresh failed")
+            refreshed = False
+        if not refreshed and self.client.token_expires_at is not None:
+            # Keep trying until the token expires - after that, the next 401 triggers a refresh
+            with self._lock:
+                self._retry_at = time.monotonic() + DEFAULT_REFRESH_RETRY
+            if time.time() + DEFAULT_REFRESH_RETRY < self.client.token_expires_at:
+                self.schedule()
+
+    @property
+    def stats(self):
+        """Refreshes made and failed, and seconds until the current token expires (None if unknown)"""
+        expires_at = self.client.token_expires_at if self.client is not None else None
+        with self._lock:
+            return {"refreshes": self.refreshes, "failures": self.failures,
+                    "expires_in": None if expires_at is None else max(0.0, expires_at - time.time())}
+
+    def close(self):
+        """Stops the background refresh"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+def _stored_tokens(result):
+    """Token endpoint result in the form kept by token stores (expiry as a wall clock time)"""
+    expires_in = result.get("expires_in")
+    return {"access_token": result["access_token"], "refresh_token": result.get("refresh_token"),
+            "token_type": result.get("token_type"),
+            "expires_at": time.time() + float(expires_in) if expires_in is not None else None}
+
+
+def _token_result(tokens):
+    """Stored tokens in the form returned by the token endpoint"""
+    expires_at = tokens.get("expires_at")
+    return {"access_token": tokens["access_token"], "refresh_token": tokens.get("refresh_token"),
+            "token_type": tokens.get("token_type"),
+            "expires_in": None if expires_at is None else max(0.0, expires_at - time.time())}
+
+
+class MemoryTokenStore:
+    """Token store within a single process - the reference for the token store interface"""
+
+    def __init__(self):
+        """MemoryTokenStore
+
+            A token store lets every client using the same credential (API key and environment) share one set of
+            tokens, so only one of them refreshes. Stores implement:
+                get(credential) - the stored tokens (dict with access_token, refresh_token, token_type and expires_at,
+                    a time.time() value or None), or None
+                put(credential, tokens) - stores tokens
+                lock(credential) - context manager held while refreshing, excluding every other user of the store.
+                    It must be re-entrant within a thread, as put() is called while it is held.
+            FileTokenStore and SqliteTokenStore share tokens between processes; an external store (e.g. Redis) can be
+            plugged in by implementing the same three methods. This class stands in for one in a single process.
+        """
+        self._tokens = {}
+        self._lock = threading.RLock()
+
+    def get(self, credential):
+        with self._lock:
+            tokens = self._tokens.get(credential)
+            return dict(tokens) if tokens is not None else None
+
+    def put(self, credential, tokens):
+        with self._lock:
+            self._tokens[credential] = dict(tokens)
+
+    def lock(self, credential):
+        return self._lock
+
+
+class FileTokenStore:
+    """Token store in a JSON file, locked while a token is refreshed so one process refreshes for all"""
+
+    def __init__(self, filename):
+        """FileTokenStore
+
+        Args:
+            filename (string): Path of the JSON file. It is created if it does not exist; a .lock file is kept next to it.
+
+            Writes replace the file atomically, so readers never see a partial file. See MemoryTokenStore for the interface.
+        """
+        self.filename = filename
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._lock_file = None
+
+    def get(self, credential):
+        try:
+            with open(self.filename, encoding="utf-8") as file:
+                tokens = json.load(file).get(credential)
+        except (OSError, ValueError):
+            return None
+        return tokens
+
+    def put(self, credential, tokens):
+        with self.lock(credential):
+            try:
+                with open(self.filename, encoding="utf-8") as file:
+                    stored = json.load(file)
+            except (OSError, ValueError):
+                stored = {}
+            stored[credential] = dict(tokens)
+            temporary = f'{self.filename}.{os.getpid()}.tmp'
+            with open(temporary, "w", encoding="utf-8") as file:
+                json.dump(stored, file)
+            os.replace(temporary, self.filename)
+
+    @contextlib.contextmanager
+    def lock(self, credential=None):
+        # One lock for the whole file; re-entrant within a thread, exclusive between threads and processes
+        with self._lock:
+            if self._depth == 0:
+                self._lock_file = open(self.filename + ".lock", "a+b")
+                _lock_file(self._lock_file)
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    _unlock_file(self._lock_file)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+
+def _lock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+
+def _unlock_file(file):
+    if fcntl is not None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SqliteTokenStore:
+    """Token store in a SQLite file, shared by every process that opens the same file"""
+
+    def __init__(self, filename):
+        """SqliteTokenStore
+
+        Args:
+            filename (string): Path of the SQLite database file. It is created if it does not exist.
+
+            lock() holds a write transaction, so one process at a time refreshes. See MemoryTokenStore for the interface.
+        """
+        self.filename = filename
+        self._local = threading.local()
+        self._connection().execute("CREATE TABLE IF NOT EXISTS tokens (credential TEXT PRIMARY KEY, tokens TEXT, "
+                                   "updated REAL)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, so each thread opens its own. Transactions are
+        # only opened by lock().
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.filename, timeout=60, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+            self._local.depth = 0
+        return connection
+
+    def get(self, credential):
+        row = self._connection().execute("SELECT tokens FROM tokens WHERE credential = ?", (credential,)).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, credential, tokens):
+        self._connection().execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?)",
+                                   (credential, json.dumps(tokens), time.time()))
+
+    @contextlib.contextmanager
+    def lock(self, credential=None):
+        connection = self._connection()
+        if self._local.depth == 0:
+            connection.execute("BEGIN IMMEDIATE")
+        self._local.depth += 1
+        try:
+            yield
+        except BaseException:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                connection.execute("ROLLBACK")
+            raise
+        else:
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                connection.execute("COMMIT")
+
+    def close(self):
+        """Closes this thread's database connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class SearchBatcher:
+    """Collects single id lookups from many callers and resolves them with batched searches"""
+
+    def __init__(self, client, entity_type, id_field="id", batch_size=DEFAULT_ID_BATCH_SIZE, window=DEFAULT_BATCH_WINDOW,
+                 concurrency=DEFAULT_BULK_CONCURRENCY):
+        """SearchBatcher
+
+        Args:
+            client (SprinklrClient): Client used to run the searches. An AsyncSprinklrClient is not supported - use
+                its search_by_ids instead.
+            entity_type (string): Entity type to search, e.g. CASE or MESSAGE
+            id_field (string, optional): Field holding the id in both the search filter and the results. Defaults to "id".
+            batch_size (int, optional): Number of ids per search request. Defaults to DEFAULT_ID_BATCH_SIZE.
+            window (float, optional): Seconds to wait for more lookups before searching. Defaults to DEFAULT_BATCH_WINDOW.
+            concurrency (int, optional): Batches searched at once. Defaults to DEFAULT_BULK_CONCURRENCY.
+
+            Lookups are sent as soon as batch_size ids are waiting, or once the window has passed since the first one.
+            e.g. batcher = SearchBatcher(client, "CASE"); case = batcher.get(case_id)
+        """
+        if isinstance(client, AsyncSprinklrClient):
+            raise TypeError("SearchBatcher needs a SprinklrClient - use AsyncSprinklrClient.search_by_ids instead")
+        self.client = client
+        self.entity_type = entity_type
+        self.id_field = id_field
+        self.batch_size = batch_size
+        self.window = window
+        self._pending = {}
+        self._timer = None
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def submit(self, entity_id):
+        """
+        Queues a lookup.
+
+        Args:
+            entity_id: Id of the entity to fetch
+
+        Returns:
+            concurrent.futures.Future: resolves to the record, or None if no entity has that id.
+            Raises SprinklrError if the search fails.
+        """
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._pending.setdefault(entity_id, []).append(future)
+            if len(self._pending) >= self.batch_size:
+                self._dispatch()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def get(self, entity_id, timeout=None):
+        """Looks up a single entity, waiting for its batch to complete. Returns the record or None."""
+        return self.submit(entity_id).result(timeout)
+
+    def flush(self):
+        """Sends all waiting lookups now"""
+        with self._lock:
+            self._dispatch()
+
+    def close(self):
+        """Sends all waiting lookups and stops the background worker"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _dispatch(self):
+        # Called with the lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            self._executor.submit(self._resolve, pending)
+
+    def _resolve(self, pending):
+        try:
+            records = self.client.search_by_ids(self.entity_type, list(pending), self.id_field, self.batch_size)
+            if inspect.isawaitable(records):
+                # e.g. a SprinklrClientPool over AsyncSprinklrClients
+                records.close()
+                raise TypeError("SearchBatcher needs a SprinklrClient - use AsyncSprinklrClient.search_by_ids instead")
+        except Exception as exc:
+            for futures in pending.values():
+                for future in futures:
+                    future.set_exception(exc)
+            return
+        for entity_id, futures in pending.items():
+            for future in futures:
+                future.set_result(records.get(entity_id))
+
+
+def _is_url(item):
+    return isinstance(item, str) and item.startswith(("http://", "https://"))
+
+
+def _asset_inputs(inputs, recursive=False):
+    """Expands a directory, path, URL or list of them into the individual files and URLs to ingest"""
+    if isinstance(inputs, (str, os.PathLike)):
+        inputs = [inputs]
+    for item in inputs:
+        if _is_url(item):
+            yield item
+        elif os.path.isdir(item):
+            for root, directories, files in os.walk(item):
+                directories[:] = sorted(directory for directory in directories if recursive and directory[0] != ".")
+                for file_name in sorted(files):
+                    if file_name[0] != ".":
+                        yield os.path.join(root, file_name)
+        else:
+            yield os.fspath(item)
+
+
+def _asset_content_type(item):
+    """SAM content type for a file or URL - IMAGE or VIDEO by MIME type, otherwise FILE (files) or LINK (URLs)"""
+    mime_type = mimetypes.guess_type(urllib.parse.urlparse(item).path if _is_url(item) else item)[0] or ""
+    if mime_type.startswith("image/"):
+        return "IMAGE"
+    if mime_type.startswith("video/"):
+        return "VIDEO"
+    return "LINK" if _is_url(item) else "FILE"
+
+
+def _default_asset_data(item, content_type, upload_tracker_id, upload_result, content_hash=None):
+    """create_asset request for an uploaded file or URL, recording the content hash (if known) as a custom property"""
+    name = os.path.basename(urllib.parse.urlparse(item).path if _is_url(item) else item) or item
+    asset_data = {"name": name, "assetType": content_type, "uploadTrackerId": upload_tracker_id}
+    if content_hash is not None:
+        asset_data["customProperties"] = {ASSET_HASH_FIELD: [content_hash]}
+    return asset_data
+
+
+def _result_id(result):
+    """Id of the entity in a create response ({"data": {"id": ...}} or {"id": ...})"""
+    data = result.get("data", result) if isinstance(result, dict) else None
+    if isinstance(data, dict):
+        return data.get("id", data.get("assetId"))
+    return None
+
+
+def _hash_content(source, algorithm="sha256"):
+    """Hex digest of a file path, binary file object or bytes, read in chunks"""
+    digest = hashlib.new(algorithm)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        digest.update(source)
+    elif hasattr(source, "read"):
+        position = source.tell() if source.seekable() else None
+        for chunk in iter(functools.partial(source.read, STREAM_CHUNK_SIZE), b""):
+            digest.update(chunk)
+        if position is not None:
+            source.seek(position)
+    else:
+        with open(source, "rb") as file:
+            for chunk in iter(functools.partial(file.read, STREAM_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetCatalog:
+    """Local catalog of SAM assets by content hash, in a SQLite file, so the same media is not uploaded twice"""
+
+    def __init__(self, filename, hash_field=ASSET_HASH_FIELD, algorithm="sha256"):
+        """AssetCatalog
+
+        Args:
+            filename (string): Path of the SQLite database file. It is created if it does not exist.
+            hash_field (string, optional): Field of a SAM asset holding its content hash, read by sync(). It is looked
+                for on the asset and in the objects it contains (e.g. custom properties). Defaults to ASSET_HASH_FIELD,
+                the custom property ingest_assets writes.
+            algorithm (string, optional): hashlib algorithm used for content hashes. Defaults to "sha256".
+
+            Pass to ingest_assets (catalog=...) to skip files already in SAM and record the assets it creates. The
+            assets it creates carry their content hash, so sync() can rebuild a new or lost catalog from SAM search
+            results. Only ingest_assets consults the catalog - asset_upload and create_asset do not. The database
+            runs in WAL mode, so several processes can share one catalog.
+        """
+        self.filename = filename
+        self.hash_field = hash_field
+        self.algorithm = algorithm
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        with self._connection() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS assets (content_hash TEXT PRIMARY KEY, asset_id TEXT, "
+                               "name TEXT, updated REAL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS assets_asset_id ON assets (asset_id)")
+
+    def _connection(self):
+        # sqlite3 connections cannot be shared between threads, so each thread opens its own
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.filename, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def content_hash(self, source):
+        """
+        Hashes media the way the catalog keys it.
+
+        Args:
+            source: File path, binary file object or bytes
+
+        Returns:
+            string: hex digest of the content
+        """
+        return _hash_content(source, self.algorithm)
+
+    def get(self, content_hash):
+        """Returns the asset id recorded for a content hash, or None"""
+        row = self._connection().execute("SELECT asset_id FROM assets WHERE content_hash = ?",
+                                         (content_hash,)).fetchone()
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    def lookup(self, source):
+        """
+        Looks up media by content.
+
+        Returns:
+            tuple: (content hash, asset id or None)
+        """
+        content_hash = self.content_hash(source)
+        return content_hash, self.get(content_hash)
+
+    def add(self, content_hash, asset_id, name=None):
+        """Records the asset holding some content"""
+        with self._connection() as connection:
+            connection.execute("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                               (content_hash, str(asset_id), name, time.time()))
+
+    def remove(self, asset_id):
+        """Forgets an asset, e.g. after delete_asset"""
+        with self._connection() as connection:
+            connection.execute("DELETE FROM assets WHERE asset_id = ?", (str(asset_id),))
+
+    def sync(self, client, filter=None, page_size=DEFAULT_ID_BATCH_SIZE):
+        """
+        Seeds and refreshes the catalog by paging through SAM search results.
+
+        Args:
+            client (SprinklrClient): Client used to search
+            filter (JSON object, optional): SAM search request. Defaults to None - every asset.
+            page_size (int, optional): Assets per page. Defaults to DEFAULT_ID_BATCH_SIZE.
+
+        Returns:
+            dict: {"assets": assets seen, "added": assets recorded with a content hash, "removed": catalog entries
+            dropped}. Entries whose asset no longer exists are only dropped when filter is None (a full listing).
+            Raises SprinklrError if a search fails.
+        """
+        seen = {}
+        for record in client.iter_search("SAM", filter if filter is not None else {}, page_size):
+            self._see(seen, record)
+        return self._apply_sync(seen, filter is None)
+
+    async def sync_async(self, client, filter=None, page_size=DEFAULT_ID_BATCH_SIZE):
+        """sync() for an AsyncSprinklrClient"""
+        seen = {}
+        async for record in client.iter_search("SAM", filter if filter is not None else {}, page_size):
+            self._see(seen, record)
+        return self._apply_sync(seen, filter is None)
+
+    def _see(self, seen, record):
+        if isinstance(record, dict) and record.get("id") is not None:
+            seen[str(record["id"])] = (self._record_hash(record), record.get("name"))
+
+    def _record_hash(self, record):
+        content_hash = record.get(self.hash_field)
+        for value in record.values():
+            if not content_hash and isinstance(value, dict):
+                content_hash = value.get(self.hash_field)
+        # Custom property values are lists
+        if isinstance(content_hash, list):
+            content_hash = content_hash[0] if content_hash else None
+        return content_hash or None
+
+    def _apply_sync(self, seen, full):
+        now = time.time()
+        with self._connection() as connection:
+            hashed = [(content_hash, asset_id, name, now) for asset_id, (content_hash, name) in seen.items() if content_hash]
+            connection.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)", hashed)
+            removed = 0
+            if full:
+                known = [row[0] for row in connection.execute("SELECT DISTINCT asset_id FROM assets")]
+                gone = [(asset_id,) for asset_id in known if asset_id not in seen]
+                removed = connection.executemany("DELETE FROM assets WHERE asset_id = ?", gone).rowcount
+        return {"assets": len(seen), "added": len(hashed), "removed": removed}
+
+    @property
+    def stats(self):
+        """Hit and miss counters for this process and the number of assets in the catalog"""
+        entries = self._connection().execute("SELECT COUNT(*) FROM assets").fetchone()[0]
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        """Closes this thread's database connection"""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class AssetPipeline:
+    """Gets many files or URLs into the Social Asset Manager - upload, create and group - with bounded concurrency"""
+
+    def __init__(self, client, upload_workers=DEFAULT_UPLOAD_WORKERS, create_workers=DEFAULT_CREATE_WORKERS,
+                 retry_policy=None, asset_data=None, group_field="assetIds", catalog=None):
+        """AssetPipeline
+
+        Args:
+            client (SprinklrClient or AsyncSprinklrClient): Client used for the calls
+            upload_workers (int, optional): Uploads / imports in flight at once. Defaults to DEFAULT_UPLOAD_WORKERS.
+            create_workers (int, optional): create_asset calls in flight at once. Defaults to DEFAULT_CREATE_WORKERS.
+            retry_policy (RetryPolicy, optional): How often and how long to wait before a failed stage is attempted again.
+                Only transient failures (no response, or a status in retry_statuses) of the upload are retried. Creating
+                an asset or group is not idempotent, so it is only retried after a 429, which the API rejects before
+                creating anything. Defaults to RetryPolicy().
+            asset_data (callable, optional): Builds the create_asset request, called as
+                asset_data(input, content_type, upload_tracker_id, upload_result, content_hash). content_hash is None
+                for URLs and when there is no catalog. Defaults to a request with the file name, content type, upload
+                tracker id and, if known, the content hash as the ASSET_HASH_FIELD custom property.
+            group_field (string, optional): Field of the asset group request that receives the asset ids. Defaults to "assetIds".
+            catalog (AssetCatalog, optional): Files whose content is already in the catalog are not uploaded again,
+                and new assets are recorded in it. Defaults to None.
+
+            Each input is uploaded (asset_upload for files, import_asset for URLs) and then created as an asset.
+            Uploads of later inputs overlap with asset creation for earlier ones. Each stage is retried on its own,
+            so a failed create does not upload the file again. A create that fails without a response or with a 5xx
+            may still have created the asset, so it is reported in "failed" rather than sent again.
+        """
+        self.client = client
+        self.upload_workers = upload_workers
+        self.create_workers = create_workers
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.asset_data = asset_data or _default_asset_data
+        self.group_field = group_field
+        self.catalog = catalog
+
+    def run(self, inputs, group=None, recursive=False):
+        """
+        Ingests every input.
+
+        Args:
+            inputs: A directory, file path or URL, or a list of them
+            group (JSON object, optional): Asset group to create from the new assets (their ids are added under
+                group_field). Defaults to None - no group.
+            recursive (bool, optional): Include files in subdirectories of a directory. Defaults to False.
+
+        Returns:
+            dict: manifest - "assets" maps each input to its asset id, "failed" maps inputs that could not be ingested to
+            {"stage", "status_code", "status_message"}, "deduplicated" lists inputs found in the catalog instead of
+            being uploaded, and "group_id" is the id of the created group (or None). A failed group is reported as "group_error".
+        """
+        items = list(_asset_inputs(inputs, recursive))
+        upload_slots = threading.BoundedSemaphore(self.upload_workers)
+        create_slots = threading.BoundedSemaphore(self.create_workers)
+
+        def call(method, *args):
+            return self.client._call_for_response(method, args)
+
+        def ingest(item):
+            content_hash, cataloged = self._catalog_lookup(item)
+            if cataloged is not None:
+                return cataloged
+            content_type = _asset_content_type(item)
+            upload_tracker_ids = []
+            with upload_slots:
+                response = self._attempt("upload", item, lambda: call(*self._upload_call(item, content_type,
+                                                                                          upload_tracker_ids)))
+            if not response:
+                return "upload", response
+            asset_data = self.asset_data(item, content_type, upload_tracker_ids[-1], response.result, content_hash)
+            with create_slots:
+                response = self._attempt("create", item, lambda: call(self.client.create_asset, asset_data))
+            return self._catalog_add(item, content_hash, response)
+
+        executor = ThreadPoolExecutor(max_workers=max(1, self.upload_workers + self.create_workers))
+        try:
+            outcomes = list(executor.map(_carry_context(ingest), items))
+        finally:
+            executor.shutdown(wait=False)
+        manifest = self._manifest(items, outcomes)
+        if group is not None and manifest["assets"]:
+            group_request = self._group_request(group, manifest)
+            self._add_group(manifest, self._attempt("group", "asset group",
+                                                    lambda: call(self.client.create_asset_group, group_request)))
+        return manifest
+
+    async def run_async(self, inputs, group=None, recursive=False):
+        """run() for an AsyncSprinklrClient"""
+        items = list(_asset_inputs(inputs, recursive))
+        upload_slots = asyncio.Semaphore(self.upload_workers)
+        create_slots = asyncio.Semaphore(self.create_workers)
+
+        async def call(method, *args):
+            try:
+                return await method(*args)
+            except Exception as exc:
+                logging.exception("ingest_assets - " + str(args))
+                return SprinklrResponse(-1, str(exc))
+
+        async def ingest(item):
+            content_hash, cataloged = self._catalog_lookup(item)
+            if cataloged is not None:
+                return cataloged
+            content_type = _asset_content_type(item)
+            upload_tracker_ids = []
+            async with upload_slots:
+                response = await self._attempt_async("upload", item, lambda: call(*self._upload_call(
+                    item, content_type, upload_tracker_ids)))
+            if not response:
+                return "upload", response
+            asset_data = self.asset_data(item, content_type, upload_tracker_ids[-1], response.result, content_hash)
+            async with create_slots:
+                response = await self._attempt_async("create", item, lambda: call(self.client.create_asset, asset_data))
+            return self._catalog_add(item, content_hash, response)
+
+        outcomes = await asyncio.gather(*(ingest(item) for item in items))
+        manifest = self._manifest(items, outcomes)
+        if group is not None and manifest["assets"]:
+            group_request = self._group_request(group, manifest)
+            self._add_group(manifest, await self._attempt_async(
+                "group", "asset group", lambda: call(self.client.create_asset_group, group_request)))
+        return manifest
+
+    def _catalog_lookup(self, item):
+        """
+        Returns (content hash, outcome) for a file - the outcome is set if the catalog already holds the content.
+        URLs are not looked up.
+        """
+        if self.catalog is None or _is_url(item):
+            return None, None
+        try:
+            content_hash, asset_id = self.catalog.lookup(item)
+        except OSError as exc:
+            return None, ("upload", SprinklrResponse(-1, "Error - file not found: " + str(exc)))
+        if asset_id is None:
+            return content_hash, None
+        logging.info("ingest_assets - " + str(item) + " is already asset " + asset_id)
+        return content_hash, ("catalog", SprinklrResponse(HTTP_OK, None, {"data": {"id": asset_id}}))
+
+    def _catalog_add(self, item, content_hash, response):
+        asset_id = _result_id(response.result) if response else None
+        if content_hash is not None and asset_id is not None:
+            self.catalog.add(content_hash, asset_id, os.path.basename(item))
+        return "create", response
+
+    def _upload_call(self, item, content_type, upload_tracker_ids):
+        """Returns (method, *args) uploading one input, with a new upload tracker id for every attempt"""
+        upload_tracker_id = uuid.uuid4().hex
+        upload_tracker_ids.append(upload_tracker_id)
+        if _is_url(item):
+            return self.client.import_asset, content_type, item, upload_tracker_id
+        return self.client.asset_upload, content_type, upload_tracker_id, item
+
+    def _attempt(self, stage, item, call):
+        """Runs one stage for one input, retrying transient failures"""
+        attempt = 1
+        while True:
+            response = call()
+            delay = self._retry_delay(stage, item, response, attempt)
+            if delay is None:
+                return response
+            time.sleep(delay)
+            attempt += 1
+
+    async def _attempt_async(self, stage, item, call):
+        attempt = 1
+        while True:
+            response = await call()
+            delay = self._retry_delay(stage, item, response, attempt)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, stage, item, response, attempt):
+        """Returns the seconds to wait before trying a failed stage again, or None if it should not be retried"""
+        if stage == "upload":
+            transient = response.status_code == -1 or response.status_code in self.retry_policy.retry_statuses
+        else:
+            # A create that timed out or hit a 5xx may have succeeded, and sending it again would duplicate the asset
+            transient = response.status_code == HTTP_TOO_MANY_REQUESTS
+        if response or not transient or attempt >= self.retry_policy.max_attempts:
+            return None
+        delay = self.retry_policy.delay(attempt, response.headers)
+        logging.warning("ingest_assets - " + stage + " of " + str(item) + " failed (" + str(response.status_code)
+                        + "), retrying in " + str(round(delay, 2)) + "s")
+        return delay
+
+    def _manifest(self, items, outcomes):
+        manifest = {"assets": {}, "failed": {}, "deduplicated": [], "group_id": None}
+        for item, (stage, response) in zip(items, outcomes):
+            asset_id = _result_id(response.result) if response else None
+            if asset_id is not None:
+                manifest["assets"][item] = asset_id
+                if stage == "catalog":
+                    manifest["deduplicated"].append(item)
+            else:
+                status_message = response.status_message if not response else "No asset id in create response"
+                manifest["failed"][item] = {"stage": stage, "status_code": response.status_code,
+                                            "status_message": status_message}
+        return manifest
+
+    def _group_request(self, group, manifest):
+        group_request = dict(group)
+        group_request[self.group_field] = list(manifest["assets"].values())
+        return group_request
+
+    def _add_group(self, manifest, response):
+        if response:
+            manifest["group_id"] = _result_id(response.result)
+        else:
+            manifest["group_error"] = response.status_message
+
 
 class SprinklrClient:
     """Sprinklr Client Library"""
 
-    def __init__(self, key, path=None, access_token=None):
+    def __init__(self, key, path=None, access_token=None, transport=None, pool_size=DEFAULT_POOL_SIZE, rate_limiter=None,
+                 retry_policy=None, return_responses=False, cache=None, case_cache=None, coalesce_requests=True,
+                 codec=None, lazy_parsing=False, keep_raw=True, compress_requests=None, token_manager=None,
+                 token_store=None, priority=PRIORITY_INTERACTIVE, concurrency_limiter=None, timeouts=None):
         """SprinklrClient
 
         Args:
             key (string): The API Key for the application, obtained at https://developer.sprinklr.com 
             path (string, optional): [description]. Defaults to None - Only necessary for environments other than Production.
             access_token (string, optional): Unique access token representing a user. Defaults to None, but needed most calls
+            transport (object, optional): Transport used to send requests. Defaults to None - a pooled HttpTransport is created.
+            pool_size (int, optional): Keep-alive connections per host for the default transport. Defaults to DEFAULT_POOL_SIZE.
+            rate_limiter (RateLimiter or bool, optional): Paces calls to stay within the key's quotas. True uses the limiter
+                shared by all clients with the same key (RateLimiter.for_key). Defaults to None - calls are not paced.
+            retry_policy (RetryPolicy or bool, optional): Retries transient failures (429, 5xx, connection errors).
+                True uses a default RetryPolicy. Defaults to None - calls are not retried.
+            return_responses (bool, optional): Return a SprinklrResponse from each call instead of a boolean. Defaults to False.
+            cache (ResponseCache, SqliteResponseCache or bool, optional): Caches near-static metadata (fetch_resources and its
+                wrappers, fetch_webhook_types, dashboards and custom fields). True uses a default in-process ResponseCache.
+                Defaults to None - nothing is cached.
+            case_cache (CaseCache or bool, optional): Caches case reads, dropping a case when it is changed through this client.
+                True uses a default CaseCache. Defaults to None - cases are not cached.
+            coalesce_requests (bool, optional): Identical GETs (same URL and credentials) made at the same time share
+                a single round trip and all callers receive the same response. Defaults to True.
+            codec (object, optional): JSON codec with loads(bytes) and dumps(object) methods, e.g. OrjsonCodec().
+                Defaults to None - JsonCodec (standard library).
+            lazy_parsing (bool, optional): Parse response bodies the first time result is read, so calls whose result is
+                never used (e.g. update_case, publish_reply) skip parsing. Defaults to False.
+            keep_raw (bool, optional): Keep the response text as raw alongside the parsed result. Set to False to hold
+                a single copy of large responses. Defaults to True.
+            compress_requests (RequestCompressor or bool, optional): Gzips POST and PUT bodies above a size threshold.
+                Pass True for the defaults; compressor.stats reports the bytes saved. Defaults to None.
+            token_manager (TokenManager, optional): Refreshes the access token ahead of expiry and retries a call once
+                after a 401 with a refreshed token. Defaults to None.
+            token_store (object, optional): Shares tokens with every client (in any process) using the same key and
+                path, e.g. FileTokenStore or SqliteTokenStore. Stored tokens replace access_token when the client is
+                created, and refreshes are coordinated through the store. Defaults to None.
+            priority (string, optional): Priority class of the client's calls within its rate limiter, e.g.
+                PRIORITY_BATCH for an export job sharing a key with interactive users. Calls made inside a
+                prioritized() block use that block's class instead. Raises ValueError if the rate limiter has no such
+                class. Defaults to PRIORITY_INTERACTIVE.
+            concurrency_limiter (ConcurrencyLimiter or bool, optional): Adapts the calls fetch_many keeps in flight to
+                response latency and 429/5xx errors instead of a fixed count. True uses a default ConcurrencyLimiter;
+                its limit and stats report the current level. Defaults to None.
+            timeouts (dict, optional): (connect, read) timeouts in seconds by endpoint family - "default", "report",
+                "stream" and "upload" (see ENDPOINT_FAMILIES) - replacing those in DEFAULT_TIMEOUTS. None, for a family
+                or for either timeout of the pair, waits indefinitely. Defaults to None.
 
             Most calls return a boolean indicating success or failure. It should not be necessary to wrap API calls in a try block.
             
@@ -25,19 +2790,28 @@ class SprinklrClient:
 
             On failure (return is false), status_message will contain the error text.
 
+            With return_responses=True, each call instead returns an immutable SprinklrResponse (status_code, status_message,
+            result, raw, headers, elapsed and cursor) and the client's own properties are left untouched, so a single
+            client and its connection pool can be shared by many threads.
+
         """
         self.last_status_code = HTTP_OK
         self.encoding = None
+        self.key = key
         self.access_token = access_token
         self.refresh_token = None
         self.token_type = None
         self.expires_in = None
+        self.token_expires_at = None
+        self.token_manager = None
         self.status_code = None
         self.status_message = None
-        self.result = None
-        self.key = key
-        self.raw = None
+        self._body = None
         self.search_cursor = None
+        self.last_response = None
+        self.return_responses = return_responses
+        # Worker threads started by the client (e.g. fetch_many) switch to response mode through this
+        self._thread_state = threading.local()
         # current valid path options are (None), prod0, prod2, or sandbox
         self.path = ""
         if path is not None:
@@ -45,136 +2819,538 @@ class SprinklrClient:
                 self.path = path
             else:
                 self.path = path + "/"
+        self.transport = transport if transport is not None else HttpTransport(pool_size=pool_size)
+        self.rate_limiter = RateLimiter.for_key(key) if rate_limiter is True else rate_limiter or None
+        self.retry_policy = RetryPolicy() if retry_policy is True else retry_policy or None
+        self.cache = ResponseCache() if cache is True else cache or None
+        self.case_cache = CaseCache() if case_cache is True else case_cache or None
+        self.single_flight = SingleFlight() if coalesce_requests else None
+        self.codec = codec if codec is not None else _default_codec
+        self.lazy_parsing = lazy_parsing
+        self.keep_raw = keep_raw
+        self.compressor = RequestCompressor() if compress_requests is True else compress_requests or None
+        self.token_store = token_store
+        # A misspelt class fails here rather than in every call
+        self.priority = _check_priority(priority, getattr(self.rate_limiter, "weights", None) or _known_priority_classes())
+        self.timeouts = dict(DEFAULT_TIMEOUTS, **(timeouts or {}))
+        self.concurrency_limiter = ConcurrencyLimiter() if concurrency_limiter is True else concurrency_limiter or None
+        if token_store is not None:
+            self._load_stored_token()
+        if token_manager is not None:
+            self.token_manager = token_manager
+            token_manager.attach(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the connections held by the client's transport"""
+        if self.token_manager is not None:
+            self.token_manager.close()
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            close()
+
+    @property
+    def result(self):
+        """Result of the last call - a Python dictionary (or list) if the response was JSON, otherwise the text"""
+        return self._body.result if self._body is not None else None
+
+    @result.setter
+    def result(self, result):
+        self._body = SprinklrResponse(self.status_code, self.status_message, result, self.raw)
+
+    @property
+    def raw(self):
+        """Text of the last response (None if the client was created with keep_raw=False)"""
+        return self._body.raw if self._body is not None else None
+
+    @raw.setter
+    def raw(self, raw):
+        self._body = SprinklrResponse(self.status_code, self.status_message, self.result, raw)
+
+    @property
+    def rate_limit_budget(self):
+        """Current quota budget (see RateLimiter.budget), or None if no rate limiter is set"""
+        if self.rate_limiter is None:
+            return None
+        return self.rate_limiter.budget
+
+    @property
+    def access_token(self):
+        return self._access_token
+
+    @access_token.setter
+    def access_token(self, access_token):
+        # The default headers only change with the token, so they are rebuilt here rather than on every call
+        self._access_token = access_token
+        self._default_headers = {'key': self.key, 'accept': 'application/json'}
+        if access_token is not None:
+            self._default_headers['Authorization'] = "Bearer " + access_token
 
 # HTTP Methods
 
-    def _make_api_request(self, verb, request_url, data = None, returns_json = True, is_file = False):
-        
-        headers = {'key': self.key,
-                   'Authorization': "Bearer " + self.access_token}
+    def _prepare_request(self, verb, data=None, returns_json=True, is_file=False):
+        """
+        Builds the headers and body for an API request.
+
+        Returns:
+        tuple: (headers, body)
+        """
+        headers = dict(self._default_headers)
 
         if verb.upper() in {"POST", "DELETE"}:
             headers['Content-Type'] = 'application/json'
             headers['cache-control'] = 'no-cache'
 
-        if returns_json:
-            headers['accept'] = 'application/json'
+        if not returns_json:
+            del headers['accept']
 
         if is_file:
-            headers["Content-Type"] = 'multipart/form-data'
+            if not isinstance(data, MultipartUpload):
+                data = MultipartUpload(data)
+            headers["Content-Type"] = data.content_type
+
+        if verb.upper() == "GET":
+            body = None
+        elif verb.upper() == "DELETE":
+            body = self.codec.dumps(data)
+        elif verb.upper() in {"POST", "PUT"}:
+            # Detect if data is a JSON object and convert to string if necessary
+            body = data if type(data) is str or is_file else self.codec.dumps(data)
+            if self.compressor is not None and not is_file:
+                body, content_encoding = self.compressor.compress(body)
+                if content_encoding is not None:
+                    headers['Content-Encoding'] = content_encoding
+        else:
+            raise ValueError("Verb must be one of Get, Delete, Post or Put")
 
-        logging.info(verb + " - URL:" + request_url)
-        logging.debug("Headers:" + str(headers))
+        return headers, body
 
-        response = None
+    def _priority(self):
+        """Returns the priority class of a call made now - the prioritized() block's, otherwise the client's"""
+        return _call_priority.get() or self.priority
 
-        try:
-            if verb.upper() == "GET":
-                response = requests.get(url=request_url, headers=headers)
-            elif verb.upper() == "DELETE":
-                response = requests.delete(url=request_url, headers=headers, data=json.dumps(data))
-            elif verb.upper() == "POST":
-                # Detect if data is a JSON object and convert to string if necessary
-                if type(data) is str:
-                    response = requests.post(url=request_url, headers=headers, data=data)
-                else:
-                    response = requests.post(url=request_url, headers=headers, data=json.dumps(data))
-            elif verb.upper() == "PUT":
-                # Detect if data is a JSON object and convert to string if necessary
-                if type(data) is str:
-                    response = requests.put(url=request_url, headers=headers, data=data)
-                else:
-                    response = requests.put(url=request_url, headers=headers, data=json.dumps(data))
-            else:
-                raise ValueError("Verb must be one of Get, Delete, Post or Put")
+    def _timeout(self, request_url, deadline=None):
+        """Returns the (connect, read) timeout for a request, shortened to the time left before the deadline"""
+        timeout = self.timeouts.get(_endpoint_family(request_url), self.timeouts["default"])
+        connect, read = timeout if timeout is not None else (None, None)
+        if deadline is None:
+            return connect, read
+        # Never 0, which requests rejects - a deadline that has passed is caught before sending
+        left = max(0.001, deadline - time.monotonic())
+        return (left if connect is None else min(connect, left)), (left if read is None else min(read, left))
 
+    def _send(self, verb, request_url, headers, body, deadline=None, **kwargs):
+        """
+        Sends a request through the transport. Extra keyword arguments (e.g. stream=True) are passed to the transport.
+        Without a deadline (a time.monotonic() value), the request waits for the rate limiter as long as necessary.
+
+        Returns:
+        tuple: (response, error message) - response is None if the request could not be completed
+        """
+        if self.rate_limiter is not None:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            if not self.rate_limiter.acquire(priority=self._priority(), timeout=timeout):
+                return None, _deadline_exceeded(verb, request_url)
+        kwargs.setdefault("timeout", self._timeout(request_url, deadline))
+        try:
+            response = self.transport.request(verb.upper(), request_url, headers=headers, data=body, **kwargs)
             logging.debug(verb + " - Response code:" + str(response.status_code))
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response.status_code, response.headers)
+            return response, None
         except ConnectionError:
-            logging.error(verb + " - Connection Error:" + request_url)
-            self.status_message = "Connection Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
-        except TimeoutError:
-            logging.error(verb + " - Timeout Error:" + request_url)
-            self.status_message = "Timeout Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
+            return None, _log_request_error(verb, request_url, "Connection Error")
+        except (TimeoutError, requests.exceptions.Timeout):
+            return None, _log_request_error(verb, request_url, "Timeout Error")
         except requests.exceptions.RequestException:
-            logging.error(verb + " - Request Error:" + request_url)
-            self.status_message = "Request Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
-
-        if response is not None:
-            self.status_code = response.status_code
-            self.raw = response.text
-            if response.text.startswith("{"):
-                self.result = json.loads(response.text)
+            return None, _log_request_error(verb, request_url, "Request Error")
+
+    def _send_with_retry(self, verb, request_url, headers, body, idempotent=False, deadline=None, **kwargs):
+        """
+        Sends a request, retrying transient failures as allowed by the retry policy.
+        deadline (a time.monotonic() value) defaults to the enclosing within_deadline() block's.
+
+        Returns:
+        tuple: (response, error message) of the last attempt
+        """
+        attempt = 1
+        reauthorized = False
+        deadline = deadline if deadline is not None else _call_deadline.get()
+        if self.token_manager is not None and self.token_manager.needs_refresh():
+            self.token_manager.refresh(headers.get('Authorization'))
+            headers = self._authorized(headers)
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None, _deadline_exceeded(verb, request_url)
+            response, error_message = self._send(verb, request_url, headers, body, deadline, **kwargs)
+            if self._unauthorized(response, reauthorized):
+                # Sent once more with a refreshed token - the refresh is shared with any other call that hit the 401
+                reauthorized = True
+                if self._reauthorize(headers.get('Authorization')) and _rewind_body(body):
+                    _close_response(response)
+                    headers = self._authorized(headers)
+                    continue
+            delay = self._retry_delay(verb, response, attempt, idempotent, deadline)
+            # A streamed body (e.g. a MultipartUpload) was consumed by the attempt and is sent again from the start
+            if delay is None or not _rewind_body(body):
+                return response, error_message
+            if response is not None:
+                _close_response(response)
+            time.sleep(delay)
+            attempt += 1
+
+    def _unauthorized(self, response, reauthorized):
+        """Indicates a call failed with 401 and can be sent again with a refreshed token"""
+        return (not reauthorized and response is not None and response.status_code == HTTP_UNAUTHORIZED
+                and (self.token_manager is not None or self.token_store is not None))
+
+    def _reauthorize(self, stale_authorization):
+        """Replaces a token rejected with 401 - refreshed by the token manager, or as stored by another client"""
+        if self.token_manager is not None:
+            return self.token_manager.refresh(stale_authorization)
+        return self._load_stored_token(stale_authorization)
+
+    def _authorized(self, headers):
+        """Returns the headers with the client's current access token, if they carry a token"""
+        authorization = self._default_headers.get('Authorization')
+        if authorization is None or headers.get('Authorization') in (None, authorization):
+            return headers
+        headers = dict(headers)
+        headers['Authorization'] = authorization
+        return headers
+
+    def _retry_delay(self, verb, response, attempt, idempotent, deadline=None):
+        """Returns the seconds to wait before retrying, or None if the call should not (or no longer can) be retried"""
+        status_code = response.status_code if response is not None else -1
+        if self.retry_policy is None or not self.retry_policy.should_retry(verb, status_code, attempt, idempotent):
+            return None
+        delay = self.retry_policy.delay(attempt, response.headers if response is not None else None)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            logging.warning(verb + " - Attempt " + str(attempt) + " failed (" + str(status_code)
+                            + "), not retrying as the deadline would pass")
+            return None
+        logging.warning(verb + " - Attempt " + str(attempt) + " failed (" + str(status_code) + "), retrying in "
+                        + str(round(delay, 2)) + "s")
+        return delay
+
+    def _parse_response(self, verb, response, error_message=None, elapsed=None):
+        """
+        Converts a transport response into a SprinklrResponse. JSON objects and arrays are decoded straight from the
+        response bytes by the client's codec.
+        """
+        if response is None:
+            return SprinklrResponse(-1, error_message, elapsed=elapsed)
+
+        status_message = None
+        if response.status_code not in {HTTP_OK, HTTP_NO_RESPONSE}:
+            status_message = response.content.decode(response.encoding or 'utf-8', errors='replace')
+            logging.error(verb + ' - Error response:' + status_message)
+
+        return SprinklrResponse.from_body(response.status_code, status_message, response.content, response.encoding,
+                                          self.codec, response.headers, elapsed, self.lazy_parsing, self.keep_raw)
+
+    def _apply_response(self, sprinklr_response):
+        """
+        Copies a SprinklrResponse onto the client's status_code, status_message, result and raw properties.
+
+        Returns:
+        boolean: True if call successful, False if not.
+        """
+        self.last_response = sprinklr_response
+        self.status_code = sprinklr_response.status_code
+        self.status_message = sprinklr_response.status_message
+        if sprinklr_response.status_code != -1:
+            # result and raw read from this response, so a lazily parsed body is only decoded if they are used
+            self._body = sprinklr_response
+        return sprinklr_response.ok
+
+    def invalidate_cache(self, resource=None):
+        """
+        Drops cached metadata so the next call fetches it again.
+
+        Args:
+            resource (string, optional): Resource to drop, e.g. "MACROS" or "WEBHOOK_TYPES". Defaults to None - drop everything.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(resource)
+
+    def _cache_lookup(self, request_url, cache_resource):
+        """Returns the cached response for a call, or None if it is not cacheable or not cached"""
+        if cache_resource is None:
+            return None
+        if type(cache_resource) is tuple:
+            if self.case_cache is None:
+                return None
+            return self.case_cache.get(cache_resource[1], cache_resource[2])
+        if self.cache is None:
+            return None
+        return self.cache.get(self._cache_key(request_url))
+
+    def _cache_update(self, request_url, sprinklr_response, cache_resource, invalidates):
+        """Caches a successful cacheable response and drops the resources a successful call invalidates"""
+        if not sprinklr_response.ok:
+            return
+        if type(cache_resource) is tuple:
+            if self.case_cache is not None:
+                self.case_cache.put(cache_resource[1], cache_resource[2], sprinklr_response)
+        elif cache_resource is not None and self.cache is not None:
+            self.cache.set(self._cache_key(request_url), sprinklr_response, cache_resource)
+        for resource in invalidates or ():
+            if type(resource) is tuple:
+                if self.case_cache is not None:
+                    self.case_cache.invalidate(resource[1])
             else:
-                self.result = response.text
+                self.invalidate_cache(resource)
 
-        if self.status_code not in {HTTP_OK, HTTP_NO_RESPONSE}:
-            logging.error(verb + ' - Error response:' + response.text)
-            self.status_message = response.text
-            return False
+    def _cache_key(self, request_url):
+        # Scoped by key as well as URL (which includes the path), so environments and applications never mix
+        return self.key + " " + request_url
+
+    def _request(self, verb, request_url, data=None, returns_json=True, is_file=False, idempotent=False,
+                 cache_resource=None, invalidates=None, deadline=None):
+        """
+        Makes an API call without touching the client's result/status properties.
+        Calls with a cache_resource are answered from the cache when possible, and cached when successful.
+        A successful call with invalidates drops those cached resources. deadline is a time.monotonic() value.
+
+        cache_resource and invalidates entries are resource names for the response cache, or ("CASE", lookup, value)
+        and ("CASE", identifier) tuples for the case cache.
+
+        Returns:
+        SprinklrResponse: outcome of the call
+        """
+        cached = self._cache_lookup(request_url, cache_resource)
+        if cached is not None:
+            return cached
+
+        headers, body = self._prepare_request(verb, data, returns_json, is_file)
+
+        logging.info(verb + " - URL:" + request_url)
+        logging.debug("Headers:" + str(headers))
+
+        execute = functools.partial(self._execute, verb, request_url, headers, body, idempotent, deadline)
+        if self.single_flight is not None and verb.upper() == "GET":
+            try:
+                sprinklr_response = self.single_flight.do(self._flight_key(request_url, headers), execute, deadline)
+            except concurrent.futures.TimeoutError:
+                # The identical call in flight did not finish within this caller's deadline
+                sprinklr_response = SprinklrResponse(-1, _deadline_exceeded(verb, request_url))
         else:
-            self.status_message = None
-            return True
+            sprinklr_response = execute()
+        self._cache_update(request_url, sprinklr_response, cache_resource, invalidates)
+        return sprinklr_response
+
+    def _execute(self, verb, request_url, headers, body, idempotent=False, deadline=None):
+        """Sends a prepared request (with retries) and parses the response"""
+        started = time.monotonic()
+        response, error_message = self._send_with_retry(verb, request_url, headers, body, idempotent, deadline)
+        return self._parse_response(verb, response, error_message, time.monotonic() - started)
 
-    def delete_request(self, request_url: str, data=None):
+    def _iter_json_items(self, verb, request_url, data, item_path):
+        """
+        Sends a read-only request and yields the elements of the array at item_path as the response body arrives.
+        Raises SprinklrError if the call fails or the body is not valid JSON. The client's result/status properties are
+        not changed.
+        """
+        headers, body = self._prepare_request(verb, data)
+
+        logging.info(verb + " - URL:" + request_url)
+        logging.debug("Headers:" + str(headers))
+
+        started = time.monotonic()
+        response, error_message = self._send_with_retry(verb, request_url, headers, body, idempotent=True, stream=True)
+        if response is None or response.status_code not in {HTTP_OK, HTTP_NO_RESPONSE}:
+            raise SprinklrError(self._parse_response(verb, response, error_message, time.monotonic() - started))
+        deadline = _call_deadline.get()
+        try:
+            parser = JsonStreamParser(item_path)
+            for chunk in _iter_content(response):
+                _check_deadline(deadline, verb, request_url)
+                yield from parser.feed(chunk)
+            yield from parser.close()
+        except ValueError as exc:
+            raise SprinklrError(SprinklrResponse(response.status_code, "Invalid JSON response: " + str(exc),
+                                                 headers=response.headers)) from exc
+        except requests.exceptions.RequestException as exc:
+            raise SprinklrError(SprinklrResponse(-1, _log_request_error(verb, request_url, "Stream Error"))) from exc
+        finally:
+            _close_response(response)
+
+    def _flight_key(self, request_url, headers):
+        # GETs only coalesce when they would be sent with the same credentials
+        return request_url, headers.get('key'), headers.get('Authorization')
+
+    def _make_api_request(self, verb, request_url, data = None, returns_json = True, is_file = False, idempotent = False,
+                          cache_resource = None, invalidates = None):
+        sprinklr_response = self._request(verb, request_url, data, returns_json, is_file, idempotent, cache_resource,
+                                          invalidates)
+        if self._returns_responses():
+            return sprinklr_response
+        return self._apply_response(sprinklr_response)
+
+    def _returns_responses(self):
+        return self.return_responses or getattr(self._thread_state, "return_responses", False)
+
+    def _fail(self, status_message):
+        """Reports a call that failed before reaching the API, as a SprinklrResponse or False depending on the mode"""
+        sprinklr_response = SprinklrResponse(-1, status_message)
+        if self._returns_responses():
+            return sprinklr_response
+        return self._apply_response(sprinklr_response)
+
+    def _track_cursor(self, result):
+        """Keeps search_cursor in step with the last search call when results are stored on the client"""
+        if not self._returns_responses():
+            self.search_cursor = self.last_response.cursor if result else None
+
+    def delete_request(self, request_url: str, data=None, invalidates=None):
         """
         Supports all delete calls for API Endpoints.
 
         Args:
         request_url (string): API Endpoint
         data (JSON object): any data necessary to indicate object to be deleted
+        invalidates (iterable, optional) cached resources to drop when the call succeeds. Defaults to None
 
         Returns:
         boolean: True if call successful, False if not. On error/failure, status_message should contain information.
         """
-        return self._make_api_request("DELETE", request_url, data)
+        return self._make_api_request("DELETE", request_url, data, invalidates=invalidates)
         
 
-    def get_request(self, request_url: str, returns_json=True):
+    def get_request(self, request_url: str, returns_json=True, cache_resource=None):
         """ Supports all GET calls for API Endpoints.
 
         Args:
             request_url (string): API endpoint
             returns_json (bool, optional): indicates if response should be JSON encoded. If true, a header is set. Defaults to False.
+            cache_resource (string or tuple, optional): name of the cacheable resource returned, used to pick its cache TTL,
+                or a ("CASE", lookup, value) case lookup. Defaults to None (not cached).
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
         """
-        return self._make_api_request("GET", request_url)
+        return self._make_api_request("GET", request_url, cache_resource=cache_resource)
 
 
-    def post_request(self, request_url: str, data: object, is_file=False):
+    def post_request(self, request_url: str, data: object, is_file=False, idempotent=False, invalidates=None):
         """
         Supports all post calls for API Endpoints.
 
         Args:
         request_url (string): API Endpoint
         data (JSON object): any data necessary to indicate object to be posted
-        is_file (bool, optional) indicates if data contains a filename that would be posted as data. Defaults to False
+        is_file (bool, optional) indicates data is a file to stream as a multipart upload - a MultipartUpload, or a file name, binary file object or bytes. Defaults to False
+        idempotent (bool, optional) indicates the endpoint only reads data, so it may be retried (see RetryPolicy.retry_safe_posts). Defaults to False
+        invalidates (iterable, optional) cached resources to drop when the call succeeds. Defaults to None
 
         Returns:
         boolean: True if call successful, False if not. On error/failure, status_message should contain information.
         """
 
-        return self._make_api_request("POST", request_url, data = data, is_file=is_file)
+        return self._make_api_request("POST", request_url, data = data, is_file=is_file, idempotent=idempotent,
+                                      invalidates=invalidates)
         
-    def put_request(self, request_url: str, data=None):
+    def put_request(self, request_url: str, data=None, invalidates=None):
         """
         Supports all put calls for API Endpoints.
 
         Args:
         request_url (string): API Endpoint
         data (JSON object): any data necessary to indicate object to be updated
+        invalidates (iterable, optional) cached resources to drop when the call succeeds. Defaults to None
 
         Returns:
         boolean: True if call successful, False if not. On error/failure, status_message should contain information.
         """
-        return self._make_api_request("PUT", request_url, data )
+        return self._make_api_request("PUT", request_url, data, invalidates=invalidates)
+
+# Bulk Requests
+
+    def fetch_many(self, method, ids, concurrency=None, deadline=None):
+        """
+        Calls a fetch method for many ids concurrently, on a bounded pool of worker threads.
+        Calls go through the client's rate limiter and retry policy like any other call.
+
+        Args:
+            method (string or method): The fetch method to call, e.g. "fetch_case_by_case_id" or client.fetch_message_by_id
+            ids (iterable): Ids to fetch. A tuple is passed as multiple arguments, e.g. (sn_type, sn_user_id).
+            concurrency (int or ConcurrencyLimiter, optional): Maximum number of calls in flight, or a limiter that
+                adapts it to latency and errors. Defaults to None - the client's concurrency_limiter if it has one,
+                otherwise DEFAULT_BULK_CONCURRENCY.
+            deadline (float, optional): Seconds, from the first result requested, within which all calls must complete.
+                Calls that would run past it fail fast with status_message "Deadline Exceeded". Defaults to None.
+
+        Returns:
+            generator: yields (id, SprinklrResponse) tuples as each call completes. A failed id is yielded with an
+            unsuccessful response and the remaining ids are still fetched. The client's result/status properties are not changed.
+        """
+        if isinstance(method, str):
+            method = getattr(self, method)
+        limiter = self._bulk_limiter(concurrency)
+        deadline = _deadline_at(deadline)
+        ids = iter(ids)
+        executor = ThreadPoolExecutor(max_workers=limiter.max_limit)
+        call = _carry_context(self._call_limited)
+        pending = {}
+        exhausted = False
+        try:
+            while True:
+                # Fill every free slot; wait for one only when nothing is in flight to yield meanwhile
+                while not exhausted and limiter.acquire(blocking=not pending):
+                    item = next(ids, _UNSET)
+                    if item is _UNSET:
+                        limiter.release()
+                        exhausted = True
+                    else:
+                        pending[executor.submit(call, limiter, deadline, method, item)] = item
+                if not pending:
+                    break
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            for future in pending:
+                if future.cancel():
+                    limiter.release()
+            executor.shutdown(wait=False)
+
+    def _bulk_limiter(self, concurrency):
+        """Returns the ConcurrencyLimiter a fetch_many call runs under"""
+        if isinstance(concurrency, ConcurrencyLimiter):
+            return concurrency
+        if concurrency is None:
+            if self.concurrency_limiter is not None:
+                return self.concurrency_limiter
+            concurrency = DEFAULT_BULK_CONCURRENCY
+        return ConcurrencyLimiter(concurrency, concurrency, concurrency)
+
+    def _call_for_response(self, method, item):
+        """Runs one fetch_many call on a worker thread, returning a SprinklrResponse even if the method raises"""
+        self._thread_state.return_responses = True
+        try:
+            return method(*item) if isinstance(item, tuple) else method(item)
+        except Exception as exc:
+            logging.exception("fetch_many - " + str(item))
+            return SprinklrResponse(-1, str(exc))
+        finally:
+            self._thread_state.return_responses = False
+
+    def _call_limited(self, limiter, deadline, method, item):
+        """Runs one fetch_many call in a slot taken from the limiter, reporting its outcome when the slot is returned"""
+        started = time.monotonic()
+        token = _call_deadline.set(deadline)
+        try:
+            response = self._call_for_response(method, item)
+        finally:
+            _call_deadline.reset(token)
+        limiter.release(time.monotonic() - started, response.status_code)
+        return response
 
 
 # Account 2.0
@@ -262,48 +3438,7 @@ class SprinklrClient:
                        f'grant_type=authorization_code&'
                        f'code={code}')
 
-        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-
-        response = None      
-        verb = "POST (Authorize)"          
-        try:
-            response = requests.post(url=request_url, headers=headers)
-        except ConnectionError:
-            logging.error(verb + " - Connection Error:" + request_url)
-            self.status_message = "Connection Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
-        except TimeoutError:
-            logging.error(verb + " - Timeout Error:" + request_url)
-            self.status_message = "Timeout Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
-        except requests.exceptions.RequestException:
-            logging.error(verb + " - Request Error:" + request_url)
-            self.status_message = "Request Error"
-            self.status_code = -1
-            logging.exception(self.status_message, request_url)
-
-        if response is not None:
-            self.status_code = response.status_code
-            self.raw = response.text
-            if response.text.startswith("{"):
-                self.result = json.loads(response.text)
-            else:
-                self.result = response.text
-
-        if self.status_code not in {HTTP_OK, HTTP_NO_RESPONSE}:
-            logging.error(verb + ' - Error response:' + response.text)
-            self.status_message = response.text
-            return False
-        else:
-            self.status_message = None
-            self.encoding = response.encoding
-            j_result = json.loads(response.content)
-            self.access_token = j_result["access_token"]
-            self.token_type = j_result["token_type"]
-            self.refresh_token = j_result["refresh_token"]
-            return True
+        return self._request_token("POST (Authorize)", request_url)
 
     def refresh_access_token(self, secret, redirect_uri, refresh_token):
         """
@@ -315,25 +3450,128 @@ class SprinklrClient:
         refresh_token (string): The token created at the same time as the Access Token during fetch_access_token
 
         Returns:JSON dictionary of Access Token, (new) Refresh Token and expire time (in seconds)
+        With a token store, tokens already refreshed by another client are returned without calling the API.
         """
         logging.info("Calling refresh_access_token")
 
-        request_url = f'https://api2.sprinklr.com/{self.path}oauth/token?client_id={self.key}&client_secret={secret}&redirect_uri={redirect_uri}&grant_type=refresh_token&refresh_token={refresh_token}'
-        headers = {'Content-Type': 'Application/x-www-form-urlencoded'}
-        response = requests.post(url=request_url, headers=headers)
+        sprinklr_response = self._refresh_tokens("POST (Refresh)", secret, redirect_uri, refresh_token)
+        success = self._apply_token_response(sprinklr_response)
+        return sprinklr_response if self._returns_responses() else success
+
+    def set_token(self, access_token, refresh_token=None, expires_in=None, token_type=None):
+        """
+        Sets the tokens used by the client, e.g. ones obtained by another process.
+
+        Args:
+            access_token (string): Access token sent with every call
+            refresh_token (string, optional): Refresh token, needed by a TokenManager. Defaults to None.
+            expires_in (float, optional): Seconds until the access token expires. Defaults to None - unknown.
+            token_type (string, optional): Type of the token. Defaults to None.
+        """
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.token_type = token_type
+        self.expires_in = expires_in
+        self.token_expires_at = time.time() + float(expires_in) if expires_in is not None else None
+        if self.token_manager is not None:
+            self.token_manager.schedule()
+
+    def _token_credential(self):
+        # Tokens are shared by every client of the same application (key) in the same environment (path)
+        return f'{self.key}@{self.path}'
+
+    def _load_stored_token(self, stale_authorization=None):
+        """
+        Switches to the tokens in the token store, if they differ from the ones in use.
+
+        Returns:
+            boolean: True if the client now holds a different token than stale_authorization
+        """
+        tokens = self.token_store.get(self._token_credential())
+        if not tokens or "Bearer " + tokens["access_token"] == (stale_authorization or self._default_headers.get('Authorization')):
+            return False
+        result = _token_result(tokens)
+        self.set_token(result["access_token"], result["refresh_token"], result["expires_in"], result["token_type"])
+        return True
+
+    def _refresh_tokens(self, verb, secret, redirect_uri, refresh_token):
+        """
+        Refreshes the tokens, coordinating through the token store when there is one: while holding the store's lock,
+        tokens another client already refreshed (with a different refresh token) are used instead of calling the API.
+
+        Returns:
+            SprinklrResponse: the token endpoint response, or one synthesized from the stored tokens
+        """
+        if self.token_store is None:
+            return self._call_token_endpoint(verb, self._refresh_token_url(secret, redirect_uri, refresh_token))
+        credential = self._token_credential()
+        with self.token_store.lock(credential):
+            tokens, refresh_token = self._check_stored_tokens(credential, refresh_token)
+            if tokens is not None:
+                return SprinklrResponse(HTTP_OK, None, _token_result(tokens))
+            response = self._call_token_endpoint(verb, self._refresh_token_url(secret, redirect_uri, refresh_token))
+            if response:
+                self.token_store.put(credential, _stored_tokens(response.result))
+            return response
+
+    def _check_stored_tokens(self, credential, refresh_token):
+        """
+        Looks in the token store before refreshing (called with the store's lock held).
+
+        Returns:
+            tuple: (tokens, refresh_token) - tokens another client already refreshed (with a different refresh token)
+            that are still valid, or None and the newest refresh token to refresh with
+        """
+        tokens = self.token_store.get(credential)
+        if tokens and tokens.get("refresh_token") not in (None, refresh_token):
+            if tokens.get("expires_at") is None or tokens["expires_at"] > time.time():
+                logging.info("Using the access token refreshed by another client")
+                return tokens, refresh_token
+            refresh_token = tokens["refresh_token"]
+        return None, refresh_token
 
-        self.status_code = response.status_code
+    def _refresh_token_url(self, secret, redirect_uri, refresh_token):
+        return f'https://api2.sprinklr.com/{self.path}oauth/token?client_id={self.key}&client_secret={secret}&redirect_uri={redirect_uri}&grant_type=refresh_token&refresh_token={refresh_token}'
 
-        if response.status_code == HTTP_OK:
+    def _request_token(self, verb, request_url):
+        """
+        Posts a token request and, on success, stores the returned access token, token type, refresh token and expiry.
+
+        Returns:
+        boolean: True if call successful, False if not. On error/failure, status_message should contain information.
+        """
+        sprinklr_response = self._call_token_endpoint(verb, request_url)
+        success = self._apply_token_response(sprinklr_response)
+        if success and self.token_store is not None:
+            self.token_store.put(self._token_credential(), _stored_tokens(sprinklr_response.result))
+        return sprinklr_response if self._returns_responses() else success
+
+    def _call_token_endpoint(self, verb, request_url):
+        """Posts a token request without touching the client's properties, returning a SprinklrResponse"""
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        response, error_message = self._send("POST", request_url, headers, None)
+        if response is not None and response.status_code == HTTP_OK and not self._returns_responses():
             self.encoding = response.encoding
-            j_result = json.loads(response.content)
-            self.access_token = j_result["access_token"]
-            self.token_type = j_result["token_type"]
-            self.refresh_token = j_result["refresh_token"]
+        return self._parse_response(verb, response, error_message)
+
+    def _apply_token_response(self, sprinklr_response):
+        """
+        Switches to the tokens of a successful token response. Unless the client returns responses (return_responses
+        or AsyncSprinklrClient), the response is also copied onto status_code, result and the other call properties.
+
+        Returns:
+        boolean: True if call successful, False if not.
+        """
+        if self._returns_responses():
+            success = sprinklr_response.ok
         else:
-            if response.content is not None:
-                self.result = response.content
-        return response.status_code == HTTP_OK
+            success = self._apply_response(sprinklr_response)
+        if success:
+            self._store_token(sprinklr_response.result)
+        return success
+
+    def _store_token(self, result):
+        self.set_token(result["access_token"], result["refresh_token"], result.get("expires_in"), result["token_type"])
 
 # Assets 1.0 & SAM
 
@@ -382,6 +3620,29 @@ class SprinklrClient:
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/sam/importUrl?importType={import_type}&url={url}&uploadTrackerId={upload_tracker_id}'
         return self.post_request(request_url, None)
 
+    def ingest_assets(self, inputs, group=None, recursive=False, upload_workers=DEFAULT_UPLOAD_WORKERS,
+                      create_workers=DEFAULT_CREATE_WORKERS, retry_policy=None, asset_data=None, catalog=None):
+        """
+        Uploads (or imports) files and URLs, creates an asset for each and optionally groups them, in one call.
+        Uploads and asset creation run concurrently with bounded workers per stage; see AssetPipeline.
+
+        Args:
+            inputs: A directory, file path or URL, or a list of them
+            group (JSON object, optional): Asset group to create from the new assets. Defaults to None - no group.
+            recursive (bool, optional): Include files in subdirectories of a directory. Defaults to False.
+            upload_workers (int, optional): Uploads in flight at once. Defaults to DEFAULT_UPLOAD_WORKERS.
+            create_workers (int, optional): Asset creations in flight at once. Defaults to DEFAULT_CREATE_WORKERS.
+            retry_policy (RetryPolicy, optional): Retries of failed uploads (creates only after a 429). Defaults to RetryPolicy().
+            asset_data (callable, optional): Builds the create_asset request, see AssetPipeline. Defaults to None.
+            catalog (AssetCatalog, optional): Skips files already in SAM and records new assets. Defaults to None.
+
+        Returns:
+            dict: manifest mapping inputs to asset ids ("assets"), failures by input ("failed") and the "group_id".
+            The client's result/status properties are not changed.
+        """
+        pipeline = AssetPipeline(self, upload_workers, create_workers, retry_policy, asset_data, catalog=catalog)
+        return pipeline.run(inputs, group, recursive)
+
     def read_asset(self, asset_id):
         """
         Retrieves an asset from the Sprinklr Asset Manager, with a specific asset ID.
@@ -408,7 +3669,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/sam/search'
-        return requests.post(request_url, search_request)
+        return self.post_request(request_url, search_request, idempotent=True)
 
     def update_asset(self, asset_id, update_request):
         """
@@ -426,7 +3687,7 @@ class SprinklrClient:
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/sam/{asset_id}'
         return self.put_request(request_url, update_request)
 
-    def asset_upload(self, content_type, upload_tracker_id, file_name):
+    def asset_upload(self, content_type, upload_tracker_id, file_name, progress=None, use_mmap=False):
         """
         Uploads content in the content store. 
         But uploading content to the content store does not mean it is available in the Sprinklr Social Asset Manager. 
@@ -435,20 +3696,28 @@ class SprinklrClient:
         Args:
             content_type (string): Avalaible content types are IMAGE, VIDEO, FILE.
             upload_tracker_id (string): A unique identifier from the client. This id is any string as long as it is unique each time.
-            file_name (string): This is a form data parameter. The name of the file to upload.
+            file_name (string): This is a form data parameter. The name of the file to upload. A binary file object or bytes can also be passed.
+            progress (callable, optional): Called as progress(bytes_sent, total_bytes) while the file is sent. Defaults to None.
+            use_mmap (bool, optional): Memory-map the file instead of reading it. Defaults to False.
+
+            The file is streamed in chunks, so memory use stays constant however large the media is.
+            It is uploaded even if SAM already holds the same content - deduplication only happens in ingest_assets
+            with an AssetCatalog.
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
         """
-        request_url = f'https://api2.sprinklr.com/{self.path}api/v1/sam/upload?contentType={content_type}&uploadTrackerId={upload_tracker_id}'
+        request_url = self._asset_upload_url(content_type, upload_tracker_id)
         try:
-            filedata = {'file': open(file_name)}
-        except (Exception):
-            self.status_message = {"Error - file not found"}
-            return False
-        else:
-            return self.post_request(request_url, filedata, is_file=True)
+            upload = MultipartUpload(file_name, progress=progress, use_mmap=use_mmap)
+        except OSError:
+            return self._fail("Error - file not found: " + str(file_name))
+        with upload:
+            return self.post_request(request_url, upload, is_file=True)
+
+    def _asset_upload_url(self, content_type, upload_tracker_id):
+        return f'https://api2.sprinklr.com/{self.path}api/v1/sam/upload?contentType={content_type}&uploadTrackerId={upload_tracker_id}'
 
 # Assets 2.0
 
@@ -527,7 +3796,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/audit/fetch'
-        return self.post_request(request_url, request)
+        return self.post_request(request_url, request, idempotent=True)
 
 # Bootstrap
     def fetch_partner_campaigns(self):
@@ -555,7 +3824,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f"https://api2.sprinklr.com/{self.path}api/v2/webhook-subscriptions/webhook-types"
-        return self.get_request(request_url)
+        return self.get_request(request_url, cache_resource='WEBHOOK_TYPES')
 
     def fetch_resources(self, types):
         """
@@ -570,7 +3839,7 @@ class SprinklrClient:
         """
 
         request_url = f"https://api2.sprinklr.com/{self.path}api/v1/bootstrap/resources?types={types}"
-        return self.get_request(request_url)
+        return self.get_request(request_url, cache_resource=types)
 
     def fetch_macros(self):
         """
@@ -884,7 +4153,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/case/search'
-        return self.post_request(request_url, search_parameters)
+        return self.post_request(request_url, search_parameters, idempotent=True)
 
     def update_case_v1(self, case_data):
         """
@@ -898,7 +4167,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/case/update'
-        return self.post_request(request_url, case_data)
+        return self.post_request(request_url, case_data, invalidates=[('CASE', _case_identifier(case_data))])
 
 # Case 2.0
 
@@ -928,7 +4197,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/case/case-numbers?case-number={case_number}'
-        return self.get_request(request_url, returns_json=True)
+        return self.get_request(request_url, returns_json=True, cache_resource=('CASE', 'caseNumber', case_number))
 
     def fetch_case_by_channel_case_id(self, channel_case_id):
         """
@@ -942,7 +4211,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/case/channel-case-ids?channelCaseIds={channel_case_id}'
-        return self.get_request(request_url, returns_json=True)
+        return self.get_request(request_url, returns_json=True, cache_resource=('CASE', 'channelCaseId', channel_case_id))
 
     def fetch_case_by_channel_case_number(self, chanel_case_number):
         """
@@ -970,7 +4239,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/case/{case_id}'
-        return self.get_request(request_url, returns_json=True)
+        return self.get_request(request_url, returns_json=True, cache_resource=('CASE', 'id', case_id))
 
     def fetch_case_associated_messages(self, case_id):
         """
@@ -985,7 +4254,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/case/associated-messages?id={case_id}'
-        return self.get_request(request_url, returns_json=True)
+        return self.get_request(request_url, returns_json=True, cache_resource=('CASE', 'associatedMessages', case_id))
 
     def delete_case(self, case_id):
         """
@@ -999,8 +4268,8 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         delete_url = f'https://api2.sprinklr.com/{self.path}api/v2/case'
-        data = {case_id}
-        return self.delete_request(delete_url, data)
+        data = [case_id]
+        return self.delete_request(delete_url, data, invalidates=[('CASE', case_id)])
 
     def update_case(self, case_data):
         """
@@ -1014,7 +4283,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/case'
-        return self.put_request(request_url, case_data)
+        return self.put_request(request_url, case_data, invalidates=[('CASE', _case_identifier(case_data))])
 
 # Comment
     def search_comments(self, asset_id, asset_class):
@@ -1034,7 +4303,7 @@ class SprinklrClient:
             "assetClass": asset_class,
             "assetId": asset_id
         }
-        return self.post_request(request_url, data)
+        return self.post_request(request_url, data, idempotent=True)
 
 # Comment 2.0
     def add_comment(self, entity_type, entity_id, comment):
@@ -1052,7 +4321,8 @@ class SprinklrClient:
        """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/comment/{entity_type}/{entity_id}'
         data = {"text": comment}
-        return self.post_request(request_url, data)
+        invalidates = [('CASE', entity_id)] if str(entity_type).upper() == "CASE" else None
+        return self.post_request(request_url, data, invalidates=invalidates)
 
     def fetch_comment(self, entity_type, entity_id, comment_id):
         """
@@ -1083,7 +4353,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/customfield'
-        return self.post_request(request_url, field_definition)
+        return self.post_request(request_url, field_definition, invalidates=CUSTOM_FIELD_RESOURCES)
 
     def search_custom_field(self, search_parameters):
         """
@@ -1097,7 +4367,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/customfield/search'
-        return self.post_request(request_url, search_parameters)
+        return self.post_request(request_url, search_parameters, idempotent=True)
 
     def update_custom_field(self, field_id, field_definition):
         """
@@ -1112,7 +4382,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/customfield/{field_id}'
-        return self.put_request(request_url, field_definition)
+        return self.put_request(request_url, field_definition, invalidates=CUSTOM_FIELD_RESOURCES)
 
     def fetch_custom_field(self, field_id):
         """
@@ -1126,7 +4396,7 @@ class SprinklrClient:
             No response object is returned if successful       
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/customfield/{field_id}'
-        return self.get_request(request_url)
+        return self.get_request(request_url, cache_resource='CUSTOM_FIELD')
 
     def update_custom_field_options(self, field_id, field_options):
         """
@@ -1142,7 +4412,7 @@ class SprinklrClient:
             No response object is returned if successful
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/customfield/{field_id}/updateOptions'
-        return self.put_request(request_url, field_options)
+        return self.put_request(request_url, field_options, invalidates=CUSTOM_FIELD_RESOURCES)
 
     def fetch_profile_custom_fields(self):
         """
@@ -1239,7 +4509,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/dashboards'
-        return self.get_request(request_url)
+        return self.get_request(request_url, cache_resource='DASHBOARDS')
 
     def fetch_dashboard_by_name(self, dashboard_name: str):
         """
@@ -1253,7 +4523,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/dashboard/{urllib.parse.quote(dashboard_name)}'
-        return self.get_request(request_url)
+        return self.get_request(request_url, cache_resource='DASHBOARDS')
 
     def fetch_dashboard_stream(self, dashboard_id, start=0, rows=21,
                                since_date=None, until_date=None, sort='snCreatedTime%20desc'):
@@ -1273,6 +4543,27 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
 
+        request_url = self._dashboard_stream_url(dashboard_id, start, rows, since_date, until_date, sort)
+        return self.get_request(request_url)
+
+    def iter_dashboard_stream(self, dashboard_id, start=0, rows=21, since_date=None, until_date=None,
+                              sort='snCreatedTime%20desc', item_path=DASHBOARD_STREAM_ITEMS):
+        """
+        Streaming version of fetch_dashboard_stream - yields messages one at a time while the response is downloaded.
+
+        Args:
+            dashboard_id (string): Id of the dashboard
+            start, rows, since_date, until_date, sort: As for fetch_dashboard_stream
+            item_path (tuple, optional): Keys leading to the message array in the response. Defaults to DASHBOARD_STREAM_ITEMS.
+
+        Returns:
+            generator: yields messages. Raises SprinklrError if the call fails.
+            The client's result and status properties are not changed.
+        """
+        request_url = self._dashboard_stream_url(dashboard_id, start, rows, since_date, until_date, sort)
+        return self._iter_json_items("GET", request_url, None, item_path)
+
+    def _dashboard_stream_url(self, dashboard_id, start, rows, since_date, until_date, sort):
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/stream/{dashboard_id}' \
             f'/feed?sort={sort}&rows={rows}&meta=true&start={start}'
 
@@ -1282,7 +4573,7 @@ class SprinklrClient:
         if until_date is not None:
             request_url += "&untilDate=" + until_date
 
-        return self.get_request(request_url)
+        return request_url
 
 # Extensions
 
@@ -1371,7 +4662,23 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/listening/query/stream'
-        return self.post_request(request_url, stream)
+        return self.post_request(request_url, stream, idempotent=True)
+
+    def iter_listening_stream(self, stream, item_path=LISTENING_STREAM_ITEMS):
+        """
+        Streaming version of fetch_listening_stream - yields messages one at a time while the response is downloaded,
+        so memory stays flat however many rows are requested.
+
+        Args:
+            stream (JSON object): object representing parameters to fetch stream
+            item_path (tuple, optional): Keys leading to the message array in the response. Defaults to LISTENING_STREAM_ITEMS.
+
+        Returns:
+            generator: yields messages. Raises SprinklrError if the call fails.
+            The client's result and status properties are not changed.
+        """
+        request_url = f'https://api2.sprinklr.com/{self.path}api/v1/listening/query/stream'
+        return self._iter_json_items("POST", request_url, stream, item_path)
 
 # Listening Widgets
     def fetch_listening_widget_data(self, search_request):
@@ -1386,7 +4693,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/listening/query/widget'
-        return self.post_request(request_url, search_request)
+        return self.post_request(request_url, search_request, idempotent=True)
 
 # Message 1.0
 
@@ -1402,7 +4709,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/conversations/new/message-details'
-        return self.post_request(request_url, conversation_data)
+        return self.post_request(request_url, conversation_data, idempotent=True)
 
     def fetch_message_by_UMID(self, umid):
         """
@@ -1448,7 +4755,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}{api_link}/paid/entity/paidinitiative/create'
-        self.post_request(request_url, initiative)
+        return self.post_request(request_url, initiative)
 
 # Product
     def create_product(self, product):
@@ -1491,7 +4798,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/product/search'
-        return self.post_request(request_url, search_request)
+        return self.post_request(request_url, search_request, idempotent=True)
 
     def update_product(self, id, product):
         """
@@ -1623,7 +4930,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v1/profile/search'
-        return self.post_request(request_url, search_parameters)
+        return self.post_request(request_url, search_parameters, idempotent=True)
 
 # Profile 2.0
     def fetch_profile_by_type_and_id(self, sn_type, sn_user_id):
@@ -1846,7 +5153,7 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f' https://api2.sprinklr.com/{self.path}api/v1/reports/query'
-        return self.post_request(request_url, report_request)
+        return self.post_request(request_url, report_request, idempotent=True)
 
     def fetch_report_custom_metrics(self, report_engine):
         """
@@ -1891,7 +5198,22 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object        
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/reports/query'
-        return self.post_request(request_url, report_request)
+        return self.post_request(request_url, report_request, idempotent=True)
+
+    def iter_report_rows(self, report_request, item_path=REPORT_ROWS):
+        """
+        Streaming version of fetch_report - yields report rows one at a time while the response is downloaded.
+
+        Args:
+            report_request (JSON Object): Report Request object
+            item_path (tuple, optional): Keys leading to the row array in the response. Defaults to REPORT_ROWS.
+
+        Returns:
+            generator: yields rows. Raises SprinklrError if the call fails.
+            The client's result and status properties are not changed.
+        """
+        request_url = f'https://api2.sprinklr.com/{self.path}api/v2/reports/query'
+        return self._iter_json_items("POST", request_url, report_request, item_path)
 
 # Search
 
@@ -1914,36 +5236,133 @@ class SprinklrClient:
         """
         request_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}'
 
-        result = self.post_request(request_url, filter)
-        if (result):
-            self.search_cursor = self.result["data"]["cursor"]
-        else:
-            self.search_cursor = None
+        result = self.post_request(request_url, filter, idempotent=True)
+        self._track_cursor(result)
         return result
 
-    def search_next_page(self, entity_type):
+    def search_next_page(self, entity_type, cursor=None):
         """
         Retrieves the next page of search results.
 
         Args:     
             entity_type (string): Supported entity types: CASE, CAMPAIGN, SAM.
+            cursor (optional, string): Cursor of the page to fetch (SprinklrResponse.cursor). Defaults to SprinklrClient.search_cursor
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
             If a cursor exists, SprinklrClient.search_cursor is set to the URL that can be used to obtain the next set of results via search_case_next
         """
-        if self.search_cursor is not None:
-            request_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}?id={self.search_cursor}'
+        if cursor is None:
+            cursor = self.search_cursor
+        if cursor is not None:
+            request_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}?id={cursor}'
             result = self.get_request(request_url)
-            if (result):
-                self.search_cursor = self.result["data"]["cursor"]
-            else:
-                self.search_cursor = None
+            self._track_cursor(result)
             return result
         else:
-            self.status_message = {"error": "Search cursor not set"}
-            return False  # no cursor
+            return self._fail({"error": "Search cursor not set"})  # no cursor
+
+    def iter_search(self, entity_type, filter, page_size=None, pages=False, prefetch=True, deadline=None):
+        """
+        Lazily iterates over every result of a search, following the cursor from page to page.
+        While the caller processes one page, the next page is fetched in the background.
+
+        Args:
+            entity_type (string): Supported entity types: CASE, CAMPAIGN, MESSAGE, SAM.
+            filter (JSON object): Search request that defines the parameters of the search
+            page_size (optional, int): Records per page, set as paginationInfo.rows unless already present. Defaults to None (API default)
+            pages (optional, bool): Yield a list per page instead of individual records. Defaults to False
+            prefetch (optional, bool): Fetch the next page while the current one is processed. Defaults to True
+            deadline (optional, float): Seconds, from the first record requested, within which every page (and its
+                retries) must be fetched; a page that cannot be raises SprinklrError. Defaults to None (no limit, or
+                the enclosing within_deadline block's)
+
+        Returns:
+            generator: yields records (or pages of records). Raises SprinklrError if a page cannot be fetched.
+            The cursor is kept by the generator, so the client's result, status and search_cursor properties are not changed.
+        """
+        search_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}'
+        deadline = _deadline_at(deadline)
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            response = self._request("POST", search_url, _search_body(filter, page_size), idempotent=True,
+                                     deadline=deadline)
+            while True:
+                records, cursor = _search_page(response)
+                next_page = None
+                if cursor and records:
+                    next_url = f'{search_url}?id={cursor}'
+                    if executor is not None:
+                        next_page = executor.submit(_carry_context(functools.partial(self._request, deadline=deadline)),
+                                                    "GET", next_url)
+
+                if pages:
+                    if records:
+                        yield records
+                else:
+                    yield from records
+
+                if not (cursor and records):
+                    return
+                if next_page is not None:
+                    response = next_page.result()
+                else:
+                    response = self._request("GET", next_url, deadline=deadline)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def search_by_ids(self, entity_type, ids, id_field="id", batch_size=DEFAULT_ID_BATCH_SIZE, deadline=None):
+        """
+        Fetches many entities by id with search calls (an IN filter per batch of ids) instead of one fetch call per id.
+
+        Args:
+            entity_type (string): Supported entity types: CASE, CAMPAIGN, MESSAGE, SAM.
+            ids (iterable): Ids of the entities to fetch
+            id_field (optional, string): Field holding the id in both the search filter and the results. Defaults to "id"
+            batch_size (optional, int): Ids per search request. Defaults to DEFAULT_ID_BATCH_SIZE
+            deadline (optional, float): Seconds within which every search must complete. Defaults to None
+
+        Returns:
+            dict: record for each id that was found, keyed by the requested id. Ids that were not found are left out.
+            Raises SprinklrError if a search fails. The client's result/status properties are not changed.
+            See SearchBatcher to combine lookups made one at a time by many callers.
+        """
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        with within_deadline(deadline):
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                records = self.iter_search(entity_type, _id_search_body(id_field, batch, batch_size))
+                found.update(_index_records(records, id_field, batch))
+        return found
+
+    def fetch_cases_by_ids(self, case_ids, batch_size=DEFAULT_ID_BATCH_SIZE):
+        """
+        Fetches many cases by case id using batched case searches (see search_by_ids).
+
+        Args:
+            case_ids (iterable): Case ids to fetch
+            batch_size (optional, int): Ids per search request. Defaults to DEFAULT_ID_BATCH_SIZE
+
+        Returns:
+            dict: case for each id that was found, keyed by the requested id
+        """
+        return self.search_by_ids('CASE', case_ids, batch_size=batch_size)
+
+    def fetch_messages_by_ids(self, message_ids, batch_size=DEFAULT_ID_BATCH_SIZE):
+        """
+        Fetches many messages by message id using batched message searches (see search_by_ids).
+
+        Args:
+            message_ids (iterable): Message ids to fetch
+            batch_size (optional, int): Ids per search request. Defaults to DEFAULT_ID_BATCH_SIZE
+
+        Returns:
+            dict: message for each id that was found, keyed by the requested id
+        """
+        return self.search_by_ids('MESSAGE', message_ids, batch_size=batch_size)
 
     def search_campaign(self, filter,  sort_order='ASC', sort_key='name', page_size=20):
         """
@@ -1974,19 +5393,19 @@ class SprinklrClient:
         """
         return self.search_cursor is not None
 
-    def search_campaign_next(self):
+    def search_campaign_next(self, cursor=None):
         """
         Retrieves the next set of results from a campaign search.
 
         Args:
-            None
+            cursor (optional, string): Cursor of the page to fetch (SprinklrResponse.cursor). Defaults to SprinklrClient.search_cursor
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
             If a cursor exists, SprinklrClient.search_cursor is set to the URL that can be used to obtain the next set of results via search_case_next
         """
-        return self.search_next_page("CAMPAIGN")
+        return self.search_next_page("CAMPAIGN", cursor)
 
     def search_case(self, filter,  sort_order='ASC', sort_key='id', page_size=20):
         """
@@ -2005,19 +5424,19 @@ class SprinklrClient:
         """
         return self.search_entity('CASE', filter, sort_order, sort_key, page_size)
 
-    def search_case_next(self):
+    def search_case_next(self, cursor=None):
         """
         Retrieves the next set of results from a case search.
 
         Args:
-            None
+            cursor (optional, string): Cursor of the page to fetch (SprinklrResponse.cursor). Defaults to SprinklrClient.search_cursor
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
             If a cursor exists, SprinklrClient.search_cursor is set to the URL that can be used to obtain the next set of results via search_case_next
         """
-        return self.search_next_page("CASE")
+        return self.search_next_page("CASE", cursor)
 
     def search_message(self, filter, sort_order='ASC', sort_key='id', page_size=20):
         """
@@ -2036,19 +5455,19 @@ class SprinklrClient:
         """
         return self.search_entity('MESSAGE', filter, sort_order, sort_key, page_size)
 
-    def search_message_next(self):
+    def search_message_next(self, cursor=None):
         """
         Retrieves the next set of results from a message search.
 
         Args:
-            None
+            cursor (optional, string): Cursor of the page to fetch (SprinklrResponse.cursor). Defaults to SprinklrClient.search_cursor
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
             If a cursor exists, SprinklrClient.search_cursor is set to the URL that can be used to obtain the next set of results via search_message_next
         """
-        return self.search_next_page("MESSAGE")
+        return self.search_next_page("MESSAGE", cursor)
 
     def search_sam(self, filter, sort_order='ASC', sort_key='name', page_size=20):
         """
@@ -2067,19 +5486,19 @@ class SprinklrClient:
         """
         return self.search_entity('SAM', filter, sort_order, sort_key, page_size)
 
-    def search_sam_next(self):
+    def search_sam_next(self, cursor=None):
         """
         Retrieves the next set of results from an Asset search.
 
         Args:
-            None
+            cursor (optional, string): Cursor of the page to fetch (SprinklrResponse.cursor). Defaults to SprinklrClient.search_cursor
 
         Returns:
             boolean: True if call successful, False if not. On error/failure, status_message should contain information.
             If successful, SprinklrClient.result will contain a JSON object        
             If a cursor exists, SprinklrClient.search_cursor is set to the URL that can be used to obtain the next set of results via search_sam_next
         """
-        return self.search_next_page("SAM")
+        return self.search_next_page("SAM", cursor)
 
 # Short URL
 
@@ -2221,4 +5640,637 @@ class SprinklrClient:
             If successful, SprinklrClient.result will contain a JSON object
         """        
         return self.fetch_resources('PARTNER_ACCOUNT_GROUPS')
-        
\ No newline at end of file
+        
+
+
+class AsyncSprinklrClient(SprinklrClient):
+    """Asyncio-native Sprinklr Client Library"""
+
+    def __init__(self, key, path=None, access_token=None, transport=None, pool_size=DEFAULT_POOL_SIZE,
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY, rate_limiter=None, retry_policy=None, cache=None,
+                 case_cache=None, coalesce_requests=True, codec=None, lazy_parsing=False, keep_raw=True,
+                 compress_requests=None, token_manager=None, token_store=None, priority=PRIORITY_INTERACTIVE,
+                 concurrency_limiter=None, timeouts=None):
+        """AsyncSprinklrClient
+
+        Args:
+            key (string): The API Key for the application, obtained at https://developer.sprinklr.com
+            path (string, optional): Defaults to None - Only necessary for environments other than Production.
+            access_token (string, optional): Unique access token representing a user. Defaults to None, but needed most calls
+            transport (object, optional): Async transport used to send requests. Defaults to None - an AsyncHttpTransport is created.
+            pool_size (int, optional): Keep-alive connections per host for the default transport. Defaults to DEFAULT_POOL_SIZE.
+            max_concurrency (int, optional): Maximum number of requests in flight at once. The default transport opens
+                up to this many connections. Defaults to DEFAULT_MAX_CONCURRENCY.
+            rate_limiter (RateLimiter or bool, optional): Paces calls to stay within the key's quotas. Defaults to None.
+            retry_policy (RetryPolicy or bool, optional): Retries transient failures. Defaults to None.
+            cache (ResponseCache, SqliteResponseCache or bool, optional): Caches near-static metadata. SqliteResponseCache
+                reads and writes run on a worker thread so they do not block the event loop. Defaults to None.
+            case_cache (CaseCache or bool, optional): Caches case reads. Defaults to None.
+            coalesce_requests (bool, optional): Identical concurrent GETs share one round trip. Defaults to True.
+            codec (object, optional): JSON codec, e.g. OrjsonCodec(). Defaults to None - JsonCodec.
+            lazy_parsing (bool, optional): Parse response bodies on first access to result. Defaults to False.
+            keep_raw (bool, optional): Keep the response text as raw. Defaults to True.
+            compress_requests (RequestCompressor or bool, optional): Compresses large POST and PUT bodies. Defaults to None.
+            token_manager (TokenManager, optional): Refreshes the access token ahead of expiry and after a 401. Defaults to None.
+            token_store (object, optional): Shares tokens between clients and processes, e.g. FileTokenStore. Defaults to None.
+            priority (string, optional): Priority class of the client's calls. Defaults to PRIORITY_INTERACTIVE.
+            concurrency_limiter (ConcurrencyLimiter or bool, optional): Adapts fetch_many concurrency. Defaults to None.
+            timeouts (dict, optional): (connect, read) timeouts by endpoint family. Defaults to None - DEFAULT_TIMEOUTS.
+
+            Every SprinklrClient method is available. Methods that call the API must be awaited, e.g.
+            await client.fetch_case_by_case_id(case_id), and iter_search, fetch_many and the iter_ stream methods are
+            iterated with async for. authorize, search_more_results, set_token and invalidate_cache make no request and
+            return plain values. Calls return a SprinklrResponse rather than a boolean. It is truthy on success and carries its own
+            status_code, status_message, result and raw values, so many calls can run concurrently on one client.
+            The client's result/status properties still reflect the most recently completed call.
+        """
+        if transport is None:
+            transport = AsyncHttpTransport(pool_size=pool_size, max_concurrency=max_concurrency)
+        super().__init__(key, path, access_token, transport=transport, rate_limiter=rate_limiter,
+                         retry_policy=retry_policy, return_responses=True, cache=cache, case_cache=case_cache,
+                         coalesce_requests=coalesce_requests, codec=codec, lazy_parsing=lazy_parsing, keep_raw=keep_raw,
+                         compress_requests=compress_requests, token_manager=token_manager, token_store=token_store,
+                         priority=priority, concurrency_limiter=concurrency_limiter, timeouts=timeouts)
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Closes the connections held by the client's transport"""
+        if self.token_manager is not None:
+            self.token_manager.close()
+        close = getattr(self.transport, "close", None)
+        if close is not None:
+            await close()
+
+    async def _send(self, verb, request_url, headers, body, deadline=None, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            # Budget is taken before a connection slot, so queued batch calls do not hold slots interactive calls need
+            if self.rate_limiter is not None:
+                timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                if not await self.rate_limiter.acquire_async(self._priority(), timeout):
+                    return None, _deadline_exceeded(verb, request_url)
+            kwargs.setdefault("timeout", self._timeout(request_url, deadline))
+            async with self._semaphore:
+                response = await self.transport.request(verb.upper(), request_url, headers=headers, data=body,
+                                                        **kwargs)
+            logging.debug(verb + " - Response code:" + str(response.status_code))
+            if self.rate_limiter is not None:
+                self.rate_limiter.update(response.status_code, response.headers)
+            return response, None
+        except ConnectionError:
+            return None, _log_request_error(verb, request_url, "Connection Error")
+        except (TimeoutError, asyncio.TimeoutError, requests.exceptions.Timeout):
+            return None, _log_request_error(verb, request_url, "Timeout Error")
+        except requests.exceptions.RequestException:
+            return None, _log_request_error(verb, request_url, "Request Error")
+        except Exception as exc:
+            if aiohttp is not None and isinstance(exc, aiohttp.ClientError):
+                return None, _log_request_error(verb, request_url, "Request Error")
+            raise
+
+    async def _send_with_retry(self, verb, request_url, headers, body, idempotent=False, deadline=None, **kwargs):
+        attempt = 1
+        reauthorized = False
+        deadline = deadline if deadline is not None else _call_deadline.get()
+        if self.token_manager is not None and self.token_manager.needs_refresh():
+            await self.token_manager.refresh_async(headers.get('Authorization'))
+            headers = self._authorized(headers)
+        while True:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None, _deadline_exceeded(verb, request_url)
+            response, error_message = await self._send(verb, request_url, headers, body, deadline, **kwargs)
+            if self._unauthorized(response, reauthorized):
+                reauthorized = True
+                if await self._reauthorize_async(headers.get('Authorization')) and _rewind_body(body):
+                    _close_response(response)
+                    headers = self._authorized(headers)
+                    continue
+            delay = self._retry_delay(verb, response, attempt, idempotent, deadline)
+            if delay is None or not _rewind_body(body):
+                return response, error_message
+            if response is not None:
+                _close_response(response)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _request(self, verb, request_url, data=None, returns_json=True, is_file=False, idempotent=False,
+                       cache_resource=None, invalidates=None, deadline=None):
+        # SQLite reads and writes block, so they run on a worker thread rather than on the event loop
+        loop = asyncio.get_running_loop()
+        blocking_cache = isinstance(self.cache, SqliteResponseCache) and (cache_resource is not None or invalidates)
+        if blocking_cache:
+            cached = await loop.run_in_executor(None, self._cache_lookup, request_url, cache_resource)
+        else:
+            cached = self._cache_lookup(request_url, cache_resource)
+        if cached is not None:
+            return cached
+
+        headers, body = self._prepare_request(verb, data, returns_json, is_file)
+
+        logging.info(verb + " - URL:" + request_url)
+        logging.debug("Headers:" + str(headers))
+
+        execute = functools.partial(self._execute, verb, request_url, headers, body, idempotent, deadline)
+        if self.single_flight is not None and verb.upper() == "GET":
+            try:
+                sprinklr_response = await self.single_flight.do_async(self._flight_key(request_url, headers), execute,
+                                                                      deadline)
+            except asyncio.TimeoutError:
+                sprinklr_response = SprinklrResponse(-1, _deadline_exceeded(verb, request_url))
+        else:
+            sprinklr_response = await execute()
+        if blocking_cache and sprinklr_response.ok:
+            await loop.run_in_executor(None, self._cache_update, request_url, sprinklr_response, cache_resource,
+                                       invalidates)
+        else:
+            self._cache_update(request_url, sprinklr_response, cache_resource, invalidates)
+        return sprinklr_response
+
+    async def _execute(self, verb, request_url, headers, body, idempotent=False, deadline=None):
+        started = time.monotonic()
+        response, error_message = await self._send_with_retry(verb, request_url, headers, body, idempotent, deadline)
+        return self._parse_response(verb, response, error_message, time.monotonic() - started)
+
+    async def _iter_json_items(self, verb, request_url, data, item_path):
+        headers, body = self._prepare_request(verb, data)
+
+        logging.info(verb + " - URL:" + request_url)
+        logging.debug("Headers:" + str(headers))
+
+        started = time.monotonic()
+        response, error_message = await self._send_with_retry(verb, request_url, headers, body, idempotent=True,
+                                                              stream=True)
+        if response is None or response.status_code not in {HTTP_OK, HTTP_NO_RESPONSE}:
+            if isinstance(response, _AsyncStreamedResponse):
+                response = await response.read()
+            raise SprinklrError(self._parse_response(verb, response, error_message, time.monotonic() - started))
+        deadline = _call_deadline.get()
+        try:
+            parser = JsonStreamParser(item_path)
+            async for chunk in _aiter_content(response):
+                _check_deadline(deadline, verb, request_url)
+                for item in parser.feed(chunk):
+                    yield item
+            for item in parser.close():
+                yield item
+        except ValueError as exc:
+            raise SprinklrError(SprinklrResponse(response.status_code, "Invalid JSON response: " + str(exc),
+                                                 headers=response.headers)) from exc
+        except requests.exceptions.RequestException as exc:
+            raise SprinklrError(SprinklrResponse(-1, _log_request_error(verb, request_url, "Stream Error"))) from exc
+        finally:
+            _close_response(response)
+
+    async def _make_api_request(self, verb, request_url, data=None, returns_json=True, is_file=False, idempotent=False,
+                                cache_resource=None, invalidates=None):
+        sprinklr_response = await self._request(verb, request_url, data, returns_json, is_file, idempotent,
+                                                cache_resource, invalidates)
+        self._apply_response(sprinklr_response)
+        return sprinklr_response
+
+    async def _request_token(self, verb, request_url):
+        sprinklr_response = await self._call_token_endpoint(verb, request_url)
+        if self._apply_token_response(sprinklr_response) and self.token_store is not None:
+            # put() takes the store's lock, which may block
+            await asyncio.get_running_loop().run_in_executor(None, self.token_store.put, self._token_credential(),
+                                                             _stored_tokens(sprinklr_response.result))
+        return sprinklr_response
+
+    async def refresh_access_token(self, secret, redirect_uri, refresh_token):
+        sprinklr_response = await self._refresh_tokens("POST (Refresh)", secret, redirect_uri, refresh_token)
+        self._apply_token_response(sprinklr_response)
+        return sprinklr_response
+
+    async def _refresh_tokens(self, verb, secret, redirect_uri, refresh_token):
+        # Refreshes in this process wait on an asyncio.Lock. The store's lock blocks (a file lock or a SQLite
+        # transaction), so it is taken on a worker thread and only while the store is read or written, not while
+        # the token endpoint is called. Two processes may then refresh at the same time - the first to store its
+        # tokens wins, and the other switches to them.
+        if self.token_store is None:
+            return await self._call_token_endpoint(verb, self._refresh_token_url(secret, redirect_uri, refresh_token))
+        credential = self._token_credential()
+        loop = asyncio.get_running_loop()
+        async with _async_refresh_lock(credential):
+            tokens, refresh_token, before = await loop.run_in_executor(None, self._check_store, credential,
+                                                                       refresh_token)
+            if tokens is not None:
+                return SprinklrResponse(HTTP_OK, None, _token_result(tokens))
+            response = await self._call_token_endpoint(verb, self._refresh_token_url(secret, redirect_uri, refresh_token))
+            if response:
+                stored = await loop.run_in_executor(None, self._store_refreshed, credential, before, response.result)
+                if stored is not None:
+                    logging.info("Using the access token refreshed by another client")
+                    return SprinklrResponse(HTTP_OK, None, _token_result(stored))
+            return response
+
+    def _check_store(self, credential, refresh_token):
+        """_check_stored_tokens under the store's lock, also returning the stored tokens (runs on a worker thread)"""
+        with self.token_store.lock(credential):
+            tokens, refresh_token = self._check_stored_tokens(credential, refresh_token)
+            return tokens, refresh_token, self.token_store.get(credential)
+
+    def _store_refreshed(self, credential, before, result):
+        """
+        Stores refreshed tokens unless another process stored valid tokens since `before` was read (runs on a worker
+        thread). Returns the other process's tokens in that case, otherwise None.
+        """
+        with self.token_store.lock(credential):
+            tokens = self.token_store.get(credential)
+            if tokens and tokens != before and (tokens.get("expires_at") is None or tokens["expires_at"] > time.time()):
+                return tokens
+            self.token_store.put(credential, _stored_tokens(result))
+            return None
+
+    async def _reauthorize_async(self, stale_authorization):
+        if self.token_manager is not None:
+            return await self.token_manager.refresh_async(stale_authorization)
+        return await asyncio.get_running_loop().run_in_executor(None, self._load_stored_token, stale_authorization)
+
+    async def _call_token_endpoint(self, verb, request_url):
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        response, error_message = await self._send("POST", request_url, headers, None)
+        if response is not None and response.status_code == HTTP_OK and not self._returns_responses():
+            self.encoding = response.encoding
+        return self._parse_response(verb, response, error_message)
+
+    async def asset_upload(self, content_type, upload_tracker_id, file_name, progress=None, use_mmap=False):
+        request_url = self._asset_upload_url(content_type, upload_tracker_id)
+        try:
+            upload = MultipartUpload(file_name, progress=progress, use_mmap=use_mmap)
+        except OSError:
+            return self._fail("Error - file not found: " + str(file_name))
+        with upload:
+            return await self.post_request(request_url, upload, is_file=True)
+
+    async def ingest_assets(self, inputs, group=None, recursive=False, upload_workers=DEFAULT_UPLOAD_WORKERS,
+                            create_workers=DEFAULT_CREATE_WORKERS, retry_policy=None, asset_data=None, catalog=None):
+        pipeline = AssetPipeline(self, upload_workers, create_workers, retry_policy, asset_data, catalog=catalog)
+        return await pipeline.run_async(inputs, group, recursive)
+
+    async def search_entity(self, entity_type, filter, sort_order='ASC', sort_key='id', page_size=0):
+        request_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}'
+
+        response = await self.post_request(request_url, filter, idempotent=True)
+        self.search_cursor = response.cursor
+        return response
+
+    async def search_next_page(self, entity_type, cursor=None):
+        if cursor is None:
+            cursor = self.search_cursor
+        if cursor is not None:
+            request_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}?id={cursor}'
+            response = await self.get_request(request_url)
+            self.search_cursor = response.cursor
+            return response
+        else:
+            return SprinklrResponse(-1, {"error": "Search cursor not set"})
+
+    async def iter_search(self, entity_type, filter, page_size=None, pages=False, prefetch=True, deadline=None):
+        search_url = f'https://api2.sprinklr.com/{self.path}api/v2/search/{entity_type}'
+        deadline = _deadline_at(deadline)
+        next_page = None
+        try:
+            response = await self._request("POST", search_url, _search_body(filter, page_size), idempotent=True,
+                                           deadline=deadline)
+            while True:
+                records, cursor = _search_page(response)
+                next_page = None
+                if cursor and records:
+                    next_url = f'{search_url}?id={cursor}'
+                    if prefetch:
+                        next_page = asyncio.ensure_future(self._request("GET", next_url, deadline=deadline))
+
+                if pages:
+                    if records:
+                        yield records
+                else:
+                    for record in records:
+                        yield record
+
+                if not (cursor and records):
+                    return
+                if next_page is not None:
+                    response = await next_page
+                else:
+                    response = await self._request("GET", next_url, deadline=deadline)
+        finally:
+            if next_page is not None and not next_page.done():
+                next_page.cancel()
+
+    async def fetch_many(self, method, ids, concurrency=None, deadline=None):
+        if isinstance(method, str):
+            method = getattr(self, method)
+        limiter = self._bulk_limiter(concurrency)
+        deadline = _deadline_at(deadline)
+
+        async def call(item):
+            # Each call runs in its own task, so the deadline set here stays with it
+            _call_deadline.set(deadline)
+            started = time.monotonic()
+            try:
+                response = await (method(*item) if isinstance(item, tuple) else method(item))
+            except asyncio.CancelledError:
+                limiter.release()
+                raise
+            except Exception as exc:
+                logging.exception("fetch_many - " + str(item))
+                response = SprinklrResponse(-1, str(exc))
+            limiter.release(time.monotonic() - started, response.status_code)
+            return item, response
+
+        ids = iter(ids)
+        pending = set()
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and (limiter.acquire(blocking=False) or
+                                         (not pending and await limiter.acquire_async())):
+                    item = next(ids, _UNSET)
+                    if item is _UNSET:
+                        limiter.release()
+                        exhausted = True
+                    else:
+                        pending.add(asyncio.ensure_future(call(item)))
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def search_by_ids(self, entity_type, ids, id_field="id", batch_size=DEFAULT_ID_BATCH_SIZE, deadline=None):
+        ids = list(dict.fromkeys(ids))
+        found = {}
+        with within_deadline(deadline):
+            for start in range(0, len(ids), batch_size):
+                batch = ids[start:start + batch_size]
+                records = [record async for record in self.iter_search(entity_type, _id_search_body(id_field, batch, batch_size))]
+                found.update(_index_records(records, id_field, batch))
+        return found
+
+    async def fetch_cases_by_ids(self, case_ids, batch_size=DEFAULT_ID_BATCH_SIZE):
+        return await self.search_by_ids('CASE', case_ids, batch_size=batch_size)
+
+    async def fetch_messages_by_ids(self, message_ids, batch_size=DEFAULT_ID_BATCH_SIZE):
+        return await self.search_by_ids('MESSAGE', message_ids, batch_size=batch_size)
+
+
+@functools.lru_cache(maxsize=None)
+def _write_signature(name):
+    return inspect.signature(getattr(SprinklrClient, name))
+
+
+def _entity_key(name, args, kwargs):
+    """
+    Returns the (entity type, entity id) a write call changes, or None if it cannot be told from the arguments.
+    The id is taken from an entity_type / entity_id pair (add_comment("CASE", 5, ...)), an <entity>_id argument
+    (delete_case(case_id)), an id argument named after the method (delete_product(id)), or the "id" or "<entity>Id"
+    field of a dict argument (update_case({"id": 5, ...})). Ids are compared as strings.
+    """
+    try:
+        arguments = _write_signature(name).bind(None, *args, **kwargs).arguments
+    except TypeError:
+        return None
+    # The noun of the method, e.g. "asset_group" for update_asset_group or "case" for update_case_v1
+    noun = re.sub(r'_v\d+$', '', name.split("_", 1)[1])
+    if arguments.get("entity_type") is not None and arguments.get("entity_id") is not None:
+        return str(arguments["entity_type"]).lower(), str(arguments["entity_id"])
+    for parameter, value in arguments.items():
+        if value is None or parameter in ("self", "entity_type"):
+            continue
+        if parameter.endswith("_id") and isinstance(value, (str, int)):
+            return parameter[:-3], str(value)
+        if parameter in ("id", "groupId") and isinstance(value, (str, int)):
+            return noun, str(value)
+    last_word = noun.rsplit("_", 1)[-1]
+    for value in arguments.values():
+        if isinstance(value, dict):
+            if value.get("id") is not None:
+                return last_word, str(value["id"])
+            if value.get(last_word + "Id") is not None:
+                return last_word, str(value[last_word + "Id"])
+    return None
+
+
+def _continues_search(name):
+    """True for the methods that page through the results of the last search made on a client"""
+    return name in SEARCH_CURSOR_METHODS or (name.startswith("search_") and name.endswith("_next"))
+
+
+class _HeldIterator:
+    """Iterates a generator, calling release once when it is exhausted, fails or is closed"""
+
+    def __init__(self, iterator, release):
+        self._iterator = iterator
+        self._release = release
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        release, self._release = self._release, None
+        if release is not None:
+            self._iterator.close()
+            release()
+
+    def __del__(self):
+        self.close()
+
+
+class _HeldAsyncIterator:
+    """Async version of _HeldIterator, for async generators"""
+
+    def __init__(self, iterator, release):
+        self._iterator = iterator
+        self._release = release
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._iterator.__anext__()
+        except BaseException:
+            await self.aclose()
+            raise
+
+    async def aclose(self):
+        release, self._release = self._release, None
+        if release is not None:
+            await self._iterator.aclose()
+            release()
+
+    def __del__(self):
+        # An abandoned async generator is finalized by its event loop; only the count is released here
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class SprinklrClientPool:
+    """Spreads calls over several credentials, each with its own quota, behind the SprinklrClient method surface"""
+
+    def __init__(self, credentials, sticky_writes=True, **client_options):
+        """SprinklrClientPool
+
+        Args:
+            credentials (list): SprinklrClient (or AsyncSprinklrClient) instances, or dicts of SprinklrClient arguments,
+                e.g. {"key": ..., "access_token": ..., "path": "prod2"}. Clients created from dicts share one transport
+                and get the rate limiter of their key.
+            sticky_writes (bool, optional): Send update_, delete_, add_ and remove_ calls for the same entity through
+                the same credential, chosen by a hash of the entity (see _entity_key) rather than by load, so
+                writes to one entity are never reordered between keys. Defaults to True.
+            client_options: Further SprinklrClient arguments for clients created from dicts, e.g. retry_policy=True.
+
+            Every SprinklrClient method can be called on the pool, e.g. pool.fetch_case_by_case_id(case_id). Each call
+            goes to the credential with the most quota left (by its rate limiter), then the fewest calls in flight.
+            search_more_results, search_next_page and the search_<entity>_next methods go to the client that ran this
+            thread's last search, which holds its cursor. Generators (iter_search, fetch_many, ...) count as in flight
+            until they are exhausted or closed.
+            result, status_code and the other call properties are read from the client used by this thread's last call.
+            All credentials should reach the same data - a pool over different environments routes calls to any of them.
+        """
+        self.clients = []
+        transport = None
+        for credential in credentials:
+            if isinstance(credential, SprinklrClient):
+                self.clients.append(credential)
+                continue
+            options = dict(client_options)
+            options.update(credential)
+            if "transport" not in options:
+                transport = transport or HttpTransport(pool_size=options.get("pool_size", DEFAULT_POOL_SIZE))
+                options["transport"] = transport
+            options.setdefault("rate_limiter", True)
+            self.clients.append(SprinklrClient(**options))
+        if not self.clients:
+            raise ValueError("SprinklrClientPool needs at least one credential")
+        self.sticky_writes = sticky_writes
+        self._in_flight = [0] * len(self.clients)
+        self._next = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes every client in the pool"""
+        closing = [client.close() for client in self.clients]
+        return asyncio.gather(*closing) if any(inspect.isawaitable(result) for result in closing) else None
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if not callable(getattr(SprinklrClient, name, None)):
+            # Call properties (result, status_code, ...) come from the client this thread used last
+            client = getattr(self._local, "client", None)
+            return getattr(client if client is not None else self.clients[0], name)
+
+        def call(*args, **kwargs):
+            index = self._choose(name, args, kwargs)
+            client = self.clients[index]
+            self._local.client = client
+            try:
+                result = getattr(client, name)(*args, **kwargs)
+            except BaseException:
+                self._release(index)
+                raise
+            if inspect.isawaitable(result):
+                return self._await(index, result)
+            if inspect.isgenerator(result):
+                return _HeldIterator(result, lambda: self._release(index))
+            if inspect.isasyncgen(result):
+                return _HeldAsyncIterator(result, lambda: self._release(index))
+            self._release(index)
+            return result
+
+        call.__name__ = name
+        call.__doc__ = getattr(SprinklrClient, name).__doc__
+        return call
+
+    def client_for(self, entity_type, entity_id):
+        """
+        Returns the client that writes for an entity are sent through.
+
+        Args:
+            entity_type (string): Type of the entity, e.g. "CASE" or "asset"
+            entity_id: Id of the entity
+        """
+        return self.clients[self._sticky_index((entity_type.lower(), str(entity_id)))]
+
+    @property
+    def rate_limit_budget(self):
+        """Quota budget of each credential (see RateLimiter.budget), in the order of clients"""
+        return [client.rate_limit_budget for client in self.clients]
+
+    def _choose(self, name, args, kwargs):
+        """Picks the client for a call and counts it as in flight"""
+        searcher = getattr(self._local, "searcher", None)
+        if searcher is not None and _continues_search(name):
+            with self._lock:
+                self._in_flight[searcher] += 1
+                return searcher
+        entity = None
+        if self.sticky_writes and name.startswith(STICKY_METHOD_PREFIXES):
+            entity = _entity_key(name, args, kwargs)
+        with self._lock:
+            index = self._sticky_index(entity) if entity is not None else self._least_loaded()
+            self._in_flight[index] += 1
+        if name.startswith("search_") and not _continues_search(name):
+            self._local.searcher = index
+        return index
+
+    def _sticky_index(self, entity):
+        # A stable hash, so the same entity maps to the same credential in every process using the same credentials
+        digest = hashlib.sha1(repr(entity).encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") % len(self.clients)
+
+    def _least_loaded(self):
+        # Called with the lock held. Starting from a rotating position spreads calls evenly between equal credentials.
+        best, best_score = None, None
+        count = len(self.clients)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            limiter = self.clients[index].rate_limiter
+            in_flight = self._in_flight[index]
+            if limiter is None:
+                score = (float("inf"), float("inf"), -in_flight)
+            else:
+                budget = limiter.budget
+                score = (budget["per_hour"]["remaining"] - in_flight, budget["per_second"]["remaining"] - in_flight,
+                         -in_flight)
+            if best_score is None or score > best_score:
+                best, best_score = index, score
+        self._next = (self._next + 1) % count
+        return best
+
+    def _release(self, index):
+        with self._lock:
+            self._in_flight[index] -= 1
+
+    async def _await(self, index, awaitable):
+        try:
+            return await awaitable
+        finally:
+            self._release(index)
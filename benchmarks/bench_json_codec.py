@@ -0,0 +1,80 @@
+"""
+Compares response decoding on a large report-style payload:
+
+    legacy   - response.text (charset detection), startswith("{"), json.loads of the text
+    json     - SprinklrClient decoding with the standard library JsonCodec (single pass from bytes)
+    orjson   - SprinklrClient decoding with OrjsonCodec (skipped if orjson is not installed)
+
+The measurable gain depends on orjson. With the default JsonCodec nearly all of the time is spent in json.loads,
+so the single-pass decoding is no faster than the legacy path (about 1.0x on the default 6 MB payload, against
+about 1.6x for OrjsonCodec). Without orjson installed the orjson line is skipped.
+
+Usage: python benchmarks/bench_json_codec.py [rows] [repeats]
+"""
+import json
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import SprinklrClient as sc  # noqa: E402
+
+
+def make_payload(rows):
+    data = {"headings": ["DATE", "ACCOUNT", "IMPRESSIONS", "ENGAGEMENTS", "MESSAGE"],
+            "rows": [[1583366400000 + i, f"account-{i % 50}", i * 7, i % 13, f"Message text é {i}" * 3]
+                     for i in range(rows)]}
+    return json.dumps({"data": data, "errors": []}).encode("utf-8")
+
+
+def make_response(content):
+    # No charset in the headers, as returned for application/json, so .text has to detect the encoding
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.encoding = None
+    return response
+
+
+def legacy_decode(response):
+    text = response.text
+    return json.loads(text) if text.startswith("{") else text
+
+
+def client_decode(client, response):
+    return client._parse_response("POST", response)
+
+
+def best_of(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    content = make_payload(rows)
+    print(f"payload: {len(content) / 1e6:.1f} MB, {rows} rows, best of {repeats}")
+
+    legacy = best_of(lambda: legacy_decode(make_response(content)), repeats)
+    print(f"legacy  {legacy * 1000:8.1f} ms")
+
+    codecs = [("json", sc.JsonCodec())]
+    if sc.orjson is not None:
+        codecs.append(("orjson", sc.OrjsonCodec()))
+    else:
+        print("orjson is not installed - pip install orjson to compare OrjsonCodec")
+    for name, codec in codecs:
+        client = sc.SprinklrClient("key", transport=object(), codec=codec, coalesce_requests=False)
+        elapsed = best_of(lambda: client_decode(client, make_response(content)), repeats)
+        print(f"{name:7} {elapsed * 1000:8.1f} ms  ({legacy / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
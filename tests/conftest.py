@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import SprinklrClient as sc  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def no_shared_limiters():
+    # RateLimiter.for_key keeps one limiter per key for the whole process
+    sc._rate_limiters.clear()
+    yield
+    sc._rate_limiters.clear()
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Makes retry back-off instant, recording the delays"""
+    delays = []
+    monkeypatch.setattr(sc.time, "sleep", delays.append)
+    return delays
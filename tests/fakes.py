@@ -0,0 +1,44 @@
+"""Fake transports for exercising SprinklrClient without a network"""
+import asyncio
+import json
+
+
+class FakeResponse:
+    """requests-style response with a JSON (or text) body"""
+
+    def __init__(self, status_code=200, body=None, headers=None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        self.status_code = status_code
+        self.content = (body or "").encode("utf-8")
+        self.encoding = "utf-8"
+        self.headers = headers or {}
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+
+class FakeTransport:
+    """Transport recording each request and answering it with handler(verb, url, headers, body)"""
+
+    def __init__(self, handler=None):
+        self.requests = []
+        self.timeouts = []
+        self.handler = handler or (lambda verb, url, headers, body: FakeResponse(200, {"data": {}}))
+
+    def request(self, verb, url, headers=None, data=None, **kwargs):
+        body = data.read() if hasattr(data, "read") else data
+        self.requests.append((verb, url, headers, body))
+        self.timeouts.append(kwargs.get("timeout"))
+        return self.handler(verb, url, headers, body)
+
+
+class FakeAsyncTransport(FakeTransport):
+    async def request(self, verb, url, headers=None, data=None, **kwargs):
+        # Let other tasks run while the request is "on the network"
+        await asyncio.sleep(0.01)
+        return FakeTransport.request(self, verb, url, headers, data, **kwargs)
+
+    async def close(self):
+        pass
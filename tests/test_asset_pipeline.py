@@ -0,0 +1,94 @@
+import json
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def sam(create_statuses, upload_statuses=()):
+    """Handler answering uploads and creates with the given statuses in turn, then 200"""
+    creates, uploads = list(create_statuses), list(upload_statuses)
+
+    def handler(verb, url, headers, body):
+        if "sam/upload" in url:
+            status = uploads.pop(0) if uploads else 200
+            return FakeResponse(status, {"data": {"uploaded": True}})
+        status = creates.pop(0) if creates else 200
+        return FakeResponse(status, {"data": {"id": "asset-1"}} if status == 200 else {"message": "failed"})
+    return handler
+
+
+def creates(transport):
+    return [url for _, url, _, _ in transport.requests if url.endswith("/sam")]
+
+
+def ingest(transport, tmp_path, **kwargs):
+    media = tmp_path / "photo.jpg"
+    media.write_bytes(b"pixels")
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    policy = sc.RetryPolicy(max_attempts=3, jitter=False)
+    return str(media), client.ingest_assets(str(media), retry_policy=policy, **kwargs)
+
+
+def test_upload_is_retried(no_sleep, tmp_path):
+    transport = FakeTransport(sam([], upload_statuses=[503, 503]))
+    media, manifest = ingest(transport, tmp_path)
+    assert manifest["assets"] == {media: "asset-1"}
+    assert len(transport.requests) == 4
+
+
+def test_create_is_not_resent_after_a_server_error(no_sleep, tmp_path):
+    transport = FakeTransport(sam([503]))
+    media, manifest = ingest(transport, tmp_path)
+    assert len(creates(transport)) == 1
+    assert manifest["failed"][media]["stage"] == "create"
+    assert manifest["failed"][media]["status_code"] == 503
+
+
+def test_create_is_retried_after_a_429(no_sleep, tmp_path):
+    transport = FakeTransport(sam([429]))
+    media, manifest = ingest(transport, tmp_path)
+    assert len(creates(transport)) == 2
+    assert manifest["assets"] == {media: "asset-1"}
+
+
+def test_cataloged_media_is_not_uploaded_again(no_sleep, tmp_path):
+    catalog = sc.AssetCatalog(str(tmp_path / "catalog.db"))
+    transport = FakeTransport(sam([]))
+    ingest(transport, tmp_path, catalog=catalog)
+    media, manifest = ingest(transport, tmp_path, catalog=catalog)
+    assert manifest["deduplicated"] == [media]
+    assert len(creates(transport)) == 1
+
+
+def test_lost_catalog_is_rebuilt_from_sam(no_sleep, tmp_path):
+    created = []
+
+    def handler(verb, url, headers, body):
+        if url.endswith("/sam"):
+            created.append(json.loads(body))
+            return FakeResponse(200, {"data": {"id": "asset-1"}})
+        if "/search/SAM" in url:
+            return FakeResponse(200, {"data": {"searchResults": [dict(created[0], id="asset-1")]}})
+        return FakeResponse(200, {"data": {}})
+
+    transport = FakeTransport(handler)
+    media, _ = ingest(transport, tmp_path, catalog=sc.AssetCatalog(str(tmp_path / "catalog.db")))
+    catalog = sc.AssetCatalog(str(tmp_path / "rebuilt.db"))
+    assert created[0]["customProperties"] == {sc.ASSET_HASH_FIELD: [catalog.content_hash(media)]}
+
+    assert catalog.sync(sc.SprinklrClient("key", None, "token", transport=transport))["added"] == 1
+    media, manifest = ingest(transport, tmp_path, catalog=catalog)
+    assert manifest["deduplicated"] == [media]
+    assert len(created) == 1
+
+
+def test_asset_data_is_given_the_content_hash(no_sleep, tmp_path):
+    hashes = []
+
+    def asset_data(item, content_type, upload_tracker_id, upload_result, content_hash):
+        hashes.append(content_hash)
+        return {"name": "photo"}
+
+    catalog = sc.AssetCatalog(str(tmp_path / "catalog.db"))
+    media, _ = ingest(FakeTransport(sam([])), tmp_path, catalog=catalog, asset_data=asset_data)
+    assert hashes == [catalog.content_hash(media)]
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import time
+
+import SprinklrClient as sc
+from fakes import FakeAsyncTransport, FakeResponse, FakeTransport
+
+
+def test_default_transport_is_sized_for_max_concurrency():
+    client = sc.AsyncSprinklrClient("key", None, "token", max_concurrency=50)
+    assert client.transport.pool_size == 50
+    assert sc.AsyncSprinklrClient("key", None, "token", pool_size=5, max_concurrency=2).transport.pool_size == 5
+
+
+def test_thread_pool_transport_runs_max_concurrency_requests_at_once():
+    lock = threading.Lock()
+    in_flight = []
+    peak = []
+
+    def handler(verb, url, headers, body):
+        with lock:
+            in_flight.append(url)
+            peak.append(len(in_flight))
+        time.sleep(0.1)
+        with lock:
+            in_flight.remove(url)
+        return FakeResponse(200, {"data": {}})
+
+    async def main():
+        transport = sc.AsyncHttpTransport(transport=FakeTransport(handler), max_concurrency=40)
+        client = sc.AsyncSprinklrClient("key", None, "token", transport=transport, max_concurrency=40)
+        responses = await asyncio.gather(*[client.fetch_case_by_case_id(case_id) for case_id in range(40)])
+        await client.close()
+        return responses
+
+    assert all(asyncio.run(main()))
+    assert max(peak) > sc.DEFAULT_POOL_SIZE
+
+
+def test_sqlite_cache_is_read_and_written_off_the_event_loop(tmp_path):
+    threads = []
+
+    class RecordingCache(sc.SqliteResponseCache):
+        def get(self, cache_key):
+            threads.append(threading.get_ident())
+            return super().get(cache_key)
+
+        def set(self, cache_key, response, resource=None):
+            threads.append(threading.get_ident())
+            return super().set(cache_key, response, resource)
+
+    async def main():
+        transport = FakeAsyncTransport(lambda *request: FakeResponse(200, {"data": [{"id": "macro-1"}]}))
+        client = sc.AsyncSprinklrClient("key", None, "token", transport=transport,
+                                        cache=RecordingCache(str(tmp_path / "cache.db")))
+        first, second = await client.fetch_macros(), await client.fetch_macros()
+        return first, second, len(transport.requests)
+
+    first, second, requests = asyncio.run(main())
+    assert first and second.result == {"data": [{"id": "macro-1"}]}
+    assert requests == 1
+    assert len(threads) == 3 and threading.get_ident() not in threads
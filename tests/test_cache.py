@@ -0,0 +1,103 @@
+import time
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def metadata(verb, url, headers, body):
+    if "/case/case-numbers" in url:
+        return FakeResponse(200, {"data": [{"id": 5, "caseNumber": 77, "subject": "Late delivery"}]})
+    if "/case/" in url:
+        return FakeResponse(200, {"data": {"id": 5, "caseNumber": 77, "subject": "Late delivery"}})
+    return FakeResponse(200, {"data": [{"id": "macro-1"}]})
+
+
+def gets(transport):
+    return [url for verb, url, _, _ in transport.requests if verb == "GET"]
+
+
+def client_with(transport, **kwargs):
+    return sc.SprinklrClient("key", None, "token", transport=transport, **kwargs)
+
+
+def test_metadata_is_served_from_the_cache_until_it_expires():
+    transport = FakeTransport(metadata)
+    client = client_with(transport, cache=sc.ResponseCache(ttls={"MACROS": 0.05}))
+    assert client.fetch_macros() and client.fetch_macros()
+    assert len(gets(transport)) == 1
+    assert client.result == {"data": [{"id": "macro-1"}]}
+    time.sleep(0.06)
+    assert client.fetch_macros()
+    assert len(gets(transport)) == 2
+    assert client.cache.stats["hits"] == 1
+
+
+def test_failed_responses_are_not_cached():
+    transport = FakeTransport(lambda verb, url, headers, body: FakeResponse(500, {"message": "down"}))
+    client = client_with(transport, cache=True)
+    assert not client.fetch_macros()
+    assert not client.fetch_macros()
+    assert len(gets(transport)) == 2
+
+
+def test_writes_drop_the_metadata_they_change():
+    transport = FakeTransport(metadata)
+    client = client_with(transport, cache=True)
+    client.fetch_custom_field("field-1")
+    client.fetch_macros()
+    assert client.create_custom_field({"name": "Region"})
+    client.fetch_custom_field("field-1")
+    client.fetch_macros()
+    assert len(gets(transport)) == 3
+
+    client.invalidate_cache("MACROS")
+    client.fetch_macros()
+    assert len(gets(transport)) == 4
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = sc.ResponseCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.set(key, key)
+    cache.get("a")
+    cache.set("c", "c")
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" and cache.get("c") == "c"
+    assert cache.stats["evictions"] == 1
+
+
+def test_persistent_cache_is_shared_between_clients(tmp_path):
+    transport = FakeTransport(metadata)
+    filename = str(tmp_path / "cache.db")
+    client_with(transport, cache=sc.SqliteResponseCache(filename)).fetch_macros()
+    other = client_with(transport, cache=sc.SqliteResponseCache(filename))
+    assert other.fetch_macros()
+    assert other.result == {"data": [{"id": "macro-1"}]}
+    assert len(gets(transport)) == 1
+
+
+def test_case_is_cached_under_each_identifier_until_it_changes():
+    transport = FakeTransport(metadata)
+    client = client_with(transport, case_cache=True)
+    assert client.fetch_case_by_case_id(5)
+    assert client.fetch_case_by_number(77)
+    assert client.result["data"][0]["subject"] == "Late delivery"
+    assert len(gets(transport)) == 1
+
+    assert client.update_case({"id": 5, "subject": "Delivered"})
+    client.fetch_case_by_number(77)
+    assert len(gets(transport)) == 2
+
+    assert client.delete_case(5)
+    client.fetch_case_by_case_id(5)
+    assert len(gets(transport)) == 3
+
+
+def test_cached_case_expires():
+    transport = FakeTransport(metadata)
+    client = client_with(transport, case_cache=sc.CaseCache(ttl=0.05))
+    client.fetch_case_by_case_id(5)
+    client.fetch_case_by_case_id(5)
+    time.sleep(0.06)
+    client.fetch_case_by_case_id(5)
+    assert len(gets(transport)) == 2
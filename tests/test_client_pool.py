@@ -0,0 +1,102 @@
+import asyncio
+
+import SprinklrClient as sc
+from fakes import FakeAsyncTransport, FakeResponse, FakeTransport
+
+
+def search_pages(verb, url, headers, body):
+    """Three pages of search results, linked by cursors"""
+    page = int(url.rsplit("?id=page-", 1)[1]) if "?id=page-" in url else 1
+    data = {"searchResults": [{"id": f"{page}-{row}"} for row in range(2)]}
+    if page < 3:
+        data["cursor"] = f"page-{page + 1}"
+    return FakeResponse(200, {"data": data})
+
+
+def make_pool(count=3, handler=None):
+    transport = FakeTransport(handler)
+    credentials = [{"key": f"k{index}", "access_token": "token", "transport": transport} for index in range(count)]
+    return sc.SprinklrClientPool(credentials), transport
+
+
+def keys_used(transport):
+    return [headers["key"] for verb, url, headers, body in transport.requests]
+
+
+def test_writes_to_one_entity_use_one_credential():
+    pool, transport = make_pool()
+    pool.delete_case(5)
+    pool.add_comment("CASE", 5, "note")
+    pool.update_case({"id": 5, "subject": "changed"})
+    pool.update_case_v1({"caseId": "5"})
+    pool.delete_case_v1("5")
+    pool.delete_case(5)
+    assert len(set(keys_used(transport))) == 1
+    assert keys_used(transport)[0] == pool.client_for("CASE", 5).key
+
+
+def test_writes_are_spread_over_entities():
+    pool, transport = make_pool()
+    for case_id in range(30):
+        pool.delete_case(case_id)
+    assert set(keys_used(transport)) == {"k0", "k1", "k2"}
+
+
+def test_entity_key_from_arguments():
+    assert sc._entity_key("update_asset", ("a1", {}), {}) == ("asset", "a1")
+    assert sc._entity_key("delete_asset", (), {"asset_id": "a1"}) == ("asset", "a1")
+    assert sc._entity_key("delete_asset_group", ("g",), {}) == sc._entity_key("update_asset_group", ("g", {}), {})
+    assert sc._entity_key("update_draft_message", ({"messageId": "m"},), {}) == ("message", "m")
+    assert sc._entity_key("delete_request", ("https://example.com",), {}) is None
+
+
+def test_reads_go_to_the_credential_with_most_quota():
+    pool, transport = make_pool()
+    for case_id in range(3):
+        pool.fetch_case_by_case_id(case_id)
+    assert sorted(keys_used(transport)) == ["k0", "k1", "k2"]
+    assert pool.status_code == 200
+
+
+def test_async_clients_release_in_flight_calls():
+    async def main():
+        transport = FakeAsyncTransport()
+        clients = [sc.AsyncSprinklrClient(key, None, "token", transport=transport) for key in ("a", "b")]
+        pool = sc.SprinklrClientPool(clients)
+        responses = await asyncio.gather(*[pool.fetch_case_by_case_id(case_id) for case_id in range(4)])
+        assert all(responses)
+        assert pool._in_flight == [0, 0]
+        await pool.close()
+
+    asyncio.run(main())
+
+
+def test_search_pages_are_fetched_by_the_client_that_searched():
+    pool, transport = make_pool(handler=search_pages)
+    assert pool.search_case({})
+    pages = 1
+    while pool.search_more_results():
+        assert pool.search_case_next()
+        pages += 1
+    assert pages == 3
+    assert len(set(keys_used(transport))) == 1
+    assert pool.search_next_page("CASE", "page-2")
+    assert len(set(keys_used(transport))) == 1
+    assert pool._in_flight == [0, 0, 0]
+
+
+def test_generators_are_in_flight_until_exhausted_or_closed():
+    pool, transport = make_pool(handler=search_pages)
+    records = pool.iter_search("CASE", {}, prefetch=False)
+    first = next(records)
+    assert first == {"id": "1-0"}
+    assert sum(pool._in_flight) == 1
+    assert len(list(records)) == 5
+    assert pool._in_flight == [0, 0, 0]
+
+    records = pool.iter_search("CASE", {}, prefetch=False)
+    next(records)
+    records.close()
+    assert pool._in_flight == [0, 0, 0]
+    assert sum(1 for _ in pool.fetch_many("fetch_case_by_case_id", range(4))) == 4
+    assert pool._in_flight == [0, 0, 0]
@@ -0,0 +1,64 @@
+import gzip
+import json
+import os
+import zlib
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+CASE_URL = "https://api2.sprinklr.com/api/v2/case"
+
+
+def posting_client(compressor):
+    transport = FakeTransport(lambda *request: FakeResponse(200, {"data": {}}))
+    return sc.SprinklrClient("key", None, "token", transport=transport, compress_requests=compressor), transport
+
+
+def test_large_body_is_gzipped_with_a_content_encoding_header():
+    compressor = sc.RequestCompressor(threshold=1024)
+    client, transport = posting_client(compressor)
+    case = {"subject": "Late delivery", "description": "where is my parcel " * 200}
+    assert client.post_request(CASE_URL, case)
+    _, _, headers, body = transport.requests[0]
+    assert headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(body)) == case
+    assert compressor.stats["compressed"] == 1
+    assert compressor.stats["bytes_saved"] == compressor.stats["bytes_in"] - len(body) > 0
+
+
+def test_body_below_the_threshold_is_sent_as_is():
+    compressor = sc.RequestCompressor(threshold=1024)
+    client, transport = posting_client(compressor)
+    assert client.post_request(CASE_URL, {"subject": "Late delivery"})
+    _, _, headers, body = transport.requests[0]
+    assert "Content-Encoding" not in headers
+    assert json.loads(body) == {"subject": "Late delivery"}
+    assert compressor.stats["skipped"] == 1
+
+
+def test_body_that_does_not_shrink_is_sent_as_is():
+    compressor = sc.RequestCompressor(threshold=16)
+    data = os.urandom(4096)
+    assert compressor.compress(data) == (data, None)
+    assert compressor.stats["skipped"] == 1
+
+
+def test_deflate_encoding():
+    compressor = sc.RequestCompressor(threshold=16, encoding="deflate")
+    body, encoding = compressor.compress("x" * 1000)
+    assert encoding == "deflate"
+    assert zlib.decompress(body) == b"x" * 1000
+    with pytest.raises(ValueError):
+        sc.RequestCompressor(encoding="br")
+
+
+def test_uploads_are_not_compressed(tmp_path):
+    media = tmp_path / "photo.jpg"
+    media.write_bytes(b"pixels" * 10000)
+    client, transport = posting_client(sc.RequestCompressor(threshold=16))
+    assert client.asset_upload("IMAGE", "tracker-1", str(media))
+    _, _, headers, body = transport.requests[0]
+    assert "Content-Encoding" not in headers
+    assert b"pixels" * 10000 in body
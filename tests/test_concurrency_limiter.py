@@ -0,0 +1,92 @@
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def round_trip(limiter, latency=0.1, status_code=200):
+    """Fills every slot, then returns them all with the same outcome"""
+    taken = 0
+    while limiter.acquire(blocking=False):
+        taken += 1
+    for _ in range(taken):
+        limiter.release(latency, status_code)
+    return taken
+
+
+def keep_full(limiter, completions, latency=0.1):
+    """Keeps every slot in use while the given number of calls complete"""
+    while limiter.acquire(blocking=False):
+        pass
+    for _ in range(completions):
+        limiter.release(latency, 200)
+        while limiter.acquire(blocking=False):
+            pass
+    while limiter.in_flight:
+        limiter.release()
+
+
+def test_limit_grows_by_about_one_call_per_round_trip_while_reached():
+    limiter = sc.ConcurrencyLimiter(initial=4, max_limit=10)
+    keep_full(limiter, 5)
+    assert limiter.limit == 5
+    keep_full(limiter, 6)
+    assert limiter.limit == 6
+    assert limiter.stats["decreases"] == 0
+
+
+def test_limit_that_is_not_reached_is_not_raised():
+    limiter = sc.ConcurrencyLimiter(initial=4, max_limit=10)
+    for _ in range(20):
+        assert limiter.acquire(blocking=False)
+        limiter.release(0.1, 200)
+    assert limiter.limit == 4
+    assert limiter.increases == 0
+
+
+def test_limit_stops_at_max_limit():
+    limiter = sc.ConcurrencyLimiter(initial=2, max_limit=3)
+    keep_full(limiter, 50)
+    assert limiter.limit == 3
+
+
+def test_429_halves_the_limit_once_per_round_trip():
+    limiter = sc.ConcurrencyLimiter(initial=8, max_limit=16)
+    limiter.acquire()
+    limiter.release(1.0, 200)
+    assert round_trip(limiter, 1.0, sc.HTTP_TOO_MANY_REQUESTS) == 8
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+def test_server_errors_and_failed_calls_also_halve_the_limit():
+    for status_code in (503, -1):
+        limiter = sc.ConcurrencyLimiter(initial=8)
+        limiter.acquire()
+        limiter.release(0.1, status_code)
+        assert limiter.limit == 4
+
+
+def test_limit_is_not_cut_below_min_limit():
+    limiter = sc.ConcurrencyLimiter(initial=2, min_limit=2)
+    limiter.acquire()
+    limiter.release(0.1, sc.HTTP_TOO_MANY_REQUESTS)
+    assert limiter.limit == 2
+
+
+def test_acquire_without_blocking_fails_at_the_limit():
+    limiter = sc.ConcurrencyLimiter(initial=1, max_limit=1)
+    assert limiter.acquire(blocking=False)
+    assert not limiter.acquire(blocking=False)
+    limiter.release()
+    assert limiter.acquire(blocking=False)
+
+
+def test_fetch_many_backs_off_after_429s():
+    def handler(verb, url, headers, body):
+        return FakeResponse(429 if url.endswith("/1") else 200, {"data": {}})
+
+    limiter = sc.ConcurrencyLimiter(initial=8, max_limit=8)
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(handler))
+    results = dict(client.fetch_many("fetch_case_by_case_id", range(1, 20), concurrency=limiter))
+    assert not results[1] and all(results[case_id] for case_id in range(2, 20))
+    assert limiter.decreases >= 1
+    assert limiter.in_flight == 0
@@ -0,0 +1,92 @@
+import asyncio
+import time
+
+import SprinklrClient as sc
+from fakes import FakeAsyncTransport, FakeResponse, FakeTransport
+
+CASE_URL = "https://api2.sprinklr.com/api/v2/case/1"
+
+
+def unavailable(verb, url, headers, body):
+    return FakeResponse(503, {"message": "unavailable"})
+
+
+def slow(verb, url, headers, body):
+    time.sleep(0.05)
+    return FakeResponse(200, {"data": {"url": url}})
+
+
+def test_spent_budget_fails_without_sending():
+    transport = FakeTransport()
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    with sc.within_deadline(0):
+        assert not client.get_request(CASE_URL)
+    assert transport.requests == []
+    assert client.status_code == -1
+    assert client.status_message == "Deadline Exceeded"
+
+
+def test_retries_stop_before_the_deadline():
+    transport = FakeTransport(unavailable)
+    policy = sc.RetryPolicy(max_attempts=10, backoff_factor=0.05, jitter=False)
+    client = sc.SprinklrClient("key", None, "token", transport=transport, retry_policy=policy)
+    started = time.monotonic()
+    with sc.within_deadline(0.3):
+        assert not client.get_request(CASE_URL)
+    # Waits of 0.05 and 0.1 fit in the budget, the next 0.2 would not
+    assert len(transport.requests) == 3
+    assert time.monotonic() - started < 0.3
+    assert client.status_code == 503
+
+
+def test_timeouts_are_cut_to_the_time_left():
+    transport = FakeTransport()
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    with sc.within_deadline(0.5):
+        client.get_request(CASE_URL)
+    connect, read = transport.timeouts[0]
+    assert 0 < connect <= 0.5 and 0 < read <= 0.5
+    client.get_request(CASE_URL)
+    assert transport.timeouts[1] == sc.DEFAULT_TIMEOUTS["default"]
+
+
+def test_nested_deadline_cannot_extend_the_budget():
+    with sc.within_deadline(0.1):
+        outer = sc._call_deadline.get()
+        with sc.within_deadline(10):
+            assert sc._call_deadline.get() == outer
+
+
+def test_fetch_many_fails_the_calls_past_its_deadline():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(slow))
+    results = dict(client.fetch_many("fetch_case_by_case_id", range(10), concurrency=1, deadline=0.12))
+    fetched = [case_id for case_id, response in results.items() if response]
+    expired = [case_id for case_id, response in results.items() if not response]
+    assert len(results) == 10
+    assert 1 <= len(fetched) <= 3
+    assert all(results[case_id].status_message == "Deadline Exceeded" for case_id in expired)
+
+
+def test_async_calls_share_the_deadline():
+    transport = FakeAsyncTransport()
+
+    async def main():
+        client = sc.AsyncSprinklrClient("key", None, "token", transport=transport)
+        with sc.within_deadline(0):
+            return await client.get_request(CASE_URL)
+
+    response = asyncio.run(main())
+    assert not response
+    assert response.status_message == "Deadline Exceeded"
+    assert transport.requests == []
+
+
+def test_none_timeouts_wait_indefinitely():
+    transport = FakeTransport()
+    client = sc.SprinklrClient("key", None, "token", transport=transport, timeouts={"default": None, "report": (5, None)})
+    assert client.get_request(CASE_URL)
+    assert client.post_request("https://api2.sprinklr.com/api/v2/reports/query", {})
+    assert transport.timeouts == [(None, None), (5, None)]
+    with sc.within_deadline(0.5):
+        assert client.get_request(CASE_URL)
+    assert 0 < transport.timeouts[2][0] <= 0.5 and 0 < transport.timeouts[2][1] <= 0.5
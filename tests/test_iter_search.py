@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+SEARCH_URL = "https://api2.sprinklr.com/api/v2/search/CASE"
+
+
+def paged_search(page_count=3, failing_page=None, fetched=None):
+    """Search results of two records a page, linked by cursors; fetched maps a page to an Event set when it is requested"""
+
+    def handler(verb, url, headers, body):
+        page = int(url.rsplit("?id=page-", 1)[1]) if "?id=page-" in url else 1
+        if fetched is not None and page in fetched:
+            fetched[page].set()
+        if page == failing_page:
+            return FakeResponse(500, {"message": "failed"})
+        data = {"searchResults": [{"id": f"{page}-{row}"} for row in range(2)]}
+        if page < page_count:
+            data["cursor"] = f"page-{page + 1}"
+        return FakeResponse(200, {"data": data})
+    return handler
+
+
+def search_client(handler):
+    transport = FakeTransport(handler)
+    return sc.SprinklrClient("key", None, "token", transport=transport), transport
+
+
+def requested_urls(transport):
+    return [(verb, url) for verb, url, _, _ in transport.requests]
+
+
+def test_every_record_is_yielded_in_page_order():
+    client, transport = search_client(paged_search())
+    records = list(client.iter_search("CASE", {"filter": {}}, page_size=2))
+    assert [record["id"] for record in records] == ["1-0", "1-1", "2-0", "2-1", "3-0", "3-1"]
+    assert requested_urls(transport) == [("POST", SEARCH_URL), ("GET", SEARCH_URL + "?id=page-2"),
+                                         ("GET", SEARCH_URL + "?id=page-3")]
+
+
+def test_pages_are_yielded_as_lists():
+    client, _ = search_client(paged_search(page_count=2))
+    pages = list(client.iter_search("CASE", {"filter": {}}, pages=True))
+    assert [[record["id"] for record in page] for page in pages] == [["1-0", "1-1"], ["2-0", "2-1"]]
+
+
+def test_next_page_is_fetched_while_the_current_one_is_processed():
+    fetched = {2: threading.Event()}
+    client, _ = search_client(paged_search(fetched=fetched))
+    records = client.iter_search("CASE", {"filter": {}})
+    assert next(records)["id"] == "1-0"
+    assert fetched[2].wait(2)
+    records.close()
+
+
+def test_without_prefetch_a_page_is_fetched_only_when_reached():
+    client, transport = search_client(paged_search())
+    records = client.iter_search("CASE", {"filter": {}}, prefetch=False)
+    assert [next(records)["id"], next(records)["id"]] == ["1-0", "1-1"]
+    assert len(transport.requests) == 1
+    assert next(records)["id"] == "2-0"
+    assert len(transport.requests) == 2
+
+
+def test_stopping_early_leaves_later_pages_unfetched():
+    fetched = {2: threading.Event(), 3: threading.Event()}
+    client, transport = search_client(paged_search(fetched=fetched))
+    for record in client.iter_search("CASE", {"filter": {}}):
+        if record["id"] == "1-1":
+            break
+    assert fetched[2].wait(2)
+    assert not fetched[3].wait(0.1)
+    assert len(transport.requests) == 2
+
+
+def test_failed_page_raises_after_the_earlier_records():
+    client, _ = search_client(paged_search(failing_page=2))
+    seen = []
+    with pytest.raises(sc.SprinklrError):
+        for record in client.iter_search("CASE", {"filter": {}}):
+            seen.append(record["id"])
+    assert seen == ["1-0", "1-1"]
+
+
+def test_search_leaves_the_client_state_alone():
+    client, _ = search_client(paged_search())
+    list(client.iter_search("CASE", {"filter": {}}))
+    assert client.status_code is None and client.result is None
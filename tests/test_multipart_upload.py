@@ -0,0 +1,103 @@
+import email
+import io
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+PIXELS = b"\xff\xd8" + bytes(range(256)) * 400
+
+
+def parse(upload, body):
+    """Parses a multipart/form-data body, returning its single part"""
+    message = email.message_from_bytes(b"Content-Type: " + upload.content_type.encode() + b"\r\n\r\n" + body)
+    parts = message.get_payload()
+    assert len(parts) == 1
+    return parts[0]
+
+
+def read_all(upload, chunk_size=4096):
+    return b"".join(iter(lambda: upload.read(chunk_size), b""))
+
+
+@pytest.fixture
+def media(tmp_path):
+    path = tmp_path / "photo.jpg"
+    path.write_bytes(PIXELS)
+    return str(path)
+
+
+def test_body_is_one_form_data_part_holding_the_file(media):
+    with sc.MultipartUpload(media) as upload:
+        body = read_all(upload)
+    assert len(body) == upload.len
+    assert body.startswith(b"--" + upload.boundary.encode() + b"\r\n")
+    assert body.endswith(b"\r\n--" + upload.boundary.encode() + b"--\r\n")
+    part = parse(upload, body)
+    assert part.get_content_type() == "image/jpeg"
+    assert part.get_param("name", header="content-disposition") == "file"
+    assert part.get_filename() == "photo.jpg"
+    assert part.get_payload(decode=True) == PIXELS
+
+
+def test_quotes_in_the_file_name_are_escaped():
+    upload = sc.MultipartUpload(b"data", field_name="media", filename='say "cheese".png')
+    part = parse(upload, read_all(upload))
+    assert part.get_filename() == "say %22cheese%22.png"
+    assert part.get_content_type() == "image/png"
+
+
+def test_progress_is_reported_for_every_chunk_of_the_file(media):
+    reports = []
+    with sc.MultipartUpload(media, progress=lambda sent, total: reports.append((sent, total))) as upload:
+        read_all(upload, chunk_size=10000)
+    assert [sent for sent, _ in reports] == [10000 * n for n in range(1, len(PIXELS) // 10000 + 1)] + [len(PIXELS)]
+    assert {total for _, total in reports} == {len(PIXELS)}
+
+
+def test_memory_mapped_file_is_sent_whole(media):
+    with sc.MultipartUpload(media, use_mmap=True) as mapped_upload:
+        assert mapped_upload._mmap is not None
+        assert parse(mapped_upload, read_all(mapped_upload)).get_payload(decode=True) == PIXELS
+        mapped_upload.seek(0)
+        assert parse(mapped_upload, read_all(mapped_upload)).get_payload(decode=True) == PIXELS
+    assert mapped_upload._mmap is None and mapped_upload.closed
+
+
+def test_empty_file_is_not_memory_mapped(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    with sc.MultipartUpload(str(path), use_mmap=True) as upload:
+        assert upload._mmap is None
+        assert parse(upload, read_all(upload)).get_payload(decode=True) == b""
+
+
+def test_rewound_upload_sends_the_whole_body_again(media):
+    reports = []
+    with sc.MultipartUpload(media, progress=lambda sent, total: reports.append(sent)) as upload:
+        first = read_all(upload)
+        upload.seek(0)
+        assert read_all(upload) == first
+    assert reports.count(len(PIXELS)) == 2
+
+
+def test_file_objects_are_left_open():
+    source = io.BytesIO(PIXELS)
+    source.name = "photo.jpg"
+    with sc.MultipartUpload(source) as upload:
+        assert upload.len == len(read_all(upload))
+        assert upload.filename == "photo.jpg"
+    assert not source.closed
+
+
+def test_asset_upload_streams_the_file_with_progress(media):
+    reports = []
+    transport = FakeTransport(lambda *request: FakeResponse(200, {"data": {"uploaded": True}}))
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    assert client.asset_upload("IMAGE", "tracker-1", media, progress=lambda sent, total: reports.append(sent),
+                               use_mmap=True)
+    _, _, headers, body = transport.requests[0]
+    assert headers["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert PIXELS in body
+    assert reports[-1] == len(PIXELS)
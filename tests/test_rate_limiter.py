@@ -0,0 +1,89 @@
+import gc
+import threading
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeTransport
+
+
+def test_prioritized_rejects_an_unknown_class():
+    with pytest.raises(ValueError, match="bacth"):
+        with sc.prioritized("bacth"):
+            pass
+
+
+def test_client_rejects_an_unknown_class():
+    with pytest.raises(ValueError, match="bacth"):
+        sc.SprinklrClient("key", priority="bacth")
+    with pytest.raises(ValueError, match="bacth"):
+        sc.AsyncSprinklrClient("key", priority="bacth", transport=FakeTransport())
+
+
+def test_client_checks_the_class_against_its_limiter():
+    limiter = sc.RateLimiter(weights={"realtime": 4, sc.PRIORITY_BATCH: 1})
+    client = sc.SprinklrClient("key", transport=FakeTransport(), rate_limiter=limiter, priority="realtime")
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    with pytest.raises(ValueError):
+        sc.SprinklrClient("key", rate_limiter=limiter, priority=sc.PRIORITY_INTERACTIVE)
+
+
+def test_class_of_another_limiter_falls_back_to_interactive(caplog):
+    other = sc.RateLimiter(weights={"realtime": 4, sc.PRIORITY_INTERACTIVE: 1})
+    client = sc.SprinklrClient("key", transport=FakeTransport(), rate_limiter=sc.RateLimiter())
+    with sc.prioritized("realtime"):
+        for _ in range(3):
+            assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert len([record for record in caplog.records if "unknown priority class" in record.message]) == 1
+    assert other.weights["realtime"] == 4
+
+
+def test_classes_of_a_discarded_limiter_are_forgotten():
+    limiter = sc.RateLimiter(weights={"realtime": 4, sc.PRIORITY_BATCH: 1})
+    with sc.prioritized("realtime"):
+        pass
+    del limiter
+    gc.collect()
+    with pytest.raises(ValueError, match="realtime"):
+        with sc.prioritized("realtime"):
+            pass
+
+
+def test_shared_limiter_accepts_the_batch_class():
+    client = sc.SprinklrClient("key", transport=FakeTransport(), rate_limiter=True, priority=sc.PRIORITY_BATCH)
+    assert client.rate_limiter is sc.RateLimiter.for_key("key")
+
+
+def test_interactive_calls_overtake_a_batch_backlog():
+    limiter = sc.RateLimiter(calls_per_second=200)
+    granted = []
+    lock = threading.Lock()
+
+    def call(priority):
+        limiter.acquire(priority=priority)
+        with lock:
+            granted.append(priority)
+
+    # A 429 holds every call for a second, long enough for both backlogs to queue up
+    limiter.update(429, {})
+    threads = [threading.Thread(target=call, args=(sc.PRIORITY_BATCH,)) for _ in range(30)]
+    threads += [threading.Thread(target=call, args=(sc.PRIORITY_INTERACTIVE,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert len(granted) == 38
+    # 8 of every 9 calls go to interactive while both classes wait, but batch is not starved
+    assert granted[:10].count(sc.PRIORITY_INTERACTIVE) >= 7
+    assert sc.PRIORITY_BATCH in granted[:10]
+
+
+def test_batch_calls_leave_the_reserve_to_interactive_ones():
+    limiter = sc.RateLimiter(calls_per_second=100, calls_per_hour=10)
+    batch = 0
+    while limiter.acquire(blocking=False, priority=sc.PRIORITY_BATCH):
+        batch += 1
+    assert batch == 9
+    assert limiter.acquire(blocking=False, priority=sc.PRIORITY_INTERACTIVE)
+    assert not limiter.acquire(blocking=False, priority=sc.PRIORITY_INTERACTIVE)
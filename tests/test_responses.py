@@ -0,0 +1,110 @@
+import json
+import threading
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def echo(verb, url, headers, body):
+    if "oauth/token" in url:
+        return FakeResponse(200, {"access_token": "access-1", "refresh_token": "refresh-1", "expires_in": 3600,
+                                  "token_type": "Bearer"})
+    return FakeResponse(200, {"data": {"url": url, "cursor": "next"}})
+
+
+def untouched(client):
+    return (client.status_code, client.status_message, client.result, client.search_cursor, client.encoding) \
+        == (None, None, None, None, None)
+
+
+def test_returned_responses_leave_the_client_alone():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), return_responses=True)
+    response = client.search_case({})
+    assert response.status_code == 200
+    assert response.cursor == "next"
+    assert untouched(client)
+
+
+def test_responses_are_immutable():
+    response = sc.SprinklrResponse(200, None, {"data": {}})
+    with pytest.raises(AttributeError):
+        response.status_code = 500
+
+
+def test_token_calls_only_switch_the_token():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), return_responses=True)
+    response = client.refresh_access_token("secret", "uri", "refresh-0")
+    assert response.result["access_token"] == "access-1"
+    assert client.access_token == "access-1"
+    assert untouched(client)
+
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo))
+    assert client.refresh_access_token("secret", "uri", "refresh-0") is True
+    assert client.status_code == 200 and client.result["access_token"] == "access-1"
+
+
+def test_threads_get_their_own_results():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), return_responses=True)
+    results = {}
+
+    def fetch(case_id):
+        results[case_id] = client.fetch_case_by_case_id(case_id).result["data"]["url"]
+
+    threads = [threading.Thread(target=fetch, args=(case_id,)) for case_id in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert all(url.endswith(f"/case/{case_id}") for case_id, url in results.items())
+    assert len(results) == 20
+
+
+def test_fetch_many_leaves_the_client_alone():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo))
+    assert all(response for _, response in client.fetch_many("fetch_case_by_case_id", range(5)))
+    assert untouched(client)
+
+
+class CountingCodec(sc.JsonCodec):
+    def __init__(self):
+        self.parsed = 0
+
+    def loads(self, data):
+        self.parsed += 1
+        return super().loads(data)
+
+
+def test_lazy_parsing_decodes_the_body_when_result_is_first_read():
+    codec = CountingCodec()
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), codec=codec, lazy_parsing=True)
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert codec.parsed == 0
+    assert client.result["data"]["url"].endswith("/case/1")
+    assert client.result and codec.parsed == 1
+
+
+def test_bodies_are_parsed_during_the_call_by_default():
+    codec = CountingCodec()
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), codec=codec)
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert codec.parsed == 1
+
+
+def test_keep_raw_false_holds_only_the_parsed_result():
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo), keep_raw=False)
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert client.raw is None
+    assert client.result["data"]["cursor"] == "next"
+
+    client = sc.SprinklrClient("key", None, "token", transport=FakeTransport(echo))
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert json.loads(client.raw) == client.result
+
+
+def test_lazy_response_without_raw_still_parses_once():
+    response = sc.SprinklrResponse.from_body(200, None, b'{"data": {"cursor": "c1"}}', lazy=True, keep_raw=False)
+    assert response.raw is None
+    assert response.cursor == "c1"
+    assert response.raw is None
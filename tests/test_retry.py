@@ -0,0 +1,72 @@
+import io
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def flaky(failures, status=503):
+    """Handler failing the first `failures` requests with `status`"""
+    calls = []
+
+    def handler(verb, url, headers, body):
+        calls.append(url)
+        if len(calls) <= failures:
+            return FakeResponse(status, {"message": "try again"})
+        return FakeResponse(200, {"data": {"ok": True}})
+    return handler
+
+
+def uploading_client(transport):
+    policy = sc.RetryPolicy(max_attempts=3, jitter=False, retry_verbs={"POST"})
+    return sc.SprinklrClient("key", None, "token", transport=transport, retry_policy=policy)
+
+
+class Unseekable(io.RawIOBase):
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        return self._data.readinto(buffer)
+
+
+def test_get_is_retried_after_transient_failures(no_sleep):
+    transport = FakeTransport(flaky(2))
+    client = sc.SprinklrClient("key", None, "token", transport=transport,
+                               retry_policy=sc.RetryPolicy(max_attempts=3, jitter=False))
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert len(transport.requests) == 3
+    assert len(no_sleep) == 2
+
+
+def test_post_is_not_retried_by_default(no_sleep):
+    transport = FakeTransport(flaky(1))
+    client = sc.SprinklrClient("key", None, "token", transport=transport,
+                               retry_policy=sc.RetryPolicy(max_attempts=3, jitter=False))
+    assert not client.post_request("https://api2.sprinklr.com/api/v2/case", {"subject": "x"})
+    assert len(transport.requests) == 1
+
+
+def test_retried_upload_sends_the_whole_body_again(no_sleep, tmp_path):
+    media = tmp_path / "photo.jpg"
+    media.write_bytes(b"\xff\xd8" + b"pixels" * 10000)
+    transport = FakeTransport(flaky(2))
+    client = uploading_client(transport)
+
+    assert client.asset_upload("IMAGE", "tracker-1", str(media))
+    bodies = [body for _, _, _, body in transport.requests]
+    assert len(bodies) == 3
+    assert bodies[0] == bodies[1] == bodies[2]
+    assert b"pixels" * 10000 in bodies[0]
+
+
+def test_unseekable_upload_is_not_resent(no_sleep):
+    transport = FakeTransport(flaky(1))
+    client = uploading_client(transport)
+
+    assert not client.post_request("https://api2.sprinklr.com/api/v1/sam/upload",
+                                   sc.MultipartUpload(Unseekable(b"pixels")), is_file=True)
+    assert len(transport.requests) == 1
+    assert client.status_code == 503
@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+
+def search_handler(delay=0.0, status=200):
+    """Answers id searches with a record for every requested id below 1000"""
+
+    def handler(verb, url, headers, body):
+        time.sleep(delay)
+        if status != 200:
+            return FakeResponse(status, {"message": "failed"})
+        ids = json.loads(body)["filter"]["values"]
+        return FakeResponse(200, {"data": {"searchResults": [{"id": i, "subject": f"case {i}"} for i in ids if i < 1000]}})
+    return handler
+
+
+def searches(transport):
+    return [json.loads(body)["filter"]["values"] for verb, url, _, body in transport.requests if verb == "POST"]
+
+
+def test_search_by_ids_sends_one_search_per_batch():
+    transport = FakeTransport(search_handler())
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    found = client.search_by_ids("CASE", list(range(250)) + [5, 1001], batch_size=100)
+    assert [len(batch) for batch in searches(transport)] == [100, 100, 51]
+    assert sorted(found) == list(range(250))
+    assert found[7] == {"id": 7, "subject": "case 7"}
+
+
+def test_batcher_combines_lookups_from_many_threads():
+    transport = FakeTransport(search_handler())
+    batcher = sc.SearchBatcher(sc.SprinklrClient("key", None, "token", transport=transport), "CASE", window=0.1)
+    results = {}
+
+    def lookup(case_id):
+        results[case_id] = batcher.get(case_id, timeout=5)
+
+    threads = [threading.Thread(target=lookup, args=(case_id,)) for case_id in [1, 2, 3, 3, 1001]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    batcher.close()
+    assert len(searches(transport)) == 1
+    assert sorted(searches(transport)[0]) == [1, 2, 3, 1001]
+    assert results[3] == {"id": 3, "subject": "case 3"}
+    assert results[1001] is None
+
+
+def test_full_batches_are_searched_concurrently():
+    transport = FakeTransport(search_handler(delay=0.2))
+    batcher = sc.SearchBatcher(sc.SprinklrClient("key", None, "token", transport=transport), "CASE", batch_size=2)
+    started = time.monotonic()
+    futures = [batcher.submit(case_id) for case_id in range(6)]
+    assert [future.result(5)["id"] for future in futures] == list(range(6))
+    assert time.monotonic() - started < 0.5
+    assert len(searches(transport)) == 3
+    batcher.close()
+
+
+def test_failed_search_reaches_every_lookup():
+    transport = FakeTransport(search_handler(status=500))
+    batcher = sc.SearchBatcher(sc.SprinklrClient("key", None, "token", transport=transport), "CASE")
+    future = batcher.submit(1)
+    batcher.flush()
+    with pytest.raises(sc.SprinklrError):
+        future.result(5)
+    batcher.close()
+
+
+def test_batcher_rejects_the_async_client():
+    with pytest.raises(TypeError):
+        sc.SearchBatcher(sc.AsyncSprinklrClient("key", None, "token", transport=FakeTransport()), "CASE")
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeAsyncTransport, FakeResponse, FakeTransport
+
+CASE_URL = "https://api2.sprinklr.com/api/v2/case/"
+
+
+def slow_handler(verb, url, headers, body):
+    time.sleep(0.1)
+    return FakeResponse(200, {"data": {"url": url}})
+
+
+def fetch_concurrently(client, urls):
+    start = threading.Barrier(len(urls))
+    responses = [None] * len(urls)
+
+    def fetch(index):
+        start.wait()
+        responses[index] = client.get_request(urls[index])
+
+    threads = [threading.Thread(target=fetch, args=(index,)) for index in range(len(urls))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    return responses
+
+
+def test_identical_gets_share_one_request():
+    transport = FakeTransport(slow_handler)
+    client = sc.SprinklrClient("key", None, "token", transport=transport, return_responses=True)
+    responses = fetch_concurrently(client, [CASE_URL + "1"] * 10)
+    assert len(transport.requests) == 1
+    assert all(response.result == {"data": {"url": CASE_URL + "1"}} for response in responses)
+
+
+def test_different_urls_and_tokens_are_not_coalesced():
+    transport = FakeTransport(slow_handler)
+    client = sc.SprinklrClient("key", None, "token", transport=transport, return_responses=True)
+    fetch_concurrently(client, [CASE_URL + str(index % 3) for index in range(9)])
+    assert len(transport.requests) == 3
+
+    other = sc.SprinklrClient("key", None, "other-token", transport=transport, return_responses=True)
+    client.single_flight = other.single_flight = sc.SingleFlight()
+    threads = [threading.Thread(target=c.get_request, args=(CASE_URL + "1",)) for c in (client, other)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert len(transport.requests) == 5
+
+
+def test_coalescing_can_be_turned_off():
+    transport = FakeTransport(slow_handler)
+    client = sc.SprinklrClient("key", None, "token", transport=transport, return_responses=True,
+                               coalesce_requests=False)
+    fetch_concurrently(client, [CASE_URL + "1"] * 5)
+    assert len(transport.requests) == 5
+
+
+def test_errors_reach_every_waiter_and_the_next_call_runs_again():
+    flight = sc.SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("boom")
+
+    errors = []
+
+    def waiter():
+        started.wait()
+        try:
+            flight.do("key", fail)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    thread.join(10)
+    assert len(calls) == 1 and len(errors) == 1
+    assert flight.do("key", lambda: "again") == "again"
+
+
+def test_async_gets_share_one_request():
+    transport = FakeAsyncTransport()
+
+    async def main():
+        client = sc.AsyncSprinklrClient("key", None, "token", transport=transport)
+        return await asyncio.gather(*[client.get_request(CASE_URL + "1") for _ in range(10)])
+
+    responses = asyncio.run(main())
+    assert len(transport.requests) == 1
+    assert all(responses)
+
+
+def test_waiter_gives_up_at_its_own_deadline():
+    def very_slow(verb, url, headers, body):
+        time.sleep(0.5)
+        return FakeResponse(200, {"data": {}})
+
+    transport = FakeTransport(very_slow)
+    client = sc.SprinklrClient("key", None, "token", transport=transport, return_responses=True)
+    leader = threading.Thread(target=client.get_request, args=(CASE_URL + "1",))
+    leader.start()
+    while not transport.requests:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    with sc.within_deadline(0.1):
+        response = client.get_request(CASE_URL + "1")
+    assert time.monotonic() - started < 0.3
+    assert response.status_message == "Deadline Exceeded"
+    leader.join(10)
+    assert len(transport.requests) == 1
+
+
+def test_async_waiter_gives_up_at_its_own_deadline():
+    async def main():
+        flight = sc.SingleFlight()
+
+        async def slow():
+            await asyncio.sleep(0.5)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do_async("key", slow))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.TimeoutError):
+            await flight.do_async("key", slow, time.monotonic() + 0.05)
+        return await leader
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeResponse, FakeTransport
+
+DOCUMENT = ('{"meta": {"count": 12.5e-1, "ok": true, "skip": [1.25, -3E+2, null]}, '
+            '"data": {"total": -0.5, "rows": [1.5, 2.25, -17, 3e10, 4.5E-3, 0, -0.0, 1E+2, '
+            '"caf\\u00e9 ü", {"id": 7, "score": 9.75, "tags": ["a", false]}, [1, 2.0], null, true]}, "tail": 1}')
+
+
+def parse(chunks, item_path=("data", "rows")):
+    parser = sc.JsonStreamParser(item_path)
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    items.extend(parser.close())
+    return items
+
+
+def test_matches_json_loads_for_every_split():
+    body = DOCUMENT.encode("utf-8")
+    expected = json.loads(DOCUMENT)["data"]["rows"]
+    for split in range(len(body) + 1):
+        assert parse([body[:split], body[split:]]) == expected, split
+
+
+def test_matches_json_loads_for_every_two_splits():
+    body = DOCUMENT.encode("utf-8")
+    expected = json.loads(DOCUMENT)["data"]["rows"]
+    for first in range(0, len(body), 3):
+        for second in range(first, len(body) + 1, 5):
+            assert parse([body[:first], body[first:second], body[second:]]) == expected, (first, second)
+
+
+def test_byte_at_a_time():
+    body = DOCUMENT.encode("utf-8")
+    assert parse([body[i:i + 1] for i in range(len(body))]) == json.loads(DOCUMENT)["data"]["rows"]
+
+
+def test_number_split_after_decimal_point_is_held_back():
+    parser = sc.JsonStreamParser(("data", "rows"))
+    assert parser.feed(b'{"data": {"rows": [1.') == []
+    assert parser.feed(b'5, 2.25]}}') == [1.5, 2.25]
+    assert parser.close() == []
+
+
+def test_missing_array_returns_nothing():
+    assert parse([b'{"data": {"other": [1, 2]}}']) == []
+
+
+def test_incomplete_document_raises():
+    with pytest.raises(ValueError):
+        parse([b'{"data": {"rows": [1, 2'])
+
+
+def test_iter_report_rows_streams_response():
+    transport = FakeTransport(lambda verb, url, headers, body: FakeResponse(200, DOCUMENT))
+    client = sc.SprinklrClient("key", None, "token", transport=transport)
+    assert list(client.iter_report_rows({})) == json.loads(DOCUMENT)["data"]["rows"]
@@ -0,0 +1,200 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+import SprinklrClient as sc
+from fakes import FakeAsyncTransport, FakeResponse, FakeTransport
+
+
+def token_endpoint(counter):
+    """Handler issuing a new access and refresh token for every token request"""
+    lock = threading.Lock()
+
+    def handler(verb, url, headers, body):
+        if "oauth/token" not in url:
+            return FakeResponse(200, {"data": {}})
+        with lock:
+            counter.append(url)
+            number = len(counter)
+        return FakeResponse(200, {"access_token": f"access-{number}", "refresh_token": f"refresh-{number}",
+                                  "expires_in": 3600, "token_type": "Bearer"})
+    return handler
+
+
+def expiring_tokens(refreshes, rejected=("Bearer access-0",)):
+    """Token endpoint issuing access-1, access-2... while calls made with a rejected token get a 401"""
+    tokens = token_endpoint(refreshes)
+
+    def handler(verb, url, headers, body):
+        if "oauth/token" not in url and headers.get("Authorization") in rejected:
+            return FakeResponse(401, {"message": "invalid token"})
+        return tokens(verb, url, headers, body)
+    return handler
+
+
+def managed_client(handler, expires_in=None, **kwargs):
+    transport = FakeTransport(handler)
+    client = sc.SprinklrClient("key", None, transport=transport, token_manager=sc.TokenManager("secret", "uri", **kwargs))
+    client.set_token("access-0", "refresh-0", expires_in=expires_in)
+    return client, transport
+
+
+def case_calls(transport):
+    return [headers["Authorization"] for verb, url, headers, body in transport.requests if "oauth/token" not in url]
+
+
+def test_401_refreshes_the_token_once_and_resends_the_call():
+    refreshes = []
+    client, transport = managed_client(expiring_tokens(refreshes), background=False)
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert len(refreshes) == 1
+    assert case_calls(transport) == ["Bearer access-0", "Bearer access-1"]
+    assert client.token_manager.refreshes == 1
+
+
+def test_call_still_rejected_after_a_refresh_is_not_resent_again():
+    refreshes = []
+    client, transport = managed_client(expiring_tokens(refreshes, ("Bearer access-0", "Bearer access-1")),
+                                       background=False)
+    assert not client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert client.status_code == 401
+    assert len(refreshes) == 1
+    assert len(case_calls(transport)) == 2
+
+
+def test_token_is_refreshed_before_a_call_when_about_to_expire():
+    refreshes = []
+    client, transport = managed_client(expiring_tokens(refreshes), expires_in=30, refresh_margin=60,
+                                       background=False)
+    assert client.get_request("https://api2.sprinklr.com/api/v2/case/1")
+    assert case_calls(transport) == ["Bearer access-1"]
+    assert client.token_expires_at > time.time() + 3000
+
+
+def test_token_is_refreshed_in_the_background_ahead_of_expiry():
+    refreshes = []
+    client, transport = managed_client(expiring_tokens(refreshes), expires_in=0.2, refresh_margin=0.1)
+    give_up = time.monotonic() + 5
+    while client.access_token == "access-0" and time.monotonic() < give_up:
+        time.sleep(0.01)
+    client.token_manager.close()
+    assert len(refreshes) == 1
+    assert client.access_token == "access-1"
+    assert case_calls(transport) == []
+
+
+@pytest.fixture(params=["memory", "file", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return sc.MemoryTokenStore()
+    if request.param == "file":
+        return sc.FileTokenStore(str(tmp_path / "tokens.json"))
+    return sc.SqliteTokenStore(str(tmp_path / "tokens.db"))
+
+
+def test_concurrent_async_refreshes_call_the_endpoint_once(store):
+    refreshes = []
+
+    async def main():
+        client = sc.AsyncSprinklrClient("key", None, "access-0", transport=FakeAsyncTransport(token_endpoint(refreshes)),
+                                        token_store=store)
+        responses = await asyncio.gather(*[client.refresh_access_token("secret", "uri", "refresh-0")
+                                           for _ in range(20)])
+        assert all(responses)
+        assert {response.result["access_token"] for response in responses} == {"access-1"}
+        assert client.access_token == "access-1"
+
+    asyncio.run(main())
+    assert len(refreshes) == 1
+    assert store.get("key@")["refresh_token"] == "refresh-1"
+
+
+def test_async_refresh_does_not_block_the_event_loop(tmp_path):
+    store = sc.FileTokenStore(str(tmp_path / "tokens.json"))
+    refreshes = []
+    held = threading.Event()
+
+    def hold_lock():
+        # Another user of the store (e.g. another process) holding its lock for a while
+        with store.lock():
+            held.set()
+            time.sleep(0.5)
+
+    async def main():
+        client = sc.AsyncSprinklrClient("key", None, "access-0", transport=FakeAsyncTransport(token_endpoint(refreshes)),
+                                        token_store=store)
+        threading.Thread(target=hold_lock).start()
+        held.wait()
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.05)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        assert await client.refresh_access_token("secret", "uri", "refresh-0")
+        ticker.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+    assert len(refreshes) == 1
+
+
+def test_refresh_adopts_tokens_stored_by_another_client(store):
+    refreshes = []
+    store.put("key@", {"access_token": "access-9", "refresh_token": "refresh-9", "token_type": "Bearer",
+                       "expires_at": time.time() + 3600})
+    client = sc.SprinklrClient("key", None, "access-0", transport=FakeTransport(token_endpoint(refreshes)),
+                               token_store=store)
+    assert client.access_token == "access-9"
+    assert client.refresh_access_token("secret", "uri", "refresh-0")
+    assert refreshes == []
+
+
+def open_store(kind, filename):
+    return sc.FileTokenStore(filename) if kind == "file" else sc.SqliteTokenStore(filename)
+
+
+def refresh_in_process(kind, filename, calls_filename, start, access_tokens):
+    def handler(verb, url, headers, body):
+        with open(calls_filename, "a") as calls:
+            calls.write(url + "\n")
+        time.sleep(0.1)
+        return FakeResponse(200, {"access_token": f"access-{os.getpid()}", "refresh_token": f"refresh-{os.getpid()}",
+                                  "expires_in": 3600, "token_type": "Bearer"})
+
+    client = sc.SprinklrClient("key", None, "access-0", transport=FakeTransport(handler),
+                               token_store=open_store(kind, filename))
+    start.wait()
+    client.refresh_access_token("secret", "uri", "refresh-0")
+    access_tokens.put(client.access_token)
+
+
+@pytest.mark.parametrize("kind", ["file", "sqlite"])
+def test_processes_refreshing_at_once_call_the_endpoint_once(kind, tmp_path):
+    filename = str(tmp_path / "tokens")
+    calls_filename = str(tmp_path / "calls.log")
+    open_store(kind, filename).put("key@", {"access_token": "access-0", "refresh_token": "refresh-0",
+                                            "token_type": "Bearer", "expires_at": time.time() + 60})
+    context = multiprocessing.get_context("fork")
+    start = context.Barrier(4)
+    access_tokens = context.Queue()
+    processes = [context.Process(target=refresh_in_process,
+                                 args=(kind, filename, calls_filename, start, access_tokens)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+
+    assert [process.exitcode for process in processes] == [0, 0, 0, 0]
+    with open(calls_filename) as calls:
+        assert len(calls.readlines()) == 1
+    refreshed = {access_tokens.get(timeout=5) for _ in processes}
+    assert len(refreshed) == 1
+    assert open_store(kind, filename).get("key@")["access_token"] in refreshed